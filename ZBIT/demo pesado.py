@@ -36,7 +36,7 @@ def demo_basic():
         print(f"     - State vector shape: {core.psi.shape}")
         print(f"     - Reliability: {core.reliability}")
         print(f"     - Initial state norm: {np.linalg.norm(core.psi):.15f}")
-        print(f"     - Memory (MB): {(core.H.nbytes + len(core.psi)*16) / (1024**2):.2f}")
+        print(f"     - Memory (MB): {core.memory_bytes / (1024**2):.2f}")
 
 
 def demo_validation():
@@ -44,7 +44,7 @@ def demo_validation():
     print_header("DEMO 2: Complete 9-Test Validation Suite")
     
     print("\n🧪 Running rigorous validation with detailed analysis...")
-    core = ZBITQuantumCoreV2(n_qubits=8, verbose=False)
+    core = ZBITQuantumCoreV2(n_qubits=8, verbose=False, engine="dense")
     report = core.run_validation_suite()
     
     print(f"\n✅ Comprehensive Validation Results:")
@@ -193,7 +193,7 @@ def demo_advanced():
     
     # Part 1: Spectral Analysis
     print("   1️⃣  SPECTRAL ANALYSIS (10-qubit system):")
-    core = ZBITQuantumCoreV2(n_qubits=10, verbose=False)
+    core = ZBITQuantumCoreV2(n_qubits=10, verbose=False, engine="dense")
     H = core.H
     
     start = time.time()
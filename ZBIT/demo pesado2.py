@@ -55,7 +55,7 @@ def demo_init(metrics):
         core = ZBITQuantumCoreV2(n_qubits=n, verbose=False)
         elapsed = time.time() - start
         dim = 2**n
-        mem = (core.H.nbytes + core.psi.nbytes) / (1024**3)
+        mem = core.memory_bytes / (1024**3)
         
         results.append({
             "qubits": n,
@@ -130,7 +130,7 @@ def demo_otoc(metrics):
 
 def demo_spectral(metrics):
     print_header("5. ANÁLISE ESPECTRAL DO HAMILTONIANO")
-    core = ZBITQuantumCoreV2(n_qubits=10, verbose=False)
+    core = ZBITQuantumCoreV2(n_qubits=10, verbose=False, engine="dense")
     H = core.H
     
     start = time.time()
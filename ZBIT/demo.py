@@ -72,9 +72,9 @@ def main():
 
     # === 1. INICIALIZAÇÃO ===
     print_header("1. INICIALIZAÇÃO (10 QUBITS)")
-    core = ZBITQuantumCoreV2(n_qubits=10, verbose=False)
+    core = ZBITQuantumCoreV2(n_qubits=10, verbose=False, engine="dense")  # H denso p/ análise espectral
     dim = 2**10
-    mem_gb = (core.H.nbytes + core.psi.nbytes) / (1024**3)
+    mem_gb = core.memory_bytes / (1024**3)
     print(f"  Hilbert: 2^10 = {dim}")
     print(f"  Memória: {mem_gb:.4f} GB")
     print(f"  Norma inicial: {np.linalg.norm(core.psi):.15f}")
@@ -0,0 +1,98 @@
+"""
+ZBIT-CORE-v2 Adaptive Evolution Tests
+Error-controlled Krylov stepping and the evolve run report
+"""
+import sys
+import os
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from zbit_core_v2_FIXED import ZBITQuantumCoreV2
+from zbit_backends import NumpyBackend, expm
+from zbit_operators import chain_terms, to_dense
+
+
+class TestAdaptiveEvolve(unittest.TestCase):
+    """evolve(tol=...)"""
+
+    def setUp(self):
+        self.n = 7
+        self.psi0 = np.full(2**self.n, 2**(-self.n / 2), dtype=complex)
+        self.H = to_dense(self.n, chain_terms(self.n))
+
+    def _exact(self, t):
+        return expm(-1j * t * self.H) @ self.psi0
+
+    def test_01_error_below_tolerance(self):
+        """TEST 1: true error and reported global error stay below tol on every engine"""
+        for engine in ("dense", "sparse", "krylov", "matrix_free"):
+            for tol in (1e-6, 1e-10):
+                with self.subTest(engine=engine, tol=tol):
+                    core = ZBITQuantumCoreV2(n_qubits=self.n, verbose=False, engine=engine)
+                    core.psi = self.psi0.copy()
+                    core.evolve(4.0, steps=10, tol=tol)
+                    report = core.evolve_report
+                    self.assertEqual(report["mode"], "adaptive")
+                    self.assertLessEqual(report["global_error"], tol)
+                    self.assertLess(np.linalg.norm(core.psi - self._exact(4.0)), tol)
+                    self.assertEqual(len(core.history["energy"]), report["steps"])
+
+    def test_02_tighter_tolerance_takes_more_steps(self):
+        """TEST 2: step count grows as tol shrinks"""
+        steps = []
+        for tol in (1e-3, 1e-12):
+            core = ZBITQuantumCoreV2(n_qubits=self.n, verbose=False, engine="krylov")
+            core.psi = self.psi0.copy()
+            core.evolve(10.0, steps=5, tol=tol)
+            steps.append(core.evolve_report["steps"])
+        self.assertLess(steps[0], steps[1])
+
+    def test_03_rejections_from_a_coarse_start(self):
+        """TEST 3: a too-large first step is rejected and shrunk"""
+        core = ZBITQuantumCoreV2(n_qubits=self.n, verbose=False, engine="krylov", instrument=True)
+        core.psi = self.psi0.copy()
+        core.evolve(20.0, steps=1, tol=1e-10)
+        report = core.evolve_report
+        self.assertGreater(report["rejected_steps"], 0)
+        self.assertEqual(core.stats.counters["evolve.rejected_steps"], report["rejected_steps"])
+        self.assertLess(report["dt_min"], 20.0)
+        self.assertLess(np.linalg.norm(core.psi - self._exact(20.0)), 1e-9)
+
+    def test_04_fixed_mode_report_and_progress(self):
+        """TEST 4: fixed mode reports its dt; adaptive progress ends at 1000/1000"""
+        events = []
+        core = ZBITQuantumCoreV2(n_qubits=4, verbose=False, engine="dense",
+                                 on_progress=lambda op, done, total: events.append((done, total)))
+        core.evolve(1.0, steps=4)
+        self.assertEqual(core.evolve_report["mode"], "fixed")
+        self.assertEqual(core.evolve_report["dt_max"], 0.25)
+        events.clear()
+        core.evolve(1.0, steps=4, tol=1e-8, observables=["norm"])
+        self.assertEqual(events[-1], (1000, 1000))
+        self.assertAlmostEqual(core.history["observed_t"][-1], 1.0)
+        with self.assertRaises(ValueError):
+            core.evolve(1.0, tol=0)
+
+    def test_05_zero_negative_time_and_backend(self):
+        """TEST 5: t_final = 0 is a no-op, negative t_final runs backwards, other backends are rejected"""
+        core = ZBITQuantumCoreV2(n_qubits=self.n, verbose=False, engine="krylov")
+        core.psi = self.psi0.copy()
+        core.evolve(0.0, tol=1e-6)
+        self.assertEqual(core.evolve_report["steps"], 0)
+        np.testing.assert_allclose(core.psi, self.psi0, atol=1e-12)
+        core.evolve(-2.0, steps=4, tol=1e-8)
+        self.assertLess(core.evolve_report["dt_max"], 0.0)
+        self.assertLess(np.linalg.norm(core.psi - self._exact(-2.0)), 1e-7)
+
+        class OtherBackend(NumpyBackend):
+            name = "other"
+
+        core = ZBITQuantumCoreV2(n_qubits=3, verbose=False, backend=OtherBackend())
+        with self.assertRaises(ValueError):
+            core.evolve(1.0, tol=1e-6)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,77 @@
+"""
+ZBIT-CORE-v2 Backend Registry Tests
+Lazy optional dependencies + import-time budget
+"""
+import sys
+import os
+import json
+import subprocess
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from zbit_backends import BackendUnavailable, get_backend, progress, register_backend
+
+# Cold-start budget for `import zbit_core_v2_FIXED` (NumPy alone is ~0.1-0.2 s)
+IMPORT_BUDGET_S = 1.0
+HEAVY_MODULES = ("scipy", "torch", "tqdm")
+# Process pools belong to the disorder / trajectory / job modules, imported on first use
+POOL_MODULES = ("multiprocessing", "concurrent.futures.process")
+
+
+def _run(code: str) -> dict:
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True,
+                         text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+class TestBackends(unittest.TestCase):
+    """Heavy backends load on first use only"""
+
+    def test_01_import_budget(self):
+        """TEST 1: Core import pulls in NumPy only (no process pools) and stays within budget"""
+        result = _run(
+            "import sys, time, json\n"
+            "t = time.perf_counter()\n"
+            "import zbit_core_v2_FIXED\n"
+            "elapsed = time.perf_counter() - t\n"
+            f"heavy = [m for m in {HEAVY_MODULES + POOL_MODULES!r} if m in sys.modules]\n"
+            "print(json.dumps({'elapsed': elapsed, 'heavy': heavy}))\n")
+        self.assertEqual(result["heavy"], [])
+        self.assertLess(result["elapsed"], IMPORT_BUDGET_S)
+
+    def test_02_first_use_loading(self):
+        """TEST 2: Quiet runs never import tqdm or torch; scipy arrives with expm"""
+        result = _run(
+            "import sys, json\n"
+            "from zbit_core_v2_FIXED import ZBITQuantumCoreV2\n"
+            "core = ZBITQuantumCoreV2(n_qubits=3, verbose=False, engine='dense')\n"
+            "core.run_validation_suite()\n"
+            "before = 'scipy' in sys.modules\n"
+            "core.evolve(t_final=0.1, steps=2)\n"
+            "print(json.dumps({'before': before, 'scipy': 'scipy' in sys.modules,\n"
+            "                  'tqdm': 'tqdm' in sys.modules, 'torch': 'torch' in sys.modules}))\n")
+        self.assertEqual(result, {"before": False, "scipy": True, "tqdm": False, "torch": False})
+
+    def test_03_registry(self):
+        """TEST 3: Custom backends, unknown names and missing packages"""
+        calls = []
+        register_backend("test.counter", lambda: calls.append(1) or "loaded", replace=True)
+        self.assertEqual(get_backend("test.counter"), "loaded")
+        self.assertEqual(get_backend("test.counter"), "loaded")
+        self.assertEqual(len(calls), 1)
+        with self.assertRaises(KeyError):
+            get_backend("test.nope")
+        register_backend("test.missing", lambda: __import__("zbit_no_such_module"), replace=True)
+        with self.assertRaises(BackendUnavailable):
+            get_backend("test.missing")
+
+    def test_04_progress_disabled(self):
+        """TEST 4: Disabled progress returns the iterable untouched"""
+        items = range(3)
+        self.assertIs(progress(items, disable=True), items)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
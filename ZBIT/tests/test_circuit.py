@@ -0,0 +1,119 @@
+"""
+ZBIT-CORE-v2 Circuit Tests
+Gate API, parameter binding, Trotter layers and the fusion compiler
+"""
+import sys
+import os
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from zbit_core_v2_FIXED import ZBITQuantumCoreV2
+from zbit_backends import expm
+from zbit_circuit import Circuit, Parameter, PhaseVector, embed, execute, fuse
+from zbit_operators import chain_terms, to_dense
+
+
+def random_circuit(n, rng, depth=60):
+    circ = Circuit(n)
+    for _ in range(depth):
+        kind = rng.integers(6)
+        a, b = (int(q) for q in rng.choice(n, 2, replace=False))
+        if kind == 0:
+            circ.h(a)
+        elif kind == 1:
+            circ.cx(a, b)
+        elif kind == 2:
+            circ.rz(a, rng.normal())
+        elif kind == 3:
+            circ.rzz(a, b, rng.normal())
+        elif kind == 4:
+            circ.ry(a, rng.normal())
+        else:
+            circ.cz(a, b).t(b)
+    return circ
+
+
+class TestCircuit(unittest.TestCase):
+    """zbit_circuit and core.run_circuit()"""
+
+    def setUp(self):
+        self.rng = np.random.default_rng(4)
+        self.n = 7
+        self.psi = self.rng.normal(size=2**self.n) + 1j * self.rng.normal(size=2**self.n)
+
+    def test_01_fusion_preserves_the_state(self):
+        """TEST 1: fused programs match gate-by-gate execution for every block size"""
+        circ = random_circuit(self.n, self.rng)
+        ref = self.psi.copy()
+        execute(circ, ref)
+        for k in (2, 3, 4, 5):
+            with self.subTest(max_qubits=k):
+                psi = self.psi.copy()
+                report = execute(fuse(circ, k), psi)
+                np.testing.assert_allclose(psi, ref, atol=1e-12)
+                self.assertLessEqual(report["max_block_qubits"], k)
+                self.assertLess(report["passes"], report["gates"])
+
+    def test_02_diagonal_runs_become_phase_vectors(self):
+        """TEST 2: a wide run of diagonal gates costs one pass"""
+        circ = Circuit(self.n)
+        for q in range(self.n - 1):
+            circ.rzz(q, q + 1, 0.3).rz(q, 0.1)
+        circ.s(self.n - 1).cz(0, self.n - 1)
+        program = fuse(circ, 3)
+        self.assertEqual(program.passes, 1)
+        self.assertIsInstance(program.ops[0], PhaseVector)
+        ref = self.psi.copy()
+        execute(circ, ref)
+        psi = self.psi.copy()
+        execute(program, psi)
+        np.testing.assert_allclose(psi, ref, atol=1e-12)
+
+    def test_03_embed_order(self):
+        """TEST 3: embedding follows the first-qubit-most-significant convention"""
+        cx = np.eye(4)[[0, 1, 3, 2]]
+        reversed_cx = embed(cx, [1, 0], [0, 1])
+        np.testing.assert_array_equal(reversed_cx, np.eye(4)[[0, 3, 2, 1]])
+        np.testing.assert_array_equal(embed(np.diag([1, -1]), [2], [0, 2]), np.diag([1, -1, 1, -1]))
+
+    def test_04_parameters_and_trotter(self):
+        """TEST 4: parameters bind by name; second-order Trotter converges to expm"""
+        theta = Parameter("theta")
+        circ = Circuit(2).rx(0, theta).rzz(0, 1, theta)
+        self.assertEqual(circ.parameters, ["theta"])
+        with self.assertRaises(ValueError):
+            fuse(circ)
+        with self.assertRaises(ValueError):
+            circ.bind({})
+        bound = circ.bind({"theta": np.pi})
+        psi = np.array([1, 0, 0, 0], dtype=complex)
+        execute(bound, psi)
+        self.assertAlmostEqual(abs(psi[2]), 1.0)  # rx(pi) flips qubit 0 (MSB)
+        H = to_dense(self.n, chain_terms(self.n))
+        exact = expm(-1j * 0.5 * H) @ self.psi
+        errors = []
+        for steps in (5, 10):
+            psi = self.psi.copy()
+            execute(fuse(Circuit(self.n).trotter(chain_terms(self.n), 0.5 / steps, steps, order=2)), psi)
+            errors.append(np.linalg.norm(psi - exact))
+        self.assertLess(errors[1], errors[0] / 3.5)
+
+    def test_05_core(self):
+        """TEST 5: core.run_circuit() reports passes and agrees with core.apply_gate()"""
+        core = ZBITQuantumCoreV2(n_qubits=self.n, verbose=False, instrument=True)
+        twin = ZBITQuantumCoreV2(n_qubits=self.n, verbose=False)
+        circ = core.trotter_circuit(0.1, steps=2).h(0).cx(0, 3)
+        report = core.run_circuit(circ, max_fused_qubits=4)
+        for g in circ.gates:
+            twin.apply_gate(g.matrix, g.qubits)
+        np.testing.assert_allclose(core.psi, twin.psi, atol=1e-12)
+        self.assertEqual(report["gates"], len(circ))
+        self.assertEqual(core.stats.counters["circuit.passes"], report["passes"])
+        with self.assertRaises(ValueError):
+            core.run_circuit(Circuit(3))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,123 @@
+"""
+ZBIT-CORE-v2 Disk Cache Tests
+Content-addressed, memory-mapped, LRU-bounded persistence
+"""
+import sys
+import os
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from zbit_core_v2_FIXED import ZBITQuantumCoreV2
+from zbit_backends import expm
+from zbit_diskcache import DiskCache, cache_key
+from zbit_registry import clear_registry
+
+
+def _read_entry(args):
+    root, key = args
+    entry = DiskCache(root).get(key)
+    return float(np.sum(entry["x"]))
+
+
+class TestDiskCache(unittest.TestCase):
+    """Persistent cache of operators and factorizations"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        clear_registry()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_01_keys(self):
+        """TEST 1: Keys are canonical and version-sensitive"""
+        a = cache_key("hamiltonian", {"n": 4, "engine": "dense"}, "2.0.0")
+        b = cache_key("hamiltonian", {"engine": "dense", "n": 4}, "2.0.0")
+        c = cache_key("hamiltonian", {"n": 4, "engine": "dense"}, "2.0.1")
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, c)
+
+    def test_02_roundtrip_mmap(self):
+        """TEST 2: Entries reopen as read-only memory maps"""
+        cache = DiskCache(self.root)
+        x = np.arange(10, dtype=complex)
+        cache.put("ab" * 32, {"x": x}, meta={"shape": [10]})
+        entry = cache.get("ab" * 32)
+        self.assertIsInstance(entry["x"], np.memmap)
+        np.testing.assert_array_equal(entry["x"], x)
+        self.assertEqual(entry["meta"]["shape"], [10])
+        self.assertIsNone(cache.get("cd" * 32))
+
+    def test_03_lru_eviction(self):
+        """TEST 3: Least recently used entries are evicted first"""
+        cache = DiskCache(self.root, max_bytes=10**9)
+        keys = [f"{i:02d}" * 32 for i in range(3)]
+        for i, key in enumerate(keys):
+            cache.put(key, {"x": np.zeros(1000)})
+            os.utime(os.path.join(self.root, key[:2], key, "meta.json"), (i, i))
+        cache.get(keys[0])  # most recent now
+        entry_size = cache.size_bytes() // 3
+        cache.evict(max_bytes=2 * entry_size)
+        self.assertIn(keys[0], cache)
+        self.assertNotIn(keys[1], cache)
+        self.assertIn(keys[2], cache)
+
+    def test_04_concurrent_readers(self):
+        """TEST 4: Several processes read one entry concurrently"""
+        cache = DiskCache(self.root)
+        key = "ef" * 32
+        cache.put(key, {"x": np.ones(4096)})
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            sums = list(pool.map(_read_entry, [(self.root, key)] * 4))
+        self.assertEqual(sums, [4096.0] * 4)
+
+    def test_05_core_operator_and_eigenpairs(self):
+        """TEST 5: A fresh process-state core loads H and eigenpairs from disk"""
+        core = ZBITQuantumCoreV2(n_qubits=5, verbose=False, engine="dense", cache_dir=self.root)
+        evals, evecs = core.eigensystem()
+        H = np.array(core.H)
+        del core
+        clear_registry()
+        warm = ZBITQuantumCoreV2(n_qubits=5, verbose=False, engine="dense",
+                                 cache_dir=self.root, instrument=True)
+        np.testing.assert_array_equal(warm.H, H)
+        warm_evals, _ = warm.eigensystem()
+        np.testing.assert_array_equal(warm_evals, evals)
+        self.assertEqual(warm.stats.counters["hamiltonian.disk_hits"], 1)
+        self.assertEqual(warm.stats.counters["eigensystem.disk_hits"], 1)
+        np.testing.assert_allclose(H @ evecs[:, 0], evals[0] * evecs[:, 0], atol=1e-10)
+
+    def test_06_sparse_and_floquet(self):
+        """TEST 6: CSR operators and Floquet unitaries round-trip"""
+        core = ZBITQuantumCoreV2(n_qubits=4, verbose=False, engine="sparse", cache_dir=self.root)
+        psi = core.evolve(t_final=0.2, steps=2)
+        U = np.array(core.floquet_unitary(0.2))
+        clear_registry()
+        warm = ZBITQuantumCoreV2(n_qubits=4, verbose=False, engine="sparse", cache_dir=self.root)
+        self.assertFalse(warm.H.data.flags.owndata)  # view of the memory map
+        np.testing.assert_allclose(warm.evolve(t_final=0.2, steps=2), psi, atol=1e-12)
+        np.testing.assert_allclose(warm.floquet_unitary(0.2) @ warm._initial_state(), psi, atol=1e-10)
+        np.testing.assert_array_equal(warm.floquet_unitary(0.2), U)
+
+    def test_07_custom_operator_not_cached(self):
+        """TEST 7: a core with a custom H never writes under the default model's keys"""
+        custom = ZBITQuantumCoreV2(n_qubits=2, verbose=False, engine="dense", cache_dir=self.root)
+        M = np.diag([1.0, 2.0, 3.0, 4.0]).astype(complex)
+        custom.H = M
+        self.assertTrue(M.flags.writeable)
+        custom.floquet_unitary(0.1)
+        custom.eigensystem()
+        plain = ZBITQuantumCoreV2(n_qubits=2, verbose=False, engine="dense", cache_dir=self.root)
+        self.assertIsNot(plain._entry, custom._entry)
+        np.testing.assert_allclose(plain.floquet_unitary(0.1), expm(-0.1j * plain.H), atol=1e-12)
+        evals, _ = plain.eigensystem()
+        np.testing.assert_allclose(evals, np.linalg.eigvalsh(plain.H), atol=1e-12)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,73 @@
+"""
+ZBIT-CORE-v2 Disorder Ensemble Tests
+Parity sectors, gap ratios and spectral form factors over seeded realizations
+"""
+import sys
+import os
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from zbit_core_v2_FIXED import ZBITQuantumCoreV2
+from zbit_disorder import R_GOE, R_POISSON, DisorderEnsemble, gap_ratios, parity_blocks
+from zbit_lattice import chain, lattice_terms, square
+from zbit_operators import to_dense
+
+
+class TestDisorder(unittest.TestCase):
+    """DisorderEnsemble and core.disorder_ensemble()"""
+
+    def test_01_parity_blocks(self):
+        """TEST 1: the two sector spectra together are the full spectrum"""
+        terms = lattice_terms(square(2, 3), zz=[0.3, -1, 0.7, 0.2, 1.1, -0.4, 0.5], hx=0.8, xx=0.25)
+        blocks = parity_blocks(6, terms)
+        self.assertEqual([b.shape for b in blocks], [(32, 32), (32, 32)])
+        levels = np.sort(np.concatenate([np.linalg.eigvalsh(b) for b in blocks]))
+        np.testing.assert_allclose(levels, np.linalg.eigvalsh(to_dense(6, terms)), atol=1e-12)
+
+    def test_02_gap_ratio_limits(self):
+        """TEST 2: gap_ratios reproduces the Poisson mean on uncorrelated levels"""
+        rng = np.random.default_rng(0)
+        r = gap_ratios(np.sort(rng.random(200_000)))
+        self.assertAlmostEqual(r.mean(), R_POISSON, delta=0.005)
+        self.assertEqual(gap_ratios(np.arange(10.0), fraction=0.5).size, 4)
+
+    def test_03_chaotic_vs_localized(self):
+        """TEST 3: weak disorder gives GOE statistics, strong disorder Poisson"""
+        base = {"zz": 1.0, "hx": 0.6, "xx": 0.5}
+        times = np.concatenate([[0.0], np.logspace(-1, 3, 41)])
+        weak = DisorderEnsemble(chain(9), base, {"hx": 0.5}, times=times, seed=1).run(8)
+        strong = DisorderEnsemble(chain(9), base, {"hx": 8.0}, seed=1).run(8)
+        self.assertTrue(weak["sectors"])
+        self.assertAlmostEqual(weak["r_mean"], R_GOE, delta=0.03)
+        self.assertAlmostEqual(strong["r_mean"], R_POISSON, delta=0.03)
+        # K(0) = D per sector; the connected SFF starts at zero and plateaus near 1
+        np.testing.assert_allclose(weak["sff"][0], 2**8, rtol=0.01)
+        self.assertLess(weak["sff_connected"][0], 1.0)
+        self.assertAlmostEqual(weak["sff"][-10:].mean(), 1.0, delta=0.5)
+
+    def test_04_seeded_streaming_and_pool(self):
+        """TEST 4: stream() folds realizations in order; a process pool gives identical sums"""
+        kwargs = dict(couplings={"zz": 1.0}, disorder={"hx": 1.0, "zz": 0.3}, times=[0.5, 5.0], seed=7)
+        estimates = list(DisorderEnsemble(chain(6), **kwargs).stream(4))
+        self.assertEqual([e["realizations"] for e in estimates], [1, 2, 3, 4])
+        pooled = DisorderEnsemble(chain(6), n_workers=2, **kwargs).run(4)
+        self.assertAlmostEqual(pooled["r_mean"], estimates[-1]["r_mean"], places=12)
+        np.testing.assert_allclose(pooled["sff"], estimates[-1]["sff"], rtol=1e-12)
+        with self.assertRaises(ValueError):
+            DisorderEnsemble(chain(4), disorder={"hz": 1.0}, sectors=True)
+        self.assertFalse(DisorderEnsemble(chain(4), disorder={"hz": 1.0}).sectors)
+
+    def test_05_core(self):
+        """TEST 5: the core's default chain and its lattice model both run, seeded by the core"""
+        runs = [ZBITQuantumCoreV2(n_qubits=6, verbose=False, seed=3).disorder_ensemble(3) for _ in range(2)]
+        self.assertEqual(runs[0]["r_mean"], runs[1]["r_mean"])
+        core = ZBITQuantumCoreV2(lattice=square(2, 3), couplings={"hz": 0.2}, verbose=False)
+        result = core.disorder_ensemble(2, disorder={"zz": 1.0}, seed=0)
+        self.assertFalse(result["sectors"])
+        self.assertEqual(result["realizations"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,87 @@
+"""
+ZBIT-CORE-v2 Distributed State Tests
+Shared-memory slabs, local gates and global-qubit swaps against a single-process reference
+"""
+import sys
+import os
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from zbit_core_v2_FIXED import ZBITQuantumCoreV2
+from zbit_distributed import DistributedStateVector
+from zbit_kernels import apply_gate
+
+HADAMARD = np.array([[1, 1], [1, -1]]) / np.sqrt(2)
+
+
+class TestDistributedStateVector(unittest.TestCase):
+    """4 worker processes on one shared segment"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.n = 7
+        cls.rng = np.random.default_rng(3)
+        psi = cls.rng.normal(size=2**cls.n) + 1j * cls.rng.normal(size=2**cls.n)
+        cls.psi0 = psi / np.linalg.norm(psi)
+        cls.state = DistributedStateVector(cls.n, n_workers=4, psi=cls.psi0)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.state.close()
+
+    def test_01_random_circuit(self):
+        """TEST 1: random 1q/2q circuit matches the in-process kernels"""
+        ref = self.state.to_numpy()
+        for _ in range(25):
+            k = int(self.rng.integers(1, 3))
+            qubits = [int(q) for q in self.rng.choice(self.n, k, replace=False)]
+            gate = self.rng.normal(size=(2**k, 2**k)) + 1j * self.rng.normal(size=(2**k, 2**k))
+            self.state.apply_gate(gate, qubits)
+            apply_gate(ref, gate, qubits)
+        np.testing.assert_allclose(self.state.to_numpy(), ref, atol=1e-10)
+        self.assertGreater(self.state.stats.global_swaps, 0)
+        self.assertAlmostEqual(self.state.norm(), np.linalg.norm(ref), places=8)
+
+    def test_02_global_diagonal_needs_no_swap(self):
+        """TEST 2: diagonal gate on a global qubit scales slabs without exchange"""
+        global_qubit = self.state.layout[0]
+        swaps = self.state.stats.global_swaps
+        ref = self.state.to_numpy()
+        gate = np.diag([1.0, np.exp(0.7j)])
+        self.state.apply_gate(gate, [global_qubit])
+        apply_gate(ref, gate, [global_qubit])
+        self.assertEqual(self.state.stats.global_swaps, swaps)
+        np.testing.assert_allclose(self.state.to_numpy(), ref, atol=1e-12)
+
+    def test_03_validation(self):
+        """TEST 3: worker counts and gate shapes are checked"""
+        with self.assertRaises(ValueError):
+            DistributedStateVector(4, n_workers=3)
+        with self.assertRaises(ValueError):
+            DistributedStateVector(2, n_workers=4)
+        with self.assertRaises(ValueError):
+            self.state.apply_gate(np.eye(4), [0])
+
+
+class TestCoreRoundTrip(unittest.TestCase):
+    """from_core / write_to"""
+
+    def test_01_bell_pair_across_slabs(self):
+        """TEST 1: H(0), CNOT(0, 4) with qubit 0 global gives a Bell pair"""
+        core = ZBITQuantumCoreV2(n_qubits=5, verbose=False, operations=())
+        with DistributedStateVector.from_core(core, n_workers=2) as state:
+            state.apply_gate(HADAMARD, [0])
+            state.apply_gate(np.eye(4)[[0, 1, 3, 2]], [0, 4])
+            state.write_to(core)
+        self.assertIsNone(state.psi)
+        expected = np.zeros(32, dtype=complex)
+        expected[[0b00000, 0b10001]] = 1 / np.sqrt(2)
+        np.testing.assert_allclose(core.psi, expected, atol=1e-15)
+        with self.assertRaises(RuntimeError):
+            state.apply_gate(HADAMARD, [1])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,94 @@
+"""
+ZBIT-CORE-v2 Dynamics Diagnostics Tests
+Return probability, Loschmidt echo and energy variance from one batched propagation
+"""
+import sys
+import os
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from zbit_core_v2_FIXED import ZBITQuantumCoreV2
+from zbit_backends import expm
+from zbit_operators import (MatrixFreeHamiltonian, chain_terms, krylov_expm_multiply,
+                            krylov_expm_multiply_batch, to_dense)
+
+
+class TestDynamics(unittest.TestCase):
+    """core.dynamics()"""
+
+    def setUp(self):
+        self.n = 6
+        self.psi0 = np.full(2**self.n, 2**(-self.n / 2), dtype=complex)
+        self.H = to_dense(self.n, chain_terms(self.n))
+        self.V = to_dense(self.n, [(1.0, 0, 1 << b) for b in range(self.n)])
+
+    def test_01_matches_exact(self):
+        """TEST 1: every diagnostic matches dense expm on every engine"""
+        eps, t_final, steps = 0.05, 2.0, 8
+        times = np.linspace(0, t_final, steps + 1)
+        fwd = [expm(-1j * t * self.H) @ self.psi0 for t in times]
+        pert = [expm(-1j * t * (self.H + eps * self.V)) @ self.psi0 for t in times]
+        for engine in ("dense", "sparse", "matrix_free"):
+            with self.subTest(engine=engine):
+                core = ZBITQuantumCoreV2(n_qubits=self.n, verbose=False, engine=engine)
+                core.psi = self.psi0.copy()
+                result = core.dynamics(t_final, steps=steps, epsilon=eps)
+                np.testing.assert_allclose(result["times"], times)
+                np.testing.assert_allclose(
+                    result["return_probability"], [abs(np.vdot(self.psi0, p))**2 for p in fwd], atol=1e-10)
+                np.testing.assert_allclose(
+                    result["loschmidt_echo"], [abs(np.vdot(a, b))**2 for a, b in zip(fwd, pert)], atol=1e-10)
+                E = [np.vdot(p, self.H @ p).real for p in fwd]
+                var = [np.vdot(p, self.H @ self.H @ p).real - e**2 for p, e in zip(fwd, E)]
+                np.testing.assert_allclose(result["energy"], E, atol=1e-10)
+                np.testing.assert_allclose(result["energy_variance"], var, atol=1e-10)
+                np.testing.assert_allclose(core.psi, fwd[-1], atol=1e-10)
+
+    def test_02_conserved_quantities(self):
+        """TEST 2: energy and variance are constants of the motion; epsilon=0 gives echo 1"""
+        core = ZBITQuantumCoreV2(n_qubits=self.n, verbose=False, engine="krylov")
+        core.psi = self.psi0.copy()
+        result = core.dynamics(3.0, steps=6, epsilon=0.0)
+        np.testing.assert_allclose(result["loschmidt_echo"], 1.0, atol=1e-12)
+        np.testing.assert_allclose(result["energy"], result["energy"][0], atol=1e-10)
+        np.testing.assert_allclose(result["energy_variance"], result["energy_variance"][0], atol=1e-10)
+        self.assertEqual(result["return_probability"][0], 1.0)
+
+    def test_03_custom_perturbation(self):
+        """TEST 3: bitmask terms and operators are both accepted as V"""
+        terms = [(0.7, 1 << 2, 0)]
+        a = ZBITQuantumCoreV2(n_qubits=self.n, verbose=False, engine="matrix_free")
+        b = ZBITQuantumCoreV2(n_qubits=self.n, verbose=False, engine="matrix_free")
+        ra = a.dynamics(1.0, steps=4, perturbation=terms, epsilon=0.2)
+        rb = b.dynamics(1.0, steps=4, perturbation=to_dense(self.n, terms), epsilon=0.2)
+        np.testing.assert_allclose(ra["loschmidt_echo"], rb["loschmidt_echo"], atol=1e-12)
+        self.assertLess(ra["loschmidt_echo"][-1], 1.0)
+
+    def test_04_batched_krylov(self):
+        """TEST 4: the lockstep block Lanczos equals per-column Krylov, zero columns included"""
+        op = MatrixFreeHamiltonian(self.n, chain_terms(self.n))
+        rng = np.random.default_rng(2)
+        block = rng.normal(size=(2**self.n, 3)) + 1j * rng.normal(size=(2**self.n, 3))
+        block[:, 2] = 0
+        out, errors, H_block = krylov_expm_multiply_batch(op.dot, block, 0.4, 20)
+        for c in range(2):
+            ref, _ = krylov_expm_multiply(op.dot, block[:, c], 0.4, 20)
+            np.testing.assert_allclose(out[:, c], ref, atol=1e-12)
+        np.testing.assert_array_equal(out[:, 2], 0)
+        np.testing.assert_allclose(H_block, self.H @ block, atol=1e-12)
+        self.assertTrue(np.all(errors < 1e-10))
+
+    def test_05_large_steps(self):
+        """TEST 5: steps far beyond one Lanczos range are substepped to the exact result"""
+        core = ZBITQuantumCoreV2(n_qubits=self.n, verbose=False, engine="krylov", instrument=True)
+        core.psi = self.psi0.copy()
+        result = core.dynamics(20.0, steps=4)
+        exact = [abs(np.vdot(self.psi0, expm(-1j * t * self.H) @ self.psi0))**2 for t in result["times"]]
+        np.testing.assert_allclose(result["return_probability"], exact, atol=1e-9)
+        self.assertGreater(core.stats.counters["dynamics.krylov_substeps"], 4)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,88 @@
+"""
+ZBIT-CORE-v2 Entanglement Tests
+All-cut Schmidt spectra, entropies, randomized SVD and the evolve observable hook
+"""
+import sys
+import os
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from zbit_core_v2_FIXED import ZBITQuantumCoreV2
+from zbit_entanglement import entanglement_profile, entropies, randomized_svd, schmidt_spectra
+
+
+class TestEntanglement(unittest.TestCase):
+    """Entanglement diagnostics"""
+
+    def setUp(self):
+        self.rng = np.random.default_rng(4)
+
+    def _random_state(self, n):
+        psi = self.rng.normal(size=2**n) + 1j * self.rng.normal(size=2**n)
+        return psi / np.linalg.norm(psi)
+
+    def test_01_spectra_match_direct_svd(self):
+        """TEST 1: every cut equals the SVD of psi reshaped at that cut"""
+        for n in (2, 5, 8):
+            psi = self._random_state(n)
+            for k, s in enumerate(schmidt_spectra(psi), start=1):
+                direct = np.linalg.svd(psi.reshape(2**k, -1), compute_uv=False)
+                np.testing.assert_allclose(s[:direct.size], direct, atol=1e-7)
+
+    def test_02_known_states(self):
+        """TEST 2: product state has zero entropy, a Bell pair across cut 1 has ln 2"""
+        core = ZBITQuantumCoreV2(n_qubits=4, verbose=False, operations=())
+        profile = core.entanglement()
+        np.testing.assert_allclose(profile["von_neumann"], 0.0, atol=1e-12)
+        core.apply_gate(np.array([[1, 1], [1, -1]]) / np.sqrt(2), 0)
+        core.apply_gate(np.eye(4)[[0, 1, 3, 2]], [0, 3])
+        profile = core.entanglement(renyi=(2, np.inf))
+        np.testing.assert_allclose(profile["von_neumann"], [np.log(2)] * 3, atol=1e-12)
+        np.testing.assert_allclose(profile["renyi_2"], [np.log(2)] * 3, atol=1e-12)
+        np.testing.assert_allclose(profile["renyi_inf"], [np.log(2)] * 3, atol=1e-12)
+        np.testing.assert_allclose(profile["spectrum"][1], [np.log(2)] * 2, atol=1e-12)
+
+    def test_03_renyi_limits(self):
+        """TEST 3: Renyi entropies are ordered S_1 >= S_2 >= S_inf"""
+        s = np.sort(self.rng.random(8))[::-1]
+        e = entropies(s, renyi=(1, 2, np.inf))
+        self.assertEqual(e["renyi_1"], e["von_neumann"])
+        self.assertGreaterEqual(e["von_neumann"], e["renyi_2"])
+        self.assertGreaterEqual(e["renyi_2"], e["renyi_inf"])
+
+    def test_04_randomized_svd(self):
+        """TEST 4: randomized SVD recovers the leading values of a low-rank matrix"""
+        A = (self.rng.normal(size=(200, 6)) @ self.rng.normal(size=(6, 300))).astype(complex)
+        _, s, _ = randomized_svd(A, 6)
+        np.testing.assert_allclose(s, np.linalg.svd(A, compute_uv=False)[:6], rtol=1e-10)
+        psi = self._random_state(10)
+        exact = entanglement_profile(psi)
+        approx = entanglement_profile(psi, rank=32)
+        self.assertEqual(len(approx["spectrum"][4]), 32)
+        np.testing.assert_allclose(approx["von_neumann"][:4], exact["von_neumann"][:4], atol=1e-10)
+
+    def test_05_evolve_observable(self):
+        """TEST 5: evolve samples entanglement every observe_every steps"""
+        core = ZBITQuantumCoreV2(n_qubits=6, verbose=False, engine="krylov")
+        core.evolve(2.0, steps=8, observables=["entanglement", "norm"], observe_every=2)
+        self.assertEqual(core.history["observed_t"], [0.5, 1.0, 1.5, 2.0])
+        growth = [row[2] for row in core.history["entanglement"]]
+        self.assertEqual(len(growth), 4)
+        self.assertLess(growth[0], growth[-1])
+        np.testing.assert_allclose(profile_half(core.psi), core.history["entanglement"][-1][2])
+        np.testing.assert_allclose(core.history["norm"], 1.0)
+        custom = ZBITQuantumCoreV2(n_qubits=4, verbose=False, engine="dense")
+        custom.evolve(1.0, steps=2, observables={"p0": lambda psi: abs(psi[0])**2})
+        self.assertEqual(len(custom.history["p0"]), 2)
+        with self.assertRaises(ValueError):
+            custom.evolve(1.0, steps=1, observables=["magic"])
+
+
+def profile_half(psi):
+    return entanglement_profile(psi, spectrum=False)["von_neumann"][2]
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
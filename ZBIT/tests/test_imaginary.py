@@ -0,0 +1,92 @@
+"""
+ZBIT-CORE-v2 Imaginary-Time Tests
+Ground-state projection and TPQ thermal averages against exact diagonalization
+"""
+import sys
+import os
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from zbit_core_v2_FIXED import ZBITQuantumCoreV2
+from zbit_backends import expm
+from zbit_operators import MatrixFreeHamiltonian, chain_terms, krylov_expm_multiply, to_dense
+from zbit_pauli import PauliString
+
+
+class TestImaginaryTime(unittest.TestCase):
+    """core.ground_state() and core.thermal()"""
+
+    def setUp(self):
+        self.n = 6
+        self.H = to_dense(self.n, chain_terms(self.n))
+        self.evals, self.evecs = np.linalg.eigh(self.H)
+
+    def test_01_krylov_coefficient(self):
+        """TEST 1: coeff=-1 gives exp(-tau H) psi"""
+        rng = np.random.default_rng(0)
+        psi = rng.normal(size=2**self.n) + 1j * rng.normal(size=2**self.n)
+        op = MatrixFreeHamiltonian(self.n, chain_terms(self.n))
+        out, err = krylov_expm_multiply(op.dot, psi, 0.7, 30, coeff=-1)
+        np.testing.assert_allclose(out, expm(-0.7 * self.H) @ psi, rtol=1e-10)
+        self.assertLess(err, 1e-8)
+
+    def test_02_ground_state_every_engine(self):
+        """TEST 2: converged energy and state match eigh on every engine"""
+        # n=4: the lowest doublet is split by ~0.04, so projection converges by tau ~ 300
+        evals, evecs = np.linalg.eigh(to_dense(4, chain_terms(4)))
+        for engine in ("dense", "sparse", "krylov", "matrix_free"):
+            with self.subTest(engine=engine):
+                core = ZBITQuantumCoreV2(n_qubits=4, verbose=False, engine=engine, seed=1)
+                result = core.ground_state(dtau=1.0, tol=1e-13, max_steps=2000)
+                self.assertTrue(result["converged"])
+                self.assertAlmostEqual(result["energy"], evals[0], places=10)
+                self.assertLess(result["variance"], 1e-8)
+                self.assertGreater(abs(np.vdot(evecs[:, 0], core.psi)), 1 - 1e-8)
+                self.assertLessEqual(result["energies"][-1], result["energies"][0])
+
+    def test_03_thermal_matches_exact(self):
+        """TEST 3: TPQ energy, ln Z and <Z0 Z1> follow the canonical ensemble"""
+        betas = [0.0, 0.5, 1.0, 2.0]
+        core = ZBITQuantumCoreV2(n_qubits=self.n, verbose=False, engine="krylov")
+        ZZ = PauliString.from_label("ZZ" + "I" * (self.n - 2))
+        result = core.thermal(betas, samples=16, observables={"zz": ZZ}, seed=3)
+        ZZ_diag = self.evecs.conj().T @ ZZ.to_dense() @ self.evecs
+        for b, beta in enumerate(betas):
+            p = np.exp(-beta * (self.evals - self.evals[0]))
+            Z = p.sum()
+            p /= Z
+            E = p @ self.evals
+            self.assertAlmostEqual(result["energy"][b], E, delta=0.05 * np.ptp(self.evals) / 4)
+            self.assertAlmostEqual(result["observables"]["zz"][b], p @ np.diag(ZZ_diag).real, delta=0.05)
+            self.assertAlmostEqual(result["log_z"][b], np.log(Z) - beta * self.evals[0], delta=0.15)
+        C = result["specific_heat"]
+        self.assertEqual(C[0], 0.0)
+        self.assertTrue(np.all(C >= 0))
+
+    def test_04_validation_and_state(self):
+        """TEST 4: set_state=False keeps psi; bad grids are rejected"""
+        core = ZBITQuantumCoreV2(n_qubits=4, verbose=False, engine="dense", seed=2)
+        before = core.psi.copy()
+        core.ground_state(set_state=False, max_steps=3)
+        np.testing.assert_array_equal(core.psi, before)
+        with self.assertRaises(ValueError):
+            core.thermal([1.0, 0.5])
+        with self.assertRaises(ValueError):
+            core.ground_state(dtau=0)
+
+    def test_05_dense_thermal_keeps_shared_cache(self):
+        """TEST 5: a dense thermal sweep leaves the shared eigensystem / Floquet entries alone"""
+        core = ZBITQuantumCoreV2(n_qubits=4, verbose=False, engine="dense")
+        evals, _ = core.eigensystem()
+        U = core.floquet_unitary(0.1)
+        # Uneven grid: every interval is a different tau
+        result = core.thermal(np.r_[0.0, np.geomspace(0.05, 3.0, 12)], samples=2, seed=1)
+        self.assertIs(core._entry.cached("eigensystem")[0], evals)
+        self.assertIs(core._entry.cached(("expm", 0.1)), U)
+        self.assertTrue(np.all(np.isfinite(result["energy"])))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,77 @@
+"""
+ZBIT-CORE-v2 Instrumentation Tests
+Phase timers, counters, callback hook and profile capture
+"""
+import sys
+import os
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from zbit_core_v2_FIXED import ZBITQuantumCoreV2
+from zbit_instrumentation import Instrumentation, NULL_INSTRUMENTATION, make_instrumentation
+from zbit_registry import clear_registry
+
+
+class TestInstrumentation(unittest.TestCase):
+    """Instrumentation of the core hot paths"""
+
+    def setUp(self):
+        """Fresh registry so every core builds its own H"""
+        clear_registry()
+
+    def test_01_disabled_by_default(self):
+        """TEST 1: Default core uses the no-op instrumentation"""
+        core = ZBITQuantumCoreV2(n_qubits=4, verbose=False)
+        self.assertIs(core.instrumentation, NULL_INSTRUMENTATION)
+        core.evolve(t_final=0.1, steps=3)
+        self.assertEqual(core.stats.timers, {})
+
+    def test_02_evolve_phases(self):
+        """TEST 2: evolve records every phase and step counter"""
+        core = ZBITQuantumCoreV2(n_qubits=4, verbose=False, instrument=True)
+        core.evolve(t_final=0.1, steps=5)
+        timers = core.stats.timers
+        for name in ("hamiltonian", "hamiltonian.dense", "evolve", "evolve.expm",
+                     "evolve.matvec", "evolve.normalize", "evolve.energy", "evolve.progress"):
+            self.assertIn(name, timers)
+        self.assertEqual(timers["evolve.expm"].calls, 5)
+        self.assertEqual(core.stats.counters["evolve.steps"], 5)
+        self.assertEqual(core.stats.counters["hamiltonian.terms"], 3 + 4 + 3)
+
+    def test_03_callback_hook(self):
+        """TEST 3: on_phase callback sees otoc and validation phases"""
+        seen = []
+        core = ZBITQuantumCoreV2(n_qubits=4, verbose=False,
+                                 on_phase=lambda name, elapsed: seen.append(name))
+        core.otoc(t_max=0.5, num_times=3)
+        core.run_validation_suite()
+        self.assertEqual(seen.count("otoc.expm"), 3)
+        self.assertIn("validation", seen)
+        self.assertIn("validation.Energy Bounds", seen)
+
+    def test_04_profile_capture(self):
+        """TEST 4: cProfile and tracemalloc capture per run"""
+        core = ZBITQuantumCoreV2(n_qubits=4, verbose=False, profile="cprofile,tracemalloc")
+        core.evolve(t_final=0.1, steps=2)
+        profile = core.stats.profiles["evolve"]
+        self.assertIn("expm", profile["cprofile"])
+        self.assertGreater(profile["tracemalloc_peak_bytes"], 0)
+
+    def test_05_bad_profile_mode(self):
+        """TEST 5: Unknown profile modes are rejected"""
+        with self.assertRaises(ValueError):
+            make_instrumentation(profile="perf")
+
+    def test_06_shared_instrumentation(self):
+        """TEST 6: One Instrumentation can aggregate several cores"""
+        instr = Instrumentation()
+        for n in (3, 4):
+            core = ZBITQuantumCoreV2(n_qubits=n, verbose=False, instrument=instr)
+            core.evolve(t_final=0.1, steps=1)
+        self.assertEqual(instr.stats().timers["hamiltonian"].calls, 2)
+        self.assertIn("hamiltonian", instr.stats().as_dict()["timers"])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
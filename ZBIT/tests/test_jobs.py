@@ -0,0 +1,107 @@
+"""
+ZBIT-CORE-v2 Async Job Service Tests
+Local process pool, priorities, progress, dedup and cancellation
+"""
+import sys
+import os
+import asyncio
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from zbit_core_v2_FIXED import ZBITQuantumCoreV2
+from zbit_jobs import JobService
+
+
+class TestJobService(unittest.IsolatedAsyncioTestCase):
+    """Everything runs on localhost worker processes"""
+
+    async def asyncSetUp(self):
+        self.events = []
+        self.service = JobService(max_workers=1, on_event=self.events.append)
+        await self.service.start()
+
+    async def asyncTearDown(self):
+        await self.service.close()
+
+    async def test_01_evolve_matches_core(self):
+        """TEST 1: Awaited evolve result equals an in-process run"""
+        job = await self.service.submit_evolve(n_qubits=4, t_final=0.5, steps=10, engine="dense")
+        result = await job
+        core = ZBITQuantumCoreV2(n_qubits=4, verbose=False, engine="dense")
+        expected = await asyncio.to_thread(core.evolve, 0.5, 10)
+        np.testing.assert_allclose(result["psi"], expected, atol=1e-12)
+        self.assertEqual(len(result["energy"]), 10)
+
+    async def test_02_progress_events(self):
+        """TEST 2: Progress events stream until done"""
+        job = await self.service.submit_otoc(n_qubits=3, num_times=4)
+        kinds = [event.kind async for event in job.events()]
+        self.assertEqual(kinds[0], "queued")
+        self.assertIn("progress", kinds)
+        self.assertEqual(kinds[-1], "done")
+        self.assertEqual(len((await job)["times"]), 4)
+
+    async def test_03_dedup(self):
+        """TEST 3: Identical in-flight requests share one job"""
+        a = await self.service.submit_evolve(n_qubits=3, t_final=0.2, steps=5)
+        b = await self.service.submit_evolve(n_qubits=3, t_final=0.2, steps=5)
+        c = await self.service.submit_evolve(n_qubits=3, t_final=0.2, steps=6)
+        self.assertIs(a, b)
+        self.assertIsNot(a, c)
+        await asyncio.gather(a, c)
+
+    async def test_04_priorities(self):
+        """TEST 4: Higher priority queued jobs start first"""
+        blocker = await self.service.submit_evolve(n_qubits=3, t_final=0.1, steps=200)
+        low = await self.service.submit_evolve(n_qubits=3, t_final=0.1, steps=2, priority=0)
+        high = await self.service.submit_evolve(n_qubits=3, t_final=0.1, steps=3, priority=9)
+        await asyncio.gather(blocker, low, high)
+        started = [e.job_id for e in self.events if e.kind == "started"]
+        self.assertLess(started.index(high.id), started.index(low.id))
+
+    async def test_05_cancel_queued_and_running(self):
+        """TEST 5: Queued jobs drop immediately, running jobs stop at the next step"""
+        running = await self.service.submit_sweep(n_qubits=4, param="t_final", values=[1.0] * 50,
+                                                  steps=200, engine="dense")
+        queued = await self.service.submit_evolve(n_qubits=3, t_final=0.1, steps=2)
+        async for event in running.events():
+            if event.kind == "progress":
+                break
+        self.assertTrue(queued.cancel())
+        self.assertTrue(running.cancel())
+        for job in (queued, running):
+            with self.assertRaises(asyncio.CancelledError):
+                await job
+        self.assertEqual(running.status, "cancelled")
+
+    async def test_06_sweep(self):
+        """TEST 6: Sweeps return one result per value"""
+        job = await self.service.submit_sweep(n_qubits=3, param="steps", values=[2, 4], t_final=0.2)
+        results = await job
+        self.assertEqual([r["value"] for r in results], [2, 4])
+        self.assertEqual([len(r["energy"]) for r in results], [2, 4])
+
+    async def test_07_resubmit_while_cancelling(self):
+        """TEST 7: An identical submit after cancelling a running job starts a fresh job"""
+        kwargs = dict(n_qubits=4, param="t_final", values=[1.0] * 50, steps=200, engine="dense")
+        running = await self.service.submit_sweep(**kwargs)
+        async for event in running.events():
+            if event.kind == "progress":
+                break
+        self.assertTrue(running.cancel())
+        fresh = await self.service.submit_sweep(**kwargs)
+        self.assertIsNot(fresh, running)
+        self.assertIs(await self.service.submit_sweep(**kwargs), fresh)
+        with self.assertRaises(asyncio.CancelledError):
+            await running
+        self.assertFalse(fresh.cancel())   # one subscriber left
+        self.assertTrue(fresh.cancel())
+        with self.assertRaises(asyncio.CancelledError):
+            await fresh
+        self.assertEqual(fresh.status, "cancelled")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
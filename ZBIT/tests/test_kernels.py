@@ -0,0 +1,108 @@
+"""
+ZBIT-CORE-v2 Kernel Tests
+Chunked multi-threaded 1q / 2q / diagonal updates against dense references
+"""
+import sys
+import os
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import zbit_kernels
+from zbit_kernels import (apply_1q, apply_2q, apply_diagonal, apply_gate, benchmark_scaling,
+                          get_num_threads, set_num_threads)
+
+
+def embed(gate, qubits, n):
+    """Dense 2^n operator of gate acting on qubits (first listed is most significant)"""
+    k = len(qubits)
+    dim = 2**n
+    U = np.zeros((dim, dim), dtype=complex)
+    bits = [n - 1 - q for q in qubits]
+    for col in range(dim):
+        sub_in = sum(((col >> b) & 1) << (k - 1 - j) for j, b in enumerate(bits))
+        rest = col & ~sum(1 << b for b in bits)
+        for sub_out in range(2**k):
+            row = rest | sum(((sub_out >> (k - 1 - j)) & 1) << b for j, b in enumerate(bits))
+            U[row, col] += gate[sub_out, sub_in]
+    return U
+
+
+class TestKernels(unittest.TestCase):
+    """In-place kernels on small and chunked vectors"""
+
+    def setUp(self):
+        self.rng = np.random.default_rng(7)
+        self.threads = get_num_threads()
+        self.chunk = zbit_kernels.CHUNK_ELEMS, zbit_kernels.PARALLEL_MIN_ELEMS
+
+    def tearDown(self):
+        set_num_threads(self.threads)
+        zbit_kernels.CHUNK_ELEMS, zbit_kernels.PARALLEL_MIN_ELEMS = self.chunk
+
+    def _state(self, n):
+        return self.rng.normal(size=2**n) + 1j * self.rng.normal(size=2**n)
+
+    def _gate(self, k):
+        return self.rng.normal(size=(2**k, 2**k)) + 1j * self.rng.normal(size=(2**k, 2**k))
+
+    def test_01_single_qubit(self):
+        """TEST 1: apply_1q matches the embedded operator on every qubit"""
+        n = 5
+        for q in range(n):
+            psi, gate = self._state(n), self._gate(1)
+            expected = embed(gate, [q], n) @ psi
+            np.testing.assert_allclose(apply_1q(psi, gate, q), expected, atol=1e-12)
+
+    def test_02_two_qubit_any_order(self):
+        """TEST 2: apply_2q matches for every ordered qubit pair"""
+        n = 4
+        for q1 in range(n):
+            for q2 in range(n):
+                if q1 == q2:
+                    continue
+                psi, gate = self._state(n), self._gate(2)
+                expected = embed(gate, [q1, q2], n) @ psi
+                np.testing.assert_allclose(apply_2q(psi, gate, (q1, q2)), expected, atol=1e-12)
+
+    def test_03_threaded_chunks(self):
+        """TEST 3: many small chunks on a 4-thread pool give identical results"""
+        n = 12
+        psi = self._state(n)
+        gates = [(self._gate(1), [0]), (self._gate(1), [11]), (self._gate(2), [0, 11]),
+                 (self._gate(2), [7, 3])]
+        serial = psi.copy()
+        for gate, qubits in gates:
+            apply_gate(serial, gate, qubits)
+        zbit_kernels.CHUNK_ELEMS, zbit_kernels.PARALLEL_MIN_ELEMS = 64, 128
+        set_num_threads(4)
+        threaded = psi.copy()
+        for gate, qubits in gates:
+            apply_gate(threaded, gate, qubits)
+        diag = np.exp(1j * self.rng.normal(size=2**n))
+        np.testing.assert_allclose(apply_diagonal(threaded, diag), diag * serial, atol=1e-12)
+
+    def test_04_validation(self):
+        """TEST 4: bad arguments raise ValueError"""
+        psi = self._state(3)
+        with self.assertRaises(ValueError):
+            apply_1q(psi, self._gate(1), 3)
+        with self.assertRaises(ValueError):
+            apply_2q(psi, self._gate(2), (1, 1))
+        with self.assertRaises(ValueError):
+            apply_gate(psi, self._gate(3), (0, 1, 2))
+        with self.assertRaises(ValueError):
+            apply_diagonal(psi, np.ones(4))
+        with self.assertRaises(ValueError):
+            set_num_threads(0)
+
+    def test_05_benchmark(self):
+        """TEST 5: benchmark reports speedup and efficiency per thread count"""
+        rows = benchmark_scaling([10], threads=[1], repeats=1)[10]
+        self.assertAlmostEqual(rows[1]["efficiency"], 1.0)
+        self.assertGreater(rows[1]["seconds"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,100 @@
+"""
+ZBIT-CORE-v2 Lattice Tests
+Geometries, per-bond / per-site couplings and the lattice-aware core
+"""
+import sys
+import os
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from zbit_core_v2_FIXED import ZBITQuantumCoreV2
+from zbit_lattice import chain, chain_couplings, cubic, geometry_of, graph, ladder, lattice_terms, square
+from zbit_operators import chain_terms, to_dense
+
+SX = np.array([[0, 1], [1, 0]], dtype=complex)
+SZ = np.diag([1.0, -1.0]).astype(complex)
+
+
+def kron_at(n, ops):
+    """Tensor product with ops[site] on the given sites (site 0 leftmost)"""
+    out = np.ones((1, 1), dtype=complex)
+    for i in range(n):
+        out = np.kron(out, ops.get(i, np.eye(2)))
+    return out
+
+
+class TestLattice(unittest.TestCase):
+    """zbit_lattice and ZBITQuantumCoreV2(lattice=...)"""
+
+    def test_01_bond_counts(self):
+        """TEST 1: open / periodic bond counts without duplicate wraps"""
+        self.assertEqual(len(chain(5).edges), 4)
+        self.assertEqual(len(chain(5, periodic=True).edges), 5)
+        self.assertEqual(len(chain(2, periodic=True).edges), 1)
+        self.assertEqual(len(ladder(3).edges), 7)
+        self.assertEqual(len(ladder(4, periodic=True).edges), 12)
+        self.assertEqual(len(square(3, 3).edges), 12)
+        self.assertEqual(len(square(3, 3, periodic=True).edges), 18)
+        self.assertEqual(len(square(2, 2, periodic=True).edges), 4)
+        self.assertEqual(len(cubic(2, 2, 2).edges), 12)
+        self.assertEqual(square(2, 3).edges, ((0, 1), (0, 3), (1, 2), (1, 4), (2, 5), (3, 4), (4, 5)))
+        with self.assertRaises(ValueError):
+            graph(3, [(0, 3)])
+
+    def test_02_chain_reproduces_default_model(self):
+        """TEST 2: XX on the first four bonds of chain(n) gives chain_terms(n)"""
+        n = 7
+        terms = lattice_terms(chain(n), **chain_couplings(n))
+        self.assertEqual(sorted(terms), sorted(chain_terms(n)))
+
+    def test_03_couplings_against_kron(self):
+        """TEST 3: per-bond and per-site couplings match an explicit kron construction"""
+        lat = graph(4, [(0, 1), (1, 2), (2, 3), (3, 0), (0, 2)], name="kite")
+        zz = [1.0, -0.5, 0.25, 0.75, 2.0]
+        hx = {0: 0.3, 3: -0.7}
+        xx = {(2, 0): 0.4}
+        hz = [0.1, 0.2, 0.3, 0.4]
+        H = sum(J * kron_at(4, {i: SZ, j: SZ}) for J, (i, j) in zip(zz, lat.edges))
+        H = H + 0.3 * kron_at(4, {0: SX}) - 0.7 * kron_at(4, {3: SX}) + 0.4 * kron_at(4, {0: SX, 2: SX})
+        H = H + sum(h * kron_at(4, {i: SZ}) for i, h in enumerate(hz))
+        terms = lattice_terms(lat, zz=zz, hx=hx, xx=xx, hz=hz)
+        np.testing.assert_allclose(to_dense(4, terms), H, atol=1e-14)
+        with self.assertRaises(ValueError):
+            lattice_terms(lat, xx={(1, 3): 1.0})
+        with self.assertRaises(ValueError):
+            lattice_terms(lat, zz=[1.0, 2.0])
+
+    def test_04_core_engines_agree(self):
+        """TEST 4: a 2x3 square lattice core builds the same H on every engine"""
+        lat = square(2, 3, periodic=True)
+        couplings = {"zz": 1.0, "hx": 0.5, "xx": 0.2}
+        ref = to_dense(lat.n_sites, lattice_terms(lat, **couplings))
+        psi = np.random.default_rng(0).normal(size=2**lat.n_sites).astype(complex)
+        for engine in ("dense", "sparse", "krylov", "matrix_free"):
+            with self.subTest(engine=engine):
+                core = ZBITQuantumCoreV2(lattice=lat, couplings=couplings, engine=engine, verbose=False)
+                self.assertEqual(core.n_qubits, 6)
+                np.testing.assert_allclose(core.H @ psi, ref @ psi, atol=1e-12)
+        with self.assertRaises(ValueError):
+            ZBITQuantumCoreV2(n_qubits=5, lattice=lat, verbose=False)
+
+    def test_05_planner_and_registry(self):
+        """TEST 5: term counts reach the planner; lattices get distinct shared registry entries"""
+        lat = cubic(2, 2, 2)
+        core = ZBITQuantumCoreV2(lattice=lat, engine="matrix_free", verbose=False)
+        geo = core.plan.geometry
+        self.assertEqual((geo.name, geo.zz_bonds, geo.x_sites, geo.xx_bonds), ("cubic", 12, 8, 12))
+        self.assertEqual(geo, geometry_of("cubic", core.terms))
+        twin = ZBITQuantumCoreV2(lattice=lat, engine="matrix_free", verbose=False)
+        self.assertIs(twin.H, core.H)
+        other = ZBITQuantumCoreV2(lattice=lat, couplings={"hx": 1.0}, engine="matrix_free", verbose=False)
+        self.assertIsNot(other.H, core.H)
+        default = ZBITQuantumCoreV2(n_qubits=8, engine="matrix_free", verbose=False)
+        self.assertEqual(default._hamiltonian_key(), ("chain", 8, "matrix_free"))
+        self.assertIsNot(default.H, core.H)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,51 @@
+"""
+ZBIT-CORE-v2 Operator Representation Tests
+Bitmask terms vs the kron-chain Hamiltonian
+"""
+import sys
+import os
+import unittest
+import numpy as np
+from scipy.linalg import expm
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from zbit_core_v2_FIXED import ZBITQuantumCoreV2
+from zbit_operators import (MatrixFreeHamiltonian, chain_terms, krylov_expm_multiply,
+                            to_dense, to_sparse)
+
+
+class TestOperators(unittest.TestCase):
+    """Dense / sparse / matrix-free agree with _pauli_at"""
+
+    def setUp(self):
+        self.n = 6
+        self.H = ZBITQuantumCoreV2(n_qubits=self.n, verbose=False, engine="dense").H
+        self.terms = chain_terms(self.n)
+        self.psi = np.random.default_rng(1).standard_normal(2**self.n) + 0j
+        self.psi /= np.linalg.norm(self.psi)
+
+    def test_01_dense(self):
+        """TEST 1: to_dense matches the kron chain"""
+        np.testing.assert_allclose(to_dense(self.n, self.terms), self.H, atol=1e-14)
+
+    def test_02_sparse(self):
+        """TEST 2: CSR matches and has 1 + n + 4 nonzeros per row"""
+        S = to_sparse(self.n, self.terms)
+        np.testing.assert_allclose(S.toarray(), self.H, atol=1e-14)
+        self.assertEqual(S.nnz, 2**self.n * (1 + self.n + 4))
+
+    def test_03_matrix_free(self):
+        """TEST 3: Matrix-free mat-vec matches H @ psi"""
+        op = MatrixFreeHamiltonian(self.n, self.terms)
+        np.testing.assert_allclose(op @ self.psi, self.H @ self.psi, atol=1e-13)
+
+    def test_04_krylov(self):
+        """TEST 4: Lanczos propagator matches expm with a small error estimate"""
+        psi_t, err = krylov_expm_multiply(lambda v: self.H @ v, self.psi, 0.3, krylov_dim=20)
+        np.testing.assert_allclose(psi_t, expm(-1j * 0.3 * self.H) @ self.psi, atol=1e-10)
+        self.assertLess(err, 1e-10)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,113 @@
+"""
+ZBIT-CORE-v2 Out-of-Core Tests
+Memory-mapped state, block-group passes and I/O accounting
+"""
+import sys
+import os
+import tempfile
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from zbit_kernels import apply_gate
+from zbit_operators import chain_terms
+from zbit_outofcore import OutOfCoreStateVector, term_gate
+
+
+class TestOutOfCore(unittest.TestCase):
+    """8 qubits in 8-amplitude blocks: 5 high qubits, at most 2 paired per pass"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.rng = np.random.default_rng(11)
+        self.n = 8
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _state(self, psi=None, **kwargs):
+        path = os.path.join(self.tmp.name, "psi.bin")
+        kwargs.setdefault("block_qubits", 3)
+        if psi is None:
+            return OutOfCoreStateVector(path, self.n, **kwargs)
+        return OutOfCoreStateVector.from_array(path, psi, **kwargs)
+
+    def _gate(self, k, diagonal=False):
+        gate = self.rng.normal(size=(2**k, 2**k)) + 1j * self.rng.normal(size=(2**k, 2**k))
+        return np.diag(np.diag(gate)) if diagonal else gate
+
+    def test_01_random_circuit(self):
+        """TEST 1: queued gates on low and high qubits match the in-memory kernels"""
+        psi = self.rng.normal(size=2**self.n) + 1j * self.rng.normal(size=2**self.n)
+        state = self._state(psi)
+        ref = psi.copy()
+        for _ in range(40):
+            k = int(self.rng.integers(1, 3))
+            qubits = [int(q) for q in self.rng.choice(self.n, k, replace=False)]
+            gate = self._gate(k, diagonal=self.rng.random() < 0.4)
+            state.apply_gate(gate, qubits)
+            apply_gate(ref, gate, qubits)
+        np.testing.assert_allclose(state.to_numpy(), ref, rtol=1e-12, atol=1e-12)
+        state.close()
+
+    def test_02_low_qubit_gates_share_one_pass(self):
+        """TEST 2: in-block gates and diagonal gates on any qubit need a single pass"""
+        state = self._state()
+        for q in range(self.n - 3, self.n):
+            state.apply_gate(self._gate(1), [q])
+        state.apply_gate(self._gate(2, diagonal=True), [0, 1])
+        state.apply_gate(self._gate(1, diagonal=True), [2])
+        report = state.flush()
+        self.assertEqual(report["passes"], 1)
+        self.assertEqual(report["bytes_read"], 2**self.n * 16)
+        self.assertEqual(report["bytes_written"], 2**self.n * 16)
+        state.close()
+
+    def test_03_passes_follow_resident_budget(self):
+        """TEST 3: a larger resident budget pairs more high qubits per pass"""
+        gates = [(self._gate(1), [q]) for q in range(5)]
+        passes = {}
+        for budget in (4 * 8 * 16, 32 * 8 * 16):
+            state = self._state(max_resident_bytes=budget)
+            for gate, qubits in gates:
+                state.apply_gate(gate, qubits)
+            passes[budget] = len(state.schedule())
+            state.close()
+        self.assertEqual(passes[4 * 8 * 16], 3)
+        self.assertEqual(passes[32 * 8 * 16], 1)
+        # Below 4 blocks (a 2-qubit gate on two high qubits), or less than one block
+        for budget in (4 * 8 * 16 - 1, 100):
+            with self.assertRaises(ValueError):
+                self._state(max_resident_bytes=budget)
+
+    def test_04_trotter_step(self):
+        """TEST 4: Trotter step equals the same term gates in memory and reports I/O per step"""
+        state = self._state(block_qubits=4)
+        ref = np.zeros(2**self.n, dtype=complex)
+        ref[0] = 1.0
+        for _ in range(2):
+            for coef, x, z in chain_terms(self.n):
+                gate, qubits = term_gate(self.n, coef, x, z, 0.1)
+                apply_gate(ref, gate, qubits)
+            report = state.trotter_step(0.1)
+            self.assertEqual(report["bytes_read"], report["passes"] * 2**self.n * 16)
+        self.assertEqual(len(state.stats.steps), 2)
+        self.assertAlmostEqual(state.norm(), 1.0, places=12)
+        np.testing.assert_allclose(state.to_numpy(), ref, atol=1e-12)
+        state.close()
+
+    def test_05_reopen(self):
+        """TEST 5: the file persists and reopens with mode='r+'"""
+        state = self._state()
+        state.apply_gate(np.array([[0, 1], [1, 0]]), [0])
+        state.close()
+        reopened = self._state(mode="r+")
+        self.assertEqual(reopened.to_numpy()[2**(self.n - 1)], 1.0)
+        with self.assertRaises(ValueError):
+            reopened.apply_gate(np.eye(2), [self.n])
+        reopened.close()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
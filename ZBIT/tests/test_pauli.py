@@ -0,0 +1,179 @@
+"""
+ZBIT-CORE-v2 Pauli String Tests
+Bitmask encoding, labels, matrix-free batched expectations and PauliSum algebra
+"""
+import sys
+import os
+import gc
+import unittest
+import weakref
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from zbit_core_v2_FIXED import ZBITQuantumCoreV2
+from zbit_operators import chain_terms, fwht, to_dense
+from zbit_pauli import PauliString, PauliSum, commutator, expectations
+
+PAULI = {"I": np.eye(2), "X": np.array([[0, 1], [1, 0]]),
+         "Y": np.array([[0, -1j], [1j, 0]]), "Z": np.diag([1, -1])}
+
+
+def kron_label(label):
+    M = np.ones((1, 1))
+    for letter in label:
+        M = np.kron(M, PAULI[letter])
+    return M
+
+
+class TestPauliString(unittest.TestCase):
+    """Encoding and expectations"""
+
+    def setUp(self):
+        self.rng = np.random.default_rng(2)
+
+    def test_01_encoding(self):
+        """TEST 1: labels round-trip and match kron products"""
+        for label in ("XIZY", "YYYY", "IIII", "ZXZX"):
+            p = PauliString.from_label(label)
+            self.assertEqual(p.label, label)
+            self.assertTrue(p.is_hermitian)
+            np.testing.assert_allclose(p.to_dense(), kron_label(label), atol=1e-15)
+        p = PauliString.from_label("-iXY")
+        self.assertEqual(p.label, "-iXY")
+        self.assertFalse(p.is_hermitian)
+        self.assertEqual(PauliString.from_sites(4, {1: "Y", 3: "Z"}).label, "IYIZ")
+        self.assertEqual(PauliString.from_label("XIZY").weight, 3)
+        with self.assertRaises(ValueError):
+            PauliString.from_label("XQ")
+
+    def test_02_expectations_match_dense(self):
+        """TEST 2: random strings (small and WHT-sized x groups) match <psi|P|psi>"""
+        n = 5
+        psi = self.rng.normal(size=2**n) + 1j * self.rng.normal(size=2**n)
+        labels = ["".join(self.rng.choice(list("IXYZ"), n)) for _ in range(100)]
+        labels += ["".join(self.rng.choice(list("IZ"), n)) for _ in range(20)]
+        labels += ["iXZIYI", "-iZZIIX"]
+        ref = [np.vdot(psi, PauliString.from_label(l).to_dense() @ psi) for l in labels]
+        np.testing.assert_allclose(expectations(psi, labels), ref, atol=1e-12)
+
+    def test_03_fwht(self):
+        """TEST 3: in-place Walsh-Hadamard transform equals the Hadamard matrix product"""
+        a = self.rng.normal(size=16) + 1j * self.rng.normal(size=16)
+        H = np.array([[(-1)**bin(k & c).count("1") for c in range(16)] for k in range(16)])
+        np.testing.assert_allclose(fwht(a.copy()), H @ a, atol=1e-12)
+
+    def test_04_core_api(self):
+        """TEST 4: core.expectations is real for Hermitian strings and sums to <H>"""
+        core = ZBITQuantumCoreV2(n_qubits=4, verbose=False, engine="dense")
+        core.evolve(0.7, steps=4)
+        zz = [PauliString.from_sites(4, {i: "Z", i + 1: "Z"}) for i in range(3)]
+        x = [PauliString.from_sites(4, {i: "X"}) for i in range(4)]
+        xx = [PauliString.from_sites(4, {i: "X", i + 1: "X"}) for i in range(3)]
+        values = core.expectations(zz + x + xx)
+        self.assertEqual(values.dtype, np.float64)
+        energy = 0.5 * values[:3].sum() + 0.3 * values[3:7].sum() + 0.1 * values[7:].sum()
+        self.assertAlmostEqual(energy, core.expectation(), places=10)
+        self.assertEqual(core.expectations(["iZIII"]).dtype, np.complex128)
+        with self.assertRaises(ValueError):
+            core.expectations(["XX"])
+
+
+
+def random_sum(rng, n, k=6):
+    return PauliSum(n, rng.integers(0, 2**n, k), rng.integers(0, 2**n, k),
+                    rng.normal(size=k) + 1j * rng.normal(size=k))
+
+
+def contract_mpo(W):
+    cur = W[0][0]
+    for Wq in W[1:]:
+        cur = np.einsum("dab,dkcf->kacbf", cur, Wq)
+        s = cur.shape
+        cur = cur.reshape(s[0], s[1] * s[2], s[3] * s[4])
+    return cur[0]
+
+
+class TestPauliSum(unittest.TestCase):
+    """Symbolic sums of Pauli strings"""
+
+    def setUp(self):
+        self.rng = np.random.default_rng(8)
+        self.n = 4
+
+    def test_01_canonical_form(self):
+        """TEST 1: duplicates merge, cancellations vanish, labels round-trip"""
+        Z0 = PauliSum.site(self.n, 0, "Z")
+        self.assertEqual(len(Z0 + Z0), 1)
+        self.assertEqual(len(Z0 - Z0), 0)
+        self.assertEqual(Z0 + Z0, 2 * Z0)
+        self.assertEqual(hash(Z0 * 1.0), hash(PauliSum.from_pauli("ZIII")))
+        Y = PauliSum.from_pauli("IYII")
+        np.testing.assert_allclose(Y.to_dense(), kron_label("IYII"), atol=1e-14)
+        self.assertIn("IYII", repr(Y))
+        with self.assertRaises(ValueError):
+            Z0 + PauliSum.site(3, 0, "Z")
+
+    def test_02_algebra_matches_matrices(self):
+        """TEST 2: products, commutators and daggers agree with dense matrices"""
+        A, B = random_sum(self.rng, self.n), random_sum(self.rng, self.n)
+        a, b = A.to_dense(), B.to_dense()
+        np.testing.assert_allclose((A @ B).to_dense(), a @ b, atol=1e-13)
+        np.testing.assert_allclose(commutator(A, B).to_dense(), a @ b - b @ a, atol=1e-13)
+        np.testing.assert_allclose(A.dagger().to_dense(), a.conj().T, atol=1e-14)
+        np.testing.assert_allclose((3 - A).to_dense(), 3 * np.eye(2**self.n) - a, atol=1e-14)
+        X0, Y0, Z0 = (PauliSum.site(self.n, 0, s) for s in "XYZ")
+        self.assertEqual(commutator(X0, Y0), 2j * Z0)
+        self.assertEqual(len(commutator(X0, PauliSum.site(self.n, 1, "Y"))), 0)
+        self.assertFalse(A.is_hermitian)
+        self.assertTrue((A + A.dagger()).is_hermitian)
+
+    def test_03_representations(self):
+        """TEST 3: dense, sparse, matrix-free and MPO forms agree and are memoized"""
+        H = PauliSum.from_terms(self.n, chain_terms(self.n))
+        dense = to_dense(self.n, chain_terms(self.n))
+        psi = self.rng.normal(size=2**self.n) + 0j
+        np.testing.assert_array_equal(H.to_dense(), dense)
+        np.testing.assert_allclose(H.to_sparse().toarray(), dense, atol=1e-14)
+        np.testing.assert_allclose(H.matrix_free().dot(psi), dense @ psi, atol=1e-13)
+        np.testing.assert_allclose(contract_mpo(H.to_mpo()), dense, atol=1e-14)
+        self.assertIs(H.to_sparse(), H.to_sparse())
+        self.assertEqual(H.to_mpo()[1].shape, (len(H), len(H), 2, 2))
+        single = PauliSum.from_pauli("Y", coef=0.5)
+        np.testing.assert_allclose(contract_mpo(single.to_mpo()), 0.5 * PAULI["Y"], atol=1e-14)
+
+    def test_04_core_hamiltonian(self):
+        """TEST 4: the core builds every engine's H from its PauliSum, with no kron chain"""
+        n = 20
+        core = ZBITQuantumCoreV2(n_qubits=n, verbose=False, engine="matrix_free")
+        self.assertEqual(core.pauli_sum, PauliSum.from_terms(n, chain_terms(n)))
+        psi = np.zeros(2**n, dtype=complex)
+        psi[5] = 1.0
+        np.testing.assert_allclose(core.H.dot(psi), core.pauli_sum.matrix_free().dot(psi), atol=1e-14)
+        small = ZBITQuantumCoreV2(n_qubits=5, verbose=False, engine="dense")
+        kron = sum(0.5 * small._pauli_at(i, PAULI["Z"]) @ small._pauli_at(i + 1, PAULI["Z"])
+                   for i in range(4))
+        kron = kron + sum(0.3 * small._pauli_at(i, PAULI["X"]) for i in range(5))
+        kron = kron + sum(0.1 * small._pauli_at(i, PAULI["X"]) @ small._pauli_at(i + 1, PAULI["X"])
+                          for i in range(4))
+        np.testing.assert_allclose(small.H, kron, atol=1e-14)
+
+    def test_05_memoized_on_left_operand(self):
+        """TEST 5: products / commutators are cached on the left operand without pinning the right one"""
+        A = PauliSum.from_terms(self.n, chain_terms(self.n))
+        B = PauliSum.site(self.n, 0, "Y")
+        self.assertIs(A @ B, A @ B)
+        self.assertIs(commutator(A, B), commutator(A, B))
+        self.assertIs(A @ PauliSum.site(self.n, 0, "Y"), A @ B)
+        right = weakref.ref(B)
+        del B
+        gc.collect()
+        self.assertIsNone(right())
+        left = weakref.ref(A)
+        del A
+        gc.collect()
+        self.assertIsNone(left())
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,107 @@
+"""
+ZBIT-CORE-v2 Preflight Planner Tests
+Cost models, engine selection and OOM refusal
+"""
+import sys
+import os
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from zbit_core_v2_FIXED import ZBITQuantumCoreV2
+from zbit_backends import expm
+from zbit_operators import krylov_propagate
+from zbit_planner import ENGINES, PreflightError, estimate, plan_run
+
+
+class TestPlanner(unittest.TestCase):
+    """Preflight estimates and automatic engine selection"""
+
+    def test_01_estimates_for_every_engine(self):
+        """TEST 1: One estimate per engine, dense memory grows as 4^n"""
+        plan = plan_run(8, available_bytes=2**34)
+        self.assertEqual([e.engine for e in plan.estimates], list(ENGINES))
+        small = estimate(6, "dense").peak_bytes
+        large = estimate(8, "dense").peak_bytes
+        self.assertAlmostEqual(large / small, 16, delta=0.5)
+
+    def test_02_small_systems_stay_dense(self):
+        """TEST 2: Small systems pick the dense engine"""
+        plan = plan_run(4, available_bytes=2**34)
+        self.assertEqual(plan.engine, "dense")
+        self.assertEqual(plan.reliability, "HIGH")
+
+    def test_03_memory_budget_forces_cheaper_engine(self):
+        """TEST 3: Tight RAM excludes engines that would OOM"""
+        plan = plan_run(12, operations=("evolve",), available_bytes=2**30)
+        self.assertNotEqual(plan.engine, "dense")
+        self.assertTrue(plan.chosen.fits)
+        self.assertFalse(next(e for e in plan.estimates if e.engine == "dense").fits)
+
+    def test_04_refuses_oom_plans(self):
+        """TEST 4: PreflightError carries the estimate table"""
+        with self.assertRaises(PreflightError) as ctx:
+            plan_run(40)
+        self.assertIn("matrix_free", str(ctx.exception))
+        with self.assertRaises(MemoryError):
+            ZBITQuantumCoreV2(n_qubits=30, engine="dense", verbose=False)
+
+    def test_05_mps_not_executable(self):
+        """TEST 5: HOTRG/MPS requests are refused, not silently capped"""
+        with self.assertRaises(PreflightError):
+            ZBITQuantumCoreV2(n_qubits=20, method="hotrg", verbose=False)
+
+    def test_06_core_records_plan(self):
+        """TEST 6: Core exposes plan, engine and reliability"""
+        core = ZBITQuantumCoreV2(n_qubits=9, verbose=False)
+        self.assertEqual(core.engine, core.plan.engine)
+        self.assertEqual(core.reliability, "HIGH")
+        self.assertEqual(core.H.shape, (512, 512))
+        self.assertGreater(core.memory_bytes, core.psi.nbytes)
+
+    def test_07_engines_agree(self):
+        """TEST 7: Every executable engine evolves to the same state"""
+        states = {}
+        for engine in ("dense", "sparse", "krylov", "matrix_free"):
+            core = ZBITQuantumCoreV2(n_qubits=5, verbose=False, engine=engine)
+            states[engine] = core.evolve(t_final=0.7, steps=7)
+            self.assertAlmostEqual(core.history["energy"][-1], core.history["energy"][0], places=8)
+        for engine, psi in states.items():
+            np.testing.assert_allclose(psi, states["dense"], atol=1e-9, err_msg=engine)
+
+    def test_08_bad_arguments(self):
+        """TEST 8: Unknown engines/operations are rejected"""
+        with self.assertRaises(ValueError):
+            plan_run(4, engine="gpu")
+        with self.assertRaises(ValueError):
+            plan_run(4, operations=("teleport",))
+        with self.assertRaises(ValueError):
+            plan_run(4, method="exakt")
+
+    def test_09_krylov_large_steps(self):
+        """TEST 9: Krylov steps far beyond one Lanczos range substep to the exact result"""
+        core = ZBITQuantumCoreV2(n_qubits=8, verbose=False, engine="krylov", instrument=True)
+        psi0 = core.psi.copy()
+        core.evolve(t_final=20.0, steps=2)
+        exact = expm(-20j * core._dense_matrix()) @ psi0
+        self.assertGreater(abs(np.vdot(exact, core.psi))**2, 1 - 1e-8)
+        self.assertGreater(core.stats.counters["evolve.krylov_substeps"], 2)
+        with self.assertRaises(RuntimeError):
+            krylov_propagate(core.H.dot, psi0, 20.0, krylov_dim=4, max_substeps=3)
+
+
+    def test_10_dense_krylov_crossover(self):
+        """TEST 10: one cached expm per evolve puts the dense / Krylov crossover at 10 qubits"""
+        def engine(n, steps):
+            return plan_run(n, operations=("evolve",), steps=steps, available_bytes=2**40).engine
+        self.assertEqual(engine(9, 100), "dense")
+        self.assertEqual(engine(10, 100), "krylov")
+        # More steps amortize the expm further; few steps favour Lanczos earlier
+        self.assertEqual(engine(10, 1000), "dense")
+        self.assertEqual(engine(8, 10), "krylov")
+        dense = estimate(9, "dense", operations=("evolve",), steps=100)
+        self.assertLess(dense.runtime_s, 2 * estimate(9, "dense", operations=("evolve",), steps=1).runtime_s)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,85 @@
+"""
+ZBIT-CORE-v2 QML Controller Tests
+Batched torch circuits, autograd vs parameter-shift gradients
+"""
+import sys
+import os
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from zbit_core_v2_FIXED import ZBITQuantumCoreV2
+from zbit_backends import BackendUnavailable, get_backend
+from zbit_lattice import square
+
+try:
+    get_backend("torch")
+    HAS_TORCH = True
+except BackendUnavailable:
+    HAS_TORCH = False
+
+
+@unittest.skipUnless(HAS_TORCH, "torch not installed")
+class TestQMLController(unittest.TestCase):
+    """Variational control on the core's state"""
+
+    def setUp(self):
+        from zbit_qml import QMLController
+        self.core = ZBITQuantumCoreV2(n_qubits=4, verbose=False, engine="dense")
+        self.qml = QMLController(self.core, n_layers=2)
+
+    def test_01_energy_matches_core_hamiltonian(self):
+        """TEST 1: Torch energy equals <psi|H|psi> with the core's H"""
+        params = self.qml.init_params(3, scale=1.0)
+        energies = self.qml.energy(params).numpy()
+        states = self.qml.states(params).numpy()
+        for psi, E in zip(states, energies):
+            self.assertAlmostEqual(np.linalg.norm(psi), 1.0, places=12)
+            self.assertAlmostEqual(np.real(np.vdot(psi, self.core.H @ psi)), E, places=10)
+
+    def test_02_batched_equals_single(self):
+        """TEST 2: Batched evaluation equals one-by-one evaluation"""
+        params = self.qml.init_params(4, scale=1.0)
+        batched = self.qml.energy(params).numpy()
+        single = [float(self.qml.energy(p)) for p in params]
+        np.testing.assert_allclose(batched, single, atol=1e-12)
+
+    def test_03_gradients_agree(self):
+        """TEST 3: Parameter-shift gradients equal autograd"""
+        params = self.qml.init_params(2, scale=1.0)
+        auto = self.qml.gradient(params, "autograd").numpy()
+        shift = self.qml.gradient(params, "parameter_shift", chunk_size=7).numpy()
+        np.testing.assert_allclose(shift, auto, atol=1e-10)
+        self.assertEqual(auto.shape, (2, self.qml.n_params))
+
+    def test_04_training_lowers_energy(self):
+        """TEST 4: Training drives the energy down towards the ground state"""
+        E0 = np.linalg.eigvalsh(self.core.H)[0]
+        start = float(self.qml.energy(self.qml.init_params(1)))
+        result = self.qml.train(steps=60, lr=0.1, batch=2)
+        self.assertLess(result["energy"], start)
+        self.assertGreaterEqual(result["energy"], E0 - 1e-9)
+        psi = self.qml.apply_to_core(result["params"])
+        self.assertAlmostEqual(np.real(np.vdot(psi, self.core.H @ psi)), result["energy"], places=10)
+
+    def test_05_throughput(self):
+        """TEST 5: Throughput benchmark reports evaluations per second"""
+        from zbit_qml import benchmark_throughput
+        results = benchmark_throughput((4, 5), batch=4, repeats=1)
+        self.assertGreater(results[5]["evals_per_s"], 0)
+
+    def test_06_follows_core_model(self):
+        """TEST 6: H and the RZZ bonds come from the core's lattice model"""
+        from zbit_qml import QMLController
+        core = ZBITQuantumCoreV2(n_qubits=4, verbose=False, engine="dense", lattice=square(2, 2),
+                                 couplings={"zz": 1.0, "hx": 1.0, "xx": 0.0})
+        qml = QMLController(core, n_layers=1)
+        self.assertEqual(qml.bonds, list(core.lattice.edges))
+        states = qml.states(qml.init_params(2, scale=1.0))
+        np.testing.assert_allclose(qml.apply_hamiltonian(states).numpy(), (core.H @ states.numpy().T).T,
+                                   atol=1e-12)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
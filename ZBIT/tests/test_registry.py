@@ -0,0 +1,76 @@
+"""
+ZBIT-CORE-v2 Hamiltonian Registry Tests
+Lazy construction and cross-instance sharing
+"""
+import sys
+import os
+import gc
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from zbit_core_v2_FIXED import ZBITQuantumCoreV2
+from zbit_registry import clear_registry, registry_keys
+
+
+class TestRegistry(unittest.TestCase):
+    """Lazy, shared, read-only Hamiltonians"""
+
+    def setUp(self):
+        clear_registry()
+
+    def test_01_lazy(self):
+        """TEST 1: Validation and reports never build H"""
+        core = ZBITQuantumCoreV2(n_qubits=5, verbose=False, instrument=True)
+        core.generate_arxiv_report()
+        self.assertFalse(core._entry.built)
+        self.assertNotIn("hamiltonian", core.stats.timers)
+        core.H
+        self.assertTrue(core._entry.built)
+
+    def test_02_shared(self):
+        """TEST 2: Identical cores share one operator, built once"""
+        cores = [ZBITQuantumCoreV2(n_qubits=5, verbose=False, engine="dense") for _ in range(3)]
+        self.assertIs(cores[0].H, cores[2].H)
+        self.assertEqual(cores[0]._entry.builds, 1)
+        other = ZBITQuantumCoreV2(n_qubits=5, verbose=False, engine="sparse")
+        self.assertIsNot(other._entry, cores[0]._entry)
+
+    def test_03_read_only(self):
+        """TEST 3: Shared operators cannot be modified in place"""
+        core = ZBITQuantumCoreV2(n_qubits=4, verbose=False, engine="dense")
+        with self.assertRaises(ValueError):
+            core.H[0, 0] = 1.0
+
+    def test_04_weak(self):
+        """TEST 4: Entries disappear with the last core"""
+        core = ZBITQuantumCoreV2(n_qubits=4, verbose=False, engine="dense")
+        core.H
+        self.assertEqual(len(registry_keys()), 1)
+        del core
+        gc.collect()
+        self.assertEqual(registry_keys(), [])
+
+    def test_05_propagator_reused(self):
+        """TEST 5: The dense step propagator is computed once and shared"""
+        a = ZBITQuantumCoreV2(n_qubits=4, verbose=False, engine="dense")
+        b = ZBITQuantumCoreV2(n_qubits=4, verbose=False, engine="dense")
+        psi_a = a.evolve(t_final=0.5, steps=5)
+        U = a._entry.cached(("expm", 0.1))
+        self.assertIsNotNone(U)
+        psi_b = b.evolve(t_final=0.5, steps=5)
+        self.assertIs(b._entry.cached(("expm", 0.1)), U)
+        np.testing.assert_allclose(psi_a, psi_b)
+
+    def test_06_custom_operator(self):
+        """TEST 6: Assigning H detaches the core from the registry"""
+        core = ZBITQuantumCoreV2(n_qubits=2, verbose=False, engine="dense")
+        shared = core._entry
+        core.H = np.diag([1.0, 2.0, 3.0, 4.0]).astype(complex)
+        self.assertIsNot(core._entry, shared)
+        self.assertEqual(core.H[3, 3], 4.0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
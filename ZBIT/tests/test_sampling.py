@@ -0,0 +1,85 @@
+"""
+ZBIT-CORE-v2 Sampling Tests
+Computational-basis shots, marginals, CDF caching and packed bitstrings
+"""
+import sys
+import os
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from zbit_core_v2_FIXED import ZBITQuantumCoreV2
+from zbit_sampling import format_bitstrings, marginal, probabilities
+
+
+class TestSampling(unittest.TestCase):
+    """core.sample()"""
+
+    def setUp(self):
+        self.core = ZBITQuantumCoreV2(n_qubits=4, verbose=False, operations=(), seed=5)
+        rng = np.random.default_rng(0)
+        self.core.psi = rng.normal(size=16) + 1j * rng.normal(size=16)
+        self.probs = probabilities(self.core.psi.copy())
+
+    def test_01_distribution(self):
+        """TEST 1: empirical frequencies match |psi|^2 within 5 sigma"""
+        shots = 200_000
+        samples, counts = self.core.sample(shots, counts=True)
+        self.assertEqual(samples.dtype, np.uint64)
+        self.assertEqual(sum(counts.values()), shots)
+        freq = np.bincount(samples.astype(np.int64), minlength=16) / shots
+        sigma = np.sqrt(self.probs * (1 - self.probs) / shots)
+        self.assertTrue(np.all(np.abs(freq - self.probs) < 5 * sigma + 1e-12))
+
+    def test_02_marginal_order(self):
+        """TEST 2: qubits=(3, 0) packs qubit 3 as the most significant bit"""
+        expected = np.zeros(4)
+        for index, p in enumerate(self.probs):
+            q0, q3 = (index >> 3) & 1, index & 1
+            expected[2 * q3 + q0] += p
+        np.testing.assert_allclose(marginal(self.probs, 4, (3, 0)), expected, atol=1e-15)
+        samples = self.core.sample(100_000, qubits=(3, 0))
+        self.assertLess(int(samples.max()), 4)
+        freq = np.bincount(samples.astype(np.int64), minlength=4) / 100_000
+        np.testing.assert_allclose(freq, expected, atol=0.01)
+
+    def test_03_cdf_cached_until_psi_changes(self):
+        """TEST 3: repeated calls reuse the CDF; assignment, evolve and touch_psi invalidate it"""
+        cache = self.core._sampling
+        self.core.sample(10)
+        self.core.sample(10)
+        self.assertEqual(cache.builds, 1)
+        self.core.sample(10, qubits=[1])
+        self.assertEqual(cache.builds, 2)
+        self.core.psi = self.core.psi / np.linalg.norm(self.core.psi)
+        self.core.sample(10)
+        self.assertEqual(cache.builds, 3)
+        self.core.evolve(0.1, steps=1)
+        self.core.sample(10)
+        self.assertEqual(cache.builds, 4)
+        self.core.psi[:] = 0
+        self.core.psi[5] = 1
+        self.core.touch_psi()
+        self.assertTrue(np.all(self.core.sample(50) == 5))
+
+    def test_04_seeds(self):
+        """TEST 4: seed= is reproducible and independent of the core generator"""
+        a = self.core.sample(1000, seed=42)
+        self.core.sample(1000)
+        b = self.core.sample(1000, seed=42)
+        np.testing.assert_array_equal(a, b)
+
+    def test_05_bitstrings(self):
+        """TEST 5: packed values format as qubit-ordered strings"""
+        core = ZBITQuantumCoreV2(n_qubits=3, verbose=False, operations=())
+        core.apply_gate(np.array([[0, 1], [1, 0]]), 0)
+        samples = core.sample(4)
+        self.assertEqual(format_bitstrings(samples, 3), ["100"] * 4)
+        self.assertEqual(format_bitstrings(core.sample(2, qubits=[2, 0]), 2), ["01"] * 2)
+        with self.assertRaises(ValueError):
+            core.sample(1, qubits=[0, 0])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
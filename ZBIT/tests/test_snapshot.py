@@ -0,0 +1,129 @@
+"""
+ZBIT-CORE-v2 Snapshot Tests
+Binary format round trips and core save / load warm starts
+"""
+import gc
+import sys
+import os
+import tempfile
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from zbit_core_v2_FIXED import ZBITQuantumCoreV2
+from zbit_lattice import ladder
+from zbit_snapshot import ALIGNMENT, SnapshotError, read_header, read_snapshot, write_snapshot
+
+
+class TestSnapshot(unittest.TestCase):
+    """zbit_snapshot and core.save() / ZBITQuantumCoreV2.load()"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "run.zbs")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_01_format_round_trip(self):
+        """TEST 1: arrays come back bit-exact, aligned and memory-mapped"""
+        rng = np.random.default_rng(0)
+        arrays = {"psi": rng.normal(size=64) + 1j * rng.normal(size=64),
+                  "block": rng.normal(size=(3, 5)).astype(np.float32),
+                  "empty": np.zeros(0), "masks": np.arange(7, dtype=np.int64)}
+        write_snapshot(self.path, {"note": "x", "value": np.float64(1.5)}, arrays)
+        for mode in ("r", "c", None):
+            with self.subTest(mmap_mode=mode):
+                meta, loaded = read_snapshot(self.path, mode)
+                self.assertEqual(meta, {"note": "x", "value": 1.5})
+                for name, a in arrays.items():
+                    np.testing.assert_array_equal(loaded[name], a)
+                    self.assertEqual(loaded[name].dtype, a.dtype)
+                self.assertEqual(isinstance(loaded["psi"], np.memmap), mode is not None)
+        for spec in read_header(self.path)["arrays"].values():
+            self.assertEqual(spec["offset"] % ALIGNMENT, 0)
+
+    def test_02_rejects_foreign_files(self):
+        """TEST 2: wrong magic, unknown format and object arrays are errors"""
+        with open(self.path, "wb") as fh:
+            fh.write(b"NOTASNAPSHOT" * 4)
+        with self.assertRaises(SnapshotError):
+            read_snapshot(self.path)
+        write_snapshot(self.path, {}, {"a": np.ones(2)})
+        with open(self.path, "r+b") as fh:
+            fh.seek(8)
+            fh.write((99).to_bytes(4, "little"))
+        with self.assertRaises(SnapshotError):
+            read_header(self.path)
+        with self.assertRaises(TypeError):
+            write_snapshot(self.path, {}, {"a": np.array([object()])})
+
+    def test_03_core_round_trip(self):
+        """TEST 3: model, psi, history, RNG stream and eigenpairs survive save / load"""
+        lat = ladder(3)
+        core = ZBITQuantumCoreV2(lattice=lat, couplings={"hx": {0: 0.2, 3: 0.5}, "xx": 0.05,
+                                                         "zz": [0.1] * len(lat.edges)},
+                                 verbose=False, seed=3)
+        core.evolve(0.4, steps=4)
+        evals, _ = core.eigensystem()
+        core.rng.random(5)
+        core.save(self.path)
+        psi, history, report, pauli_sum = core.psi.copy(), list(core.history["energy"]), \
+            dict(core.evolve_report), core.pauli_sum
+        draws = core.rng.random(4)
+        # no live core shares the Hamiltonian entry, so the eigenpairs must come from the file
+        del core
+        gc.collect()
+        loaded = ZBITQuantumCoreV2.load(self.path, verbose=False, instrument=True)
+        np.testing.assert_array_equal(loaded.psi, psi)
+        self.assertEqual(loaded.pauli_sum, pauli_sum)
+        self.assertEqual(loaded.history["energy"], history)
+        self.assertEqual(loaded.evolve_report, report)
+        np.testing.assert_array_equal(loaded.rng.random(4), draws)
+        self.assertIsInstance(loaded.eigensystem()[1], np.memmap)
+        np.testing.assert_array_equal(loaded.eigensystem()[0], evals)
+        # copy-on-write psi: evolving the loaded core leaves the file untouched
+        loaded.apply_gate(np.array([[0, 1], [1, 0]]), [0])
+        loaded.evolve(0.1, steps=2)
+        _, arrays = read_snapshot(self.path)
+        np.testing.assert_array_equal(arrays["psi"], psi)
+        self.assertIn("snapshot.load", loaded.stats.timers)
+
+    def test_04_guards(self):
+        """TEST 4: custom operators and mismatched terms are refused"""
+        core = ZBITQuantumCoreV2(n_qubits=3, verbose=False)
+        core.history["labels"] = ["a", "b"]
+        core.save(self.path)
+        self.assertEqual(read_header(self.path)["meta"]["skipped_history"], ["labels"])
+        meta, arrays = read_snapshot(self.path, None)
+        arrays["terms/coef"] = arrays["terms/coef"] * 2
+        write_snapshot(self.path, meta, arrays)
+        with self.assertRaises(SnapshotError):
+            ZBITQuantumCoreV2.load(self.path, verbose=False)
+        core.H = np.eye(8)
+        with self.assertRaises(ValueError):
+            core.save(self.path)
+
+    def test_05_shared_entry_is_read_only(self):
+        """TEST 5: loaded H / eigenpairs reach other live cores as read-only maps; psi stays private"""
+        core = ZBITQuantumCoreV2(n_qubits=4, verbose=False, engine="dense")
+        core.eigensystem()
+        core.H
+        core.save(self.path)
+        del core
+        gc.collect()
+        loaded = ZBITQuantumCoreV2.load(self.path, verbose=False)
+        twin = ZBITQuantumCoreV2(n_qubits=4, verbose=False, engine="dense")
+        self.assertIs(twin._entry, loaded._entry)
+        for shared in (twin.H, *twin.eigensystem()):
+            self.assertIsInstance(shared, np.memmap)
+            with self.assertRaises(ValueError):
+                shared.flags.writeable = True
+        loaded.psi[0] = 0.5
+        _, arrays = read_snapshot(self.path)
+        self.assertEqual(arrays["psi"][0], 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
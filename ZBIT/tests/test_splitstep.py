@@ -0,0 +1,117 @@
+"""
+ZBIT-CORE-v2 Split-Step Tests
+FWHT kernel, Z / X term splitting and split-operator convergence order
+"""
+import sys
+import os
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from zbit_core_v2_FIXED import ZBITQuantumCoreV2
+from zbit_backends import expm
+from zbit_kernels import fwht
+from zbit_lattice import ladder, lattice_terms
+from zbit_operators import chain_terms, to_dense
+from zbit_splitstep import SplitStepPropagator, split_terms
+
+
+class TestSplitStep(unittest.TestCase):
+    """zbit_splitstep and evolve(method="split")"""
+
+    def setUp(self):
+        self.rng = np.random.default_rng(11)
+
+    def random_state(self, n):
+        psi = self.rng.normal(size=2**n) + 1j * self.rng.normal(size=2**n)
+        return psi / np.linalg.norm(psi)
+
+    def test_01_fwht_kernel(self):
+        """TEST 1: chunked FWHT equals the Hadamard-power matrix and is an involution up to 2^n"""
+        n = 6
+        H = np.array([[1.0]])
+        for _ in range(n):
+            H = np.kron(H, [[1, 1], [1, -1]])
+        a = self.random_state(n)
+        np.testing.assert_allclose(fwht(a.copy()), H @ a, atol=1e-12)
+        big = self.random_state(17)
+        np.testing.assert_allclose(fwht(fwht(big.copy())) / big.size, big, atol=1e-12)
+
+    def test_02_split_terms(self):
+        """TEST 2: terms split into Z and X parts; Y / mixed terms are rejected"""
+        z_part, x_part = split_terms(chain_terms(4))
+        self.assertEqual(len(z_part), 3)
+        self.assertEqual(len(x_part), 4 + 3)
+        with self.assertRaises(ValueError):
+            split_terms([(1.0, 0b11, 0b01)])
+        with self.assertRaises(ValueError):
+            SplitStepPropagator(3, chain_terms(3), order=3)
+
+    def test_03_convergence_order(self):
+        """TEST 3: orders 1, 2 and 4 converge at their nominal rates on a ladder"""
+        terms = lattice_terms(ladder(3), zz=0.7, hx=0.4, xx=0.25)
+        n = 6
+        psi0 = self.random_state(n)
+        exact = expm(-1j * to_dense(n, terms)) @ psi0
+        for order, rate in ((1, 2), (2, 4), (4, 16)):
+            with self.subTest(order=order):
+                errors = []
+                for steps in (10, 20):
+                    psi = psi0.copy()
+                    SplitStepPropagator(n, terms, order).evolve(psi, 1.0 / steps, steps)
+                    errors.append(np.linalg.norm(psi - exact))
+                self.assertGreater(errors[0] / errors[1], 0.8 * rate)
+
+    def test_04_core_mode(self):
+        """TEST 4: evolve(method="split") tracks the exact engine"""
+        core = ZBITQuantumCoreV2(n_qubits=6, verbose=False, instrument=True)
+        twin = ZBITQuantumCoreV2(n_qubits=6, verbose=False)
+        core.evolve(1.0, steps=40, method="split", split_order=4)
+        twin.evolve(1.0, steps=40)
+        self.assertGreater(abs(np.vdot(core.psi, twin.psi)), 1 - 1e-9)
+        self.assertEqual(core.evolve_report["mode"], "split")
+        self.assertIn("evolve.split", core.stats.timers)
+        # No observers or progress listener: one merged stretch, one energy
+        self.assertEqual(len(core.history["energy"]), 1)
+        self.assertEqual(core.stats.counters["evolve.steps"], 40)
+        with self.assertRaises(ValueError):
+            core.evolve(1.0, method="split", tol=1e-6)
+        with self.assertRaises(ValueError):
+            core.evolve(1.0, method="magnus")
+
+    def test_05_energy_without_H(self):
+        """TEST 5: split energies come from the diagonals and one FWHT; H is never built"""
+        n = 7
+        terms = chain_terms(n)
+        psi = self.rng.normal(size=2**n) + 1j * self.rng.normal(size=2**n)
+        psi /= np.linalg.norm(psi)
+        prop = SplitStepPropagator(n, terms)
+        self.assertAlmostEqual(prop.energy(psi), np.real(np.vdot(psi, to_dense(n, terms) @ psi)), places=12)
+        core = ZBITQuantumCoreV2(n_qubits=n, verbose=False, operations=())
+        core.evolve(1.0, steps=5, method="split")
+        self.assertFalse(core._entry.built)
+        self.assertAlmostEqual(core.history["energy"][-1],
+                               np.real(np.vdot(core.psi, to_dense(n, terms) @ core.psi)), places=12)
+
+
+    def test_06_stretches_between_observations(self):
+        """TEST 6: steps run as merged stretches split only at observation / progress points"""
+        n = 6
+        core = ZBITQuantumCoreV2(n_qubits=n, verbose=False, operations=())
+        psi = core.psi.copy()
+        SplitStepPropagator(n, chain_terms(n)).evolve(psi, 0.05, 20)
+        core.evolve(1.0, steps=20, method="split", observables=["norm"], observe_every=5)
+        np.testing.assert_allclose(core.psi, psi, atol=1e-12)
+        self.assertEqual(core.history["observed_t"], [0.25, 0.5, 0.75, 1.0])
+        self.assertEqual(len(core.history["energy"]), 4)
+        events = []
+        core = ZBITQuantumCoreV2(n_qubits=n, verbose=False, operations=(),
+                                 on_progress=lambda op, done, total: events.append(done))
+        core.evolve(1.0, steps=250, method="split")
+        self.assertEqual(events, list(range(3, 250, 3)) + [250])
+        self.assertEqual(len(core.history["energy"]), len(events))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
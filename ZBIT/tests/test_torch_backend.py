@@ -0,0 +1,137 @@
+"""
+ZBIT-CORE-v2 Array Backend Tests
+NumPy vs torch state-vector engine: evolution, gates, observables, thread control
+"""
+import sys
+import os
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from zbit_core_v2_FIXED import ZBITQuantumCoreV2
+from zbit_backends import BackendUnavailable, NumpyBackend, get_backend, make_array_backend
+
+try:
+    get_backend("torch")
+    HAS_TORCH = True
+except BackendUnavailable:
+    HAS_TORCH = False
+
+HADAMARD = np.array([[1, 1], [1, -1]]) / np.sqrt(2)
+CNOT = np.eye(4)[[0, 1, 3, 2]]
+
+
+class TestNumpyBackend(unittest.TestCase):
+    """Default backend and the gate/observable API"""
+
+    def test_01_default_is_numpy(self):
+        """TEST 1: backend defaults to numpy, unknown names are rejected"""
+        core = ZBITQuantumCoreV2(n_qubits=3, verbose=False, operations=())
+        self.assertIsInstance(core.backend, NumpyBackend)
+        self.assertIs(make_array_backend(core.backend), core.backend)
+        with self.assertRaises(ValueError):
+            ZBITQuantumCoreV2(n_qubits=3, verbose=False, operations=(), backend="cupy")
+
+    def test_02_bell_state(self):
+        """TEST 2: H on qubit 0 then CNOT(0, 2) gives (|000> + |101>)/sqrt(2)"""
+        core = ZBITQuantumCoreV2(n_qubits=3, verbose=False, operations=())
+        core.apply_gate(HADAMARD, 0)
+        core.apply_gate(CNOT, [0, 2])
+        expected = np.zeros(8, dtype=complex)
+        expected[[0b000, 0b101]] = 1 / np.sqrt(2)
+        np.testing.assert_allclose(core.psi, expected, atol=1e-15)
+
+    def test_03_gate_matches_kron(self):
+        """TEST 3: apply_gate equals the full kron-embedded operator"""
+        rng = np.random.default_rng(0)
+        core = ZBITQuantumCoreV2(n_qubits=4, verbose=False, operations=())
+        psi = rng.normal(size=16) + 1j * rng.normal(size=16)
+        gate = rng.normal(size=(4, 4)) + 1j * rng.normal(size=(4, 4))
+        core.psi = psi.copy()
+        core.apply_gate(gate, [1, 2])
+        full = np.kron(np.kron(np.eye(2), gate), np.eye(2))
+        np.testing.assert_allclose(core.psi, full @ psi, atol=1e-12)
+
+    def test_04_expectation(self):
+        """TEST 4: expectation() defaults to H"""
+        core = ZBITQuantumCoreV2(n_qubits=4, verbose=False, engine="dense")
+        core.evolve(0.5, steps=3)
+        self.assertAlmostEqual(core.expectation(), core.history["energy"][-1], places=12)
+        self.assertAlmostEqual(core.expectation(np.eye(16)), 1.0, places=12)
+
+
+@unittest.skipUnless(HAS_TORCH, "torch not installed")
+class TestTorchBackend(unittest.TestCase):
+    """torch results match numpy for every executable engine"""
+
+    def _pair(self, n_qubits, engine, **torch_kwargs):
+        from zbit_backends import TorchBackend
+        ref = ZBITQuantumCoreV2(n_qubits=n_qubits, verbose=False, engine=engine)
+        core = ZBITQuantumCoreV2(n_qubits=n_qubits, verbose=False, engine=engine,
+                                 backend=TorchBackend(**torch_kwargs))
+        return ref, core
+
+    def test_01_evolve_matches_numpy(self):
+        """TEST 1: psi and energy history agree to 1e-12 on all engines"""
+        for engine in ("dense", "sparse", "krylov", "matrix_free"):
+            with self.subTest(engine=engine):
+                ref, core = self._pair(6, engine)
+                ref.apply_gate(HADAMARD, 2)
+                core.psi = ref.psi.copy()
+                ref.evolve(1.0, steps=8)
+                core.evolve(1.0, steps=8)
+                self.assertIsInstance(core.psi, np.ndarray)
+                np.testing.assert_allclose(core.psi, ref.psi, atol=1e-12)
+                np.testing.assert_allclose(core.history["energy"], ref.history["energy"], atol=1e-12)
+
+    def test_02_gates_and_expectation(self):
+        """TEST 2: gates and <H> agree with numpy"""
+        ref, core = self._pair(4, "matrix_free")
+        for c in (ref, core):
+            c.apply_gate(HADAMARD, 0)
+            c.apply_gate(CNOT, [0, 3])
+        np.testing.assert_allclose(core.psi, ref.psi, atol=1e-15)
+        self.assertAlmostEqual(core.expectation(), ref.expectation(), places=12)
+
+    def test_03_thread_control(self):
+        """TEST 3: num_threads sets torch's intra-op pool"""
+        torch = get_backend("torch")
+        previous = torch.get_num_threads()
+        try:
+            self._pair(3, "dense", num_threads=1)
+            self.assertEqual(torch.get_num_threads(), 1)
+        finally:
+            torch.set_num_threads(previous)
+
+    def test_04_compiled_step(self):
+        """TEST 4: torch.compile'd dense step gives the same trajectory"""
+        ref, core = self._pair(4, "dense", compile=True, compile_backend="eager")
+        ref.evolve(1.0, steps=5)
+        core.evolve(1.0, steps=5)
+        np.testing.assert_allclose(core.psi, ref.psi, atol=1e-12)
+
+    def test_05_operator_shared(self):
+        """TEST 5: the converted operator is cached on the registry entry"""
+        _, core = self._pair(5, "sparse")
+        self.assertIs(core.backend_operator(), core.backend_operator())
+
+    def test_06_large_steps_match_numpy(self):
+        """TEST 6: Krylov engines substep a large dt on both backends"""
+        from zbit_backends import expm
+        from zbit_operators import chain_terms, to_dense
+        n = 10
+        psi0 = np.zeros(2**n, dtype=complex)
+        psi0[0] = 1.0
+        exact = expm(-20j * to_dense(n, chain_terms(n))) @ psi0
+        for engine in ("sparse", "krylov", "matrix_free"):
+            with self.subTest(engine=engine):
+                ref, core = self._pair(n, engine)
+                ref.evolve(20.0, steps=1)
+                core.evolve(20.0, steps=1)
+                self.assertGreater(abs(np.vdot(exact, ref.psi)), 1 - 1e-9)
+                np.testing.assert_allclose(core.psi, ref.psi, atol=1e-8)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
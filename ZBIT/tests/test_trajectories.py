@@ -0,0 +1,110 @@
+"""
+ZBIT-CORE-v2 Quantum Trajectory Tests
+Lindblad ensembles against the exact master equation, seeding and streaming
+"""
+import sys
+import os
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from zbit_core_v2_FIXED import ZBITQuantumCoreV2
+from zbit_backends import expm
+from zbit_operators import chain_terms, to_dense
+from zbit_pauli import PauliString
+from zbit_trajectories import LindbladTrajectories, dephasing, lowering
+
+
+def exact_lindblad(H, jumps, rho0, times):
+    """rho(t) from the vectorized Liouvillian (row-major vec: A rho B -> kron(A, B^T))"""
+    d = H.shape[0]
+    I = np.eye(d)
+    L = -1j * (np.kron(H, I) - np.kron(I, H.T))
+    for rate, J in jumps:
+        J = J.toarray()
+        JdJ = J.conj().T @ J
+        L += rate * (np.kron(J, J.conj()) - 0.5 * np.kron(JdJ, I) - 0.5 * np.kron(I, JdJ.T))
+    return [(expm(t * L) @ rho0.reshape(-1)).reshape(d, d) for t in times]
+
+
+class TestTrajectories(unittest.TestCase):
+    """LindbladTrajectories and core.lindblad()"""
+
+    def setUp(self):
+        self.n = 3
+        self.H = to_dense(self.n, chain_terms(self.n))
+        self.jumps = [(0.4, lowering(self.n, 0)), (0.2, dephasing(self.n, 2))]
+        self.psi0 = np.zeros(2**self.n, dtype=complex)
+        self.psi0[0b101] = 1.0
+        self.obs = {"z0": "ZII", "x1": "IXI", "z2": PauliString.from_label("IIZ").to_dense()}
+
+    def test_01_matches_master_equation(self):
+        """TEST 1: ensemble means agree with the exact Lindblad solution within 5 error bars"""
+        solver = LindbladTrajectories(self.H, self.jumps, self.obs, t_final=2.0, steps=200,
+                                      batch_size=100, seed=3)
+        estimate = solver.run(self.psi0, max_trajectories=600)
+        rhos = exact_lindblad(self.H, self.jumps, np.outer(self.psi0, self.psi0.conj()),
+                              estimate["times"][::20])
+        for name, label in (("z0", "ZII"), ("x1", "IXI"), ("z2", "IIZ")):
+            P = PauliString.from_label(label).to_dense()
+            exact = np.array([np.trace(rho @ P).real for rho in rhos])
+            mean = estimate["mean"][name][::20]
+            err = estimate["stderr"][name][::20]
+            # first-order jump timing adds an O(dt) bias on top of the statistical error
+            self.assertTrue(np.all(np.abs(mean - exact) < 5 * err + 0.02), name)
+        self.assertGreater(estimate["jumps"], 0)
+        self.assertEqual(estimate["trajectories"], 600)
+
+    def test_02_seeded_and_worker_independent(self):
+        """TEST 2: the same seed gives the same ensemble in-process and on a process pool"""
+        kwargs = dict(t_final=1.0, steps=20, batch_size=8, seed=11)
+        local = LindbladTrajectories(self.H, self.jumps, self.obs, **kwargs).run(self.psi0, 32)
+        pooled = LindbladTrajectories(self.H, self.jumps, self.obs, n_workers=2, **kwargs).run(self.psi0, 32)
+        for name in self.obs:
+            np.testing.assert_allclose(pooled["mean"][name], local["mean"][name], atol=1e-13)
+        self.assertEqual(pooled["jumps"], local["jumps"])
+        other = LindbladTrajectories(self.H, self.jumps, self.obs, **dict(kwargs, seed=12)).run(self.psi0, 32)
+        self.assertFalse(np.allclose(other["mean"]["z0"], local["mean"]["z0"]))
+
+    def test_03_streaming_error_bars(self):
+        """TEST 3: stream() yields after every batch with shrinking error bars; tol stops early"""
+        solver = LindbladTrajectories(self.H, self.jumps, {"z0": "ZII"}, t_final=1.0, steps=20,
+                                      batch_size=10, seed=1)
+        estimates = list(solver.stream(self.psi0, max_trajectories=45))
+        self.assertEqual([e["trajectories"] for e in estimates], [10, 20, 30, 40, 45])
+        self.assertLess(estimates[-1]["max_stderr"], estimates[0]["max_stderr"])
+        stopped = solver.run(self.psi0, max_trajectories=10_000, tol=0.1)
+        self.assertTrue(stopped["converged"])
+        self.assertLess(stopped["trajectories"], 10_000)
+
+    def test_04_core_lindblad(self):
+        """TEST 4: core.lindblad() starts from psi, draws its seed from the core generator"""
+        runs = []
+        for _ in range(2):
+            core = ZBITQuantumCoreV2(n_qubits=self.n, verbose=False, engine="matrix_free", seed=4)
+            core.psi = self.psi0.copy()
+            runs.append(core.lindblad([(1.0, lowering(self.n, 0))], {"z0": "ZII"}, t_final=0.5,
+                                      steps=10, max_trajectories=64))
+        np.testing.assert_array_equal(runs[0]["mean"]["z0"], runs[1]["mean"]["z0"])
+        self.assertAlmostEqual(runs[0]["mean"]["z0"][0], -1.0)
+        self.assertFalse(runs[0]["converged"])
+        with self.assertRaises(ValueError):
+            LindbladTrajectories(self.H, [(-1.0, lowering(self.n, 0))], {"z0": "ZII"}, 1.0)
+
+    def test_05_rejects_empty_ensembles(self):
+        """TEST 5: max_trajectories < 1 is a ValueError, not an empty stream"""
+        solver = LindbladTrajectories(self.H, [(1.0, lowering(self.n, 0))], {"z0": "ZII"}, 0.5, steps=5)
+        core = ZBITQuantumCoreV2(n_qubits=self.n, verbose=False, engine="dense")
+        for bad in (0, -3):
+            with self.assertRaises(ValueError):
+                solver.stream(self.psi0, bad)
+            with self.assertRaises(ValueError):
+                solver.run(self.psi0, bad)
+            with self.assertRaises(ValueError):
+                core.lindblad([(1.0, lowering(self.n, 0))], {"z0": "ZII"}, t_final=0.5,
+                              steps=5, max_trajectories=bad)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
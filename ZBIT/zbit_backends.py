@@ -0,0 +1,323 @@
+"""
+ZBIT-CORE-v2: Lazy backend registry
+Heavy optional dependencies (scipy, torch, tqdm) are imported on first use only.
+
+    get_backend("scipy.linalg").expm(A)
+    register_backend("mylib", lambda: importlib.import_module("mylib"))
+
+The core imports nothing but NumPy at load time; tests/test_backends.py
+guards that with an import-time benchmark.
+"""
+import importlib
+import threading
+from typing import Any, Callable, Dict, Iterable
+
+_LOADERS: Dict[str, Callable[[], Any]] = {}
+_LOADED: Dict[str, Any] = {}
+_LOCK = threading.Lock()
+
+
+class BackendUnavailable(ImportError):
+    """A registered backend failed to import"""
+
+
+def register_backend(name: str, loader: Callable[[], Any], replace: bool = False):
+    """Register loader() to be called the first time name is requested"""
+    with _LOCK:
+        if name in _LOADERS and not replace:
+            raise ValueError(f"Backend '{name}' already registered")
+        _LOADERS[name] = loader
+        _LOADED.pop(name, None)
+
+
+def get_backend(name: str) -> Any:
+    """Load (once) and return a registered backend"""
+    backend = _LOADED.get(name)
+    if backend is not None:
+        return backend
+    with _LOCK:
+        if name in _LOADED:
+            return _LOADED[name]
+        loader = _LOADERS.get(name)
+        if loader is None:
+            raise KeyError(f"Unknown backend '{name}' (registered: {sorted(_LOADERS)})")
+        try:
+            backend = loader()
+        except ImportError as e:
+            raise BackendUnavailable(f"Backend '{name}' is not installed: {e}") from e
+        _LOADED[name] = backend
+        return backend
+
+
+def available_backends() -> Dict[str, bool]:
+    """{name: importable} without keeping failed imports around"""
+    status = {}
+    for name in sorted(_LOADERS):
+        try:
+            get_backend(name)
+            status[name] = True
+        except BackendUnavailable:
+            status[name] = False
+    return status
+
+
+def loaded_backends():
+    return sorted(_LOADED)
+
+
+def _module(name: str) -> Callable[[], Any]:
+    return lambda: importlib.import_module(name)
+
+
+for _name in ("scipy.linalg", "scipy.sparse", "scipy.sparse.linalg", "torch"):
+    register_backend(_name, _module(_name))
+register_backend("tqdm", lambda: importlib.import_module("tqdm").tqdm)
+
+
+# ===== Thin wrappers used by the core =====
+
+def expm(A):
+    return get_backend("scipy.linalg").expm(A)
+
+
+def expm_multiply(A, B):
+    return get_backend("scipy.sparse.linalg").expm_multiply(A, B)
+
+
+def csr_matrix(*args, **kwargs):
+    return get_backend("scipy.sparse").csr_matrix(*args, **kwargs)
+
+
+def progress(iterable: Iterable, disable: bool = False, **kwargs) -> Iterable:
+    """tqdm progress bar; tqdm is never imported when disabled"""
+    if disable:
+        return iterable
+    return get_backend("tqdm")(iterable, **kwargs)
+
+
+# ===== Array backends (state-vector engine) =====
+
+class ArrayBackend:
+    """Hamiltonian application, gates and observables on one array library"""
+    name = "abstract"
+
+    def asarray(self, x):
+        raise NotImplementedError
+
+    def to_numpy(self, x):
+        raise NotImplementedError
+
+    def operator(self, H):
+        """Backend-native form of a dense / CSR / matrix-free Hamiltonian"""
+        raise NotImplementedError
+
+    def matvec(self, op, psi):
+        return op @ psi
+
+    def vdot(self, a, b) -> complex:
+        raise NotImplementedError
+
+    def norm(self, psi) -> float:
+        raise NotImplementedError
+
+    def normalize(self, psi):
+        norm = self.norm(psi)
+        return psi / norm if norm > 1e-16 else psi
+
+    def expectation(self, op, psi) -> float:
+        return float(self.vdot(psi, self.matvec(op, psi)).real)
+
+    def apply_gate(self, psi, gate, qubits, n_qubits: int):
+        raise NotImplementedError
+
+    def make_step(self, U, op):
+        """psi -> (normalized U @ psi, <H>) for a fixed dense propagator"""
+        def step(psi):
+            psi = self.normalize(U @ psi)
+            return psi, self.expectation(op, psi)
+        return step
+
+    def expm_multiply(self, op, psi, dt: float, krylov_dim: int = 20, tol: float = None):
+        """exp(-i H dt) psi, substepped until the Krylov error estimate is within tol"""
+        raise NotImplementedError
+
+
+class NumpyBackend(ArrayBackend):
+    name = "numpy"
+
+    def asarray(self, x):
+        import numpy as np
+        return np.asarray(x, dtype=complex)
+
+    def to_numpy(self, x):
+        return x
+
+    def operator(self, H):
+        return H
+
+    def vdot(self, a, b) -> complex:
+        import numpy as np
+        return complex(np.vdot(a, b))
+
+    def norm(self, psi) -> float:
+        import numpy as np
+        return float(np.linalg.norm(psi))
+
+    def apply_gate(self, psi, gate, qubits, n_qubits: int):
+        import numpy as np
+        k = len(qubits)
+        if k <= 2:
+            # Chunked multi-threaded in-place kernels on a copy
+            from zbit_kernels import apply_gate
+            return apply_gate(np.array(psi, dtype=complex), gate, qubits)
+        tensor = psi.reshape((2,) * n_qubits)
+        gate = np.asarray(gate, dtype=complex).reshape((2,) * (2 * k))
+        out = np.tensordot(gate, tensor, axes=(list(range(k, 2 * k)), list(qubits)))
+        return np.moveaxis(out, list(range(k)), list(qubits)).reshape(-1)
+
+    def expm_multiply(self, op, psi, dt: float, krylov_dim: int = 20, tol: float = None):
+        from zbit_operators import KRYLOV_TOL, krylov_propagate
+        psi_t, _, _ = krylov_propagate(op.dot, psi, dt, krylov_dim, KRYLOV_TOL if tol is None else tol)
+        return psi_t
+
+
+class TorchBackend(ArrayBackend):
+    """
+    torch CPU tensors (complex128).
+    num_threads sets torch's intra-op pool; compile=True wraps the dense
+    step kernel in torch.compile (compile_backend="inductor" by default).
+    """
+    name = "torch"
+
+    def __init__(self, num_threads: int = None, compile: bool = False,
+                 compile_backend: str = "inductor"):
+        self.torch = get_backend("torch")
+        self.num_threads = num_threads
+        if num_threads is not None:
+            self.torch.set_num_threads(num_threads)
+        self.compile = compile
+        self.compile_backend = compile_backend
+        self.dtype = self.torch.complex128
+
+    def asarray(self, x):
+        import numpy as np
+        return self.torch.from_numpy(np.array(x, dtype=complex))
+
+    def to_numpy(self, x):
+        return x.detach().cpu().numpy()
+
+    def operator(self, H):
+        import numpy as np
+        torch = self.torch
+        if isinstance(H, np.ndarray):
+            return self.asarray(H)
+        if hasattr(H, "indptr"):
+            return torch.sparse_csr_tensor(
+                torch.from_numpy(np.asarray(H.indptr, dtype=np.int64)),
+                torch.from_numpy(np.asarray(H.indices, dtype=np.int64)),
+                torch.from_numpy(np.array(H.data, dtype=complex)),
+                size=H.shape, check_invariants=False)
+        return _TorchMatrixFree(torch, H)
+
+    def vdot(self, a, b) -> complex:
+        return complex(self.torch.vdot(a, b))
+
+    def norm(self, psi) -> float:
+        return float(self.torch.linalg.vector_norm(psi))
+
+    def apply_gate(self, psi, gate, qubits, n_qubits: int):
+        torch = self.torch
+        k = len(qubits)
+        tensor = psi.reshape((2,) * n_qubits)
+        gate = torch.as_tensor(gate, dtype=self.dtype).reshape((2,) * (2 * k))
+        out = torch.tensordot(gate, tensor, dims=(list(range(k, 2 * k)), list(qubits)))
+        return torch.movedim(out, list(range(k)), list(qubits)).reshape(-1)
+
+    def make_step(self, U, op):
+        torch = self.torch
+
+        def step(psi):
+            psi = U @ psi
+            psi = psi / torch.linalg.vector_norm(psi)
+            return psi, torch.vdot(psi, op @ psi).real
+
+        if self.compile:
+            step = torch.compile(step, backend=self.compile_backend)
+        return step
+
+    def expm_multiply(self, op, psi, dt: float, krylov_dim: int = 20, tol: float = None):
+        """Lanczos exp(-i H dt) psi in torch, in substeps sized like zbit_operators.krylov_propagate"""
+        from zbit_operators import KRYLOV_MAX_SUBSTEPS, KRYLOV_TOL, _substepped
+        if dt == 0:
+            return psi.clone()
+
+        def step(v, h):
+            out, err = self._lanczos(op, v, h, krylov_dim)
+            return out, err, None
+        psi_t, _, _, _ = _substepped(step, psi, dt, krylov_dim, KRYLOV_TOL if tol is None else tol,
+                                     KRYLOV_MAX_SUBSTEPS)
+        return psi_t
+
+    def _lanczos(self, op, psi, dt: float, krylov_dim: int):
+        """One Lanczos step: (exp(-i H dt) psi, residual error estimate)"""
+        torch = self.torch
+        beta0 = torch.linalg.vector_norm(psi)
+        if float(beta0) == 0.0:
+            return psi.clone(), 0.0
+        dim = psi.shape[0]
+        m_max = min(krylov_dim, dim)
+        V = torch.empty((m_max, dim), dtype=self.dtype)
+        alpha = torch.zeros(m_max, dtype=torch.float64)
+        beta = torch.zeros(m_max, dtype=torch.float64)
+        V[0] = psi / beta0
+        m = m_max
+        for j in range(m_max):
+            w = op @ V[j]
+            alpha[j] = torch.vdot(V[j], w).real
+            w = w - alpha[j] * V[j]
+            if j > 0:
+                w = w - beta[j - 1] * V[j - 1]
+            # Full reorthogonalization; mv(V, conj(w)) avoids materializing conj(V)
+            w = w - torch.mv(V[:j + 1], w.conj()).conj() @ V[:j + 1]
+            beta[j] = torch.linalg.vector_norm(w)
+            if float(beta[j]) < 1e-12 or j == m_max - 1:
+                m = j + 1
+                break
+            V[j + 1] = w / beta[j]
+        T = torch.diag(alpha[:m]) + torch.diag(beta[:m - 1], 1) + torch.diag(beta[:m - 1], -1)
+        evals, evecs = torch.linalg.eigh(T)
+        evecs = evecs.to(self.dtype)
+        coeffs = evecs @ (torch.exp(-1j * dt * evals) * evecs[0].conj())
+        error = float(beta0 * beta[m - 1] * torch.abs(coeffs[m - 1])) if m < dim else 0.0
+        return beta0 * (coeffs @ V[:m]), error
+
+
+class _TorchMatrixFree:
+    """Torch twin of MatrixFreeHamiltonian (diagonal + one gather per x_mask)"""
+
+    def __init__(self, torch, H):
+        import numpy as np
+        self.shape = H.shape
+        self._index_select = torch.index_select
+        self._diag = torch.from_numpy(np.array(H.diagonal, dtype=complex))
+        self._gathers = [(torch.from_numpy(np.array(H._index ^ x)), torch.from_numpy(np.array(v)))
+                         for x, v in H._columns.items()]
+
+    def __matmul__(self, psi):
+        out = self._diag * psi
+        for source, values in self._gathers:
+            out.add_(values * self._index_select(psi, 0, source))
+        return out
+
+
+ARRAY_BACKENDS = {"numpy": NumpyBackend, "torch": TorchBackend}
+
+
+def make_array_backend(backend="numpy") -> ArrayBackend:
+    """Resolve the core's backend= argument (name or ArrayBackend instance)"""
+    if isinstance(backend, ArrayBackend):
+        return backend
+    try:
+        return ARRAY_BACKENDS[backend.lower()]()
+    except KeyError:
+        raise ValueError(f"Unknown backend '{backend}' (expected one of {sorted(ARRAY_BACKENDS)})")
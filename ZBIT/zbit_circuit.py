@@ -0,0 +1,308 @@
+"""
+ZBIT-CORE-v2: Circuits and gate fusion
+A small gate list on the state-vector engine, plus a compiler pass that
+merges it into few passes over psi.
+
+    theta = Parameter("theta")
+    circ = Circuit(20).h(0).cx(0, 1).rz(1, theta).trotter(chain_terms(20), dt=0.05, steps=4)
+    program = fuse(circ.bind({"theta": 0.3}), max_qubits=4)
+    report = execute(program, psi)           # {"gates", "passes", ...}
+
+Gates use the core's convention: a 2^k x 2^k matrix on qubits
+(q_0, ..., q_{k-1}) with q_0 the most significant bit of the gate index.
+
+fuse() walks the gates in order and grows the current dense block while the
+union of its qubits stays within max_qubits. Runs of diagonal gates whose
+support would not fit a block collapse into one full phase vector instead.
+Every emitted block or phase vector is one pass over psi, compared with one
+pass per gate for gate-by-gate application.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from zbit_kernels import apply_diagonal, apply_gate as _apply_small
+from zbit_outofcore import term_gate
+
+_H = np.array([[1, 1], [1, -1]], dtype=complex) / np.sqrt(2)
+_FIXED = {
+    "h": _H,
+    "x": np.array([[0, 1], [1, 0]], dtype=complex),
+    "y": np.array([[0, -1j], [1j, 0]], dtype=complex),
+    "z": np.diag([1, -1]).astype(complex),
+    "s": np.diag([1, 1j]),
+    "t": np.diag([1, np.exp(1j * np.pi / 4)]),
+    "cx": np.eye(4, dtype=complex)[[0, 1, 3, 2]],
+    "cz": np.diag([1, 1, 1, -1]).astype(complex),
+    "swap": np.eye(4, dtype=complex)[[0, 2, 1, 3]],
+}
+
+
+def _rx(theta):
+    c, s = np.cos(theta / 2), np.sin(theta / 2)
+    return np.array([[c, -1j * s], [-1j * s, c]])
+
+
+def _ry(theta):
+    c, s = np.cos(theta / 2), np.sin(theta / 2)
+    return np.array([[c, -s], [s, c]], dtype=complex)
+
+
+def _rz(theta):
+    return np.diag([np.exp(-0.5j * theta), np.exp(0.5j * theta)])
+
+
+def _rzz(theta):
+    return np.diag(np.exp(-0.5j * theta * np.array([1, -1, -1, 1])))
+
+
+_ROTATIONS = {"rx": _rx, "ry": _ry, "rz": _rz, "rzz": _rzz}
+
+
+@dataclass(frozen=True)
+class Parameter:
+    """Symbolic rotation angle, resolved by Circuit.bind()"""
+    name: str
+
+
+Angle = Union[float, Parameter]
+
+
+@dataclass
+class Gate:
+    name: str
+    qubits: List[int]
+    matrix: Optional[np.ndarray] = None
+    angle: Optional[Angle] = None
+
+    @property
+    def bound(self) -> bool:
+        return self.matrix is not None
+
+    @property
+    def diagonal(self) -> bool:
+        return not np.any(self.matrix - np.diag(np.diag(self.matrix)))
+
+
+class Circuit:
+    """Ordered gate list on n_qubits; builder methods return self"""
+
+    def __init__(self, n_qubits: int):
+        self.n_qubits = n_qubits
+        self.gates: List[Gate] = []
+
+    def __len__(self) -> int:
+        return len(self.gates)
+
+    @property
+    def parameters(self) -> List[str]:
+        names = [g.angle.name for g in self.gates if isinstance(g.angle, Parameter)]
+        return list(dict.fromkeys(names))
+
+    def gate(self, matrix, qubits, name: str = "unitary") -> "Circuit":
+        qubits = [qubits] if np.isscalar(qubits) else [int(q) for q in qubits]
+        matrix = np.asarray(matrix, dtype=complex)
+        if matrix.shape != (2**len(qubits),) * 2:
+            raise ValueError(f"{name}: {matrix.shape} matrix for {len(qubits)} qubits")
+        self._check(qubits)
+        self.gates.append(Gate(name, qubits, matrix))
+        return self
+
+    def _check(self, qubits: List[int]):
+        if len(set(qubits)) != len(qubits) or any(not 0 <= q < self.n_qubits for q in qubits):
+            raise ValueError(f"invalid qubits {qubits} for {self.n_qubits} qubits")
+
+    def _rotation(self, name: str, qubits: List[int], angle: Angle) -> "Circuit":
+        self._check(qubits)
+        matrix = None if isinstance(angle, Parameter) else _ROTATIONS[name](float(angle))
+        self.gates.append(Gate(name, qubits, matrix, angle))
+        return self
+
+    def h(self, q): return self.gate(_FIXED["h"], [q], "h")
+    def x(self, q): return self.gate(_FIXED["x"], [q], "x")
+    def y(self, q): return self.gate(_FIXED["y"], [q], "y")
+    def z(self, q): return self.gate(_FIXED["z"], [q], "z")
+    def s(self, q): return self.gate(_FIXED["s"], [q], "s")
+    def t(self, q): return self.gate(_FIXED["t"], [q], "t")
+    def cx(self, control, target): return self.gate(_FIXED["cx"], [control, target], "cx")
+    def cz(self, a, b): return self.gate(_FIXED["cz"], [a, b], "cz")
+    def swap(self, a, b): return self.gate(_FIXED["swap"], [a, b], "swap")
+    def rx(self, q, angle: Angle): return self._rotation("rx", [q], angle)
+    def ry(self, q, angle: Angle): return self._rotation("ry", [q], angle)
+    def rz(self, q, angle: Angle): return self._rotation("rz", [q], angle)
+    def rzz(self, a, b, angle: Angle): return self._rotation("rzz", [a, b], angle)
+
+    def trotter(self, terms, dt: float, steps: int = 1, order: int = 1) -> "Circuit":
+        """exp(-i dt H) for H = sum of bitmask terms: first- or second-order (symmetric) Trotter"""
+        if order not in (1, 2):
+            raise ValueError("order must be 1 or 2")
+        terms = list(terms)
+        for _ in range(steps):
+            if order == 1:
+                layer = [(term, dt) for term in terms]
+            else:
+                layer = [(term, dt / 2) for term in terms] + [(term, dt / 2) for term in reversed(terms)]
+            for (coef, x, z), tau in layer:
+                matrix, qubits = term_gate(self.n_qubits, coef, x, z, tau)
+                self.gate(matrix, qubits, "trotter")
+        return self
+
+    def bind(self, values: Dict[str, float]) -> "Circuit":
+        """Copy with every Parameter replaced by values[name]"""
+        out = Circuit(self.n_qubits)
+        for g in self.gates:
+            if isinstance(g.angle, Parameter):
+                if g.angle.name not in values:
+                    raise ValueError(f"no value for parameter '{g.angle.name}'")
+                out.gates.append(Gate(g.name, g.qubits, _ROTATIONS[g.name](float(values[g.angle.name])),
+                                      values[g.angle.name]))
+            else:
+                out.gates.append(g)
+        return out
+
+
+# ===== Fusion compiler =====
+
+@dataclass
+class Block:
+    """Dense gate on up to max_qubits qubits (one pass)"""
+    qubits: List[int]
+    matrix: np.ndarray
+    gates: int = 1
+
+
+@dataclass
+class PhaseVector:
+    """Product of diagonal gates as a full 2^n phase vector (one pass)"""
+    phases: np.ndarray
+    gates: int = 0
+
+
+@dataclass
+class Program:
+    n_qubits: int
+    ops: List[Union[Block, PhaseVector]] = field(default_factory=list)
+    gates: int = 0
+
+    @property
+    def passes(self) -> int:
+        return len(self.ops)
+
+
+def embed(matrix: np.ndarray, qubits: Sequence[int], block: Sequence[int]) -> np.ndarray:
+    """matrix on qubits (a subset of block) as a 2^len(block) matrix in block's qubit order"""
+    k, m = len(block), len(qubits)
+    if m == k and list(qubits) == list(block):
+        return matrix
+    order = list(qubits) + [q for q in block if q not in qubits]
+    full = np.kron(matrix, np.eye(2**(k - m))).reshape((2,) * (2 * k))
+    perm = [order.index(q) for q in block]
+    return full.transpose(perm + [k + p for p in perm]).reshape(2**k, 2**k)
+
+
+def phase_vector(n_qubits: int, diagonals) -> np.ndarray:
+    """Full diagonal of a product of (diag, qubits) factors (one broadcast multiply each)"""
+    phases = np.ones((2,) * n_qubits, dtype=complex)
+    for diag, qubits in diagonals:
+        m = len(qubits)
+        # diag tensor axes follow `qubits`; reorder to ascending qubits, then broadcast
+        order = sorted(range(m), key=lambda j: qubits[j])
+        factor = diag.reshape((2,) * m).transpose(order)
+        shape = [1] * n_qubits
+        for q in qubits:
+            shape[q] = 2
+        phases *= factor.reshape(shape)
+    return phases.reshape(-1)
+
+
+def _absorb(block: Block, matrix: np.ndarray, qubits: Sequence[int]):
+    """block <- matrix (applied after) on the union of both supports"""
+    union = block.qubits + [q for q in qubits if q not in block.qubits]
+    block.matrix = embed(matrix, qubits, union) @ embed(block.matrix, block.qubits, union)
+    block.qubits = union
+    block.gates += 1
+
+
+def _diagonal_block(diagonals) -> Block:
+    support = sorted({q for _, qubits in diagonals for q in qubits})
+    block = Block(support, np.eye(2**len(support), dtype=complex), 0)
+    for diag, qubits in diagonals:
+        _absorb(block, np.diag(diag), qubits)
+    return block
+
+
+def fuse(circuit: Circuit, max_qubits: int = 4) -> Program:
+    """Greedy in-order fusion into blocks of <= max_qubits qubits and phase vectors"""
+    if max_qubits < 2:
+        raise ValueError("max_qubits must be >= 2")
+    if any(not g.bound for g in circuit.gates):
+        raise ValueError(f"bind parameters {circuit.parameters} before fusing")
+    program = Program(circuit.n_qubits, gates=len(circuit.gates))
+    block: Optional[Block] = None
+    diagonals: List = []
+
+    def support(*extra):
+        return {q for _, qubits in diagonals for q in qubits}.union(*extra)
+
+    def flush_diagonals():
+        if len(support()) <= max_qubits:
+            program.ops.append(_diagonal_block(diagonals))
+        else:
+            program.ops.append(PhaseVector(phase_vector(circuit.n_qubits, diagonals), len(diagonals)))
+        diagonals.clear()
+
+    for g in circuit.gates:
+        if block is not None:
+            if len(set(block.qubits) | set(g.qubits)) <= max_qubits:
+                _absorb(block, g.matrix, g.qubits)
+                continue
+            program.ops.append(block)
+            block = None
+        if g.diagonal:
+            diagonals.append((np.diag(g.matrix), g.qubits))
+            continue
+        if diagonals:
+            if len(support(g.qubits)) <= max_qubits:
+                # A small diagonal run opens the next block instead of costing its own pass
+                block = _diagonal_block(diagonals)
+                diagonals.clear()
+                _absorb(block, g.matrix, g.qubits)
+                continue
+            flush_diagonals()
+        block = Block(list(g.qubits), g.matrix)
+    if block is not None:
+        program.ops.append(block)
+    if diagonals:
+        flush_diagonals()
+    return program
+
+
+# ===== Execution =====
+
+def apply_block(psi: np.ndarray, matrix: np.ndarray, qubits: Sequence[int]) -> np.ndarray:
+    """psi <- matrix on qubits, in place (chunked kernels for k <= 2, tensordot above)"""
+    k = len(qubits)
+    if k <= 2:
+        return _apply_small(psi, matrix, qubits)
+    n = psi.size.bit_length() - 1
+    tensor = psi.reshape((2,) * n)
+    out = np.tensordot(matrix.reshape((2,) * (2 * k)), tensor, axes=(list(range(k, 2 * k)), list(qubits)))
+    psi[:] = np.moveaxis(out, list(range(k)), list(qubits)).reshape(-1)
+    return psi
+
+
+def execute(program: Union[Program, Circuit], psi: np.ndarray) -> Dict:
+    """Run a fused Program (or a Circuit gate by gate) on psi in place; returns the pass report"""
+    if isinstance(program, Circuit):
+        circuit = program
+        program = Program(circuit.n_qubits, [Block(g.qubits, g.matrix) for g in circuit.gates], len(circuit))
+    for op in program.ops:
+        if isinstance(op, PhaseVector):
+            apply_diagonal(psi, op.phases)
+        else:
+            apply_block(psi, op.matrix, op.qubits)
+    largest = max((len(op.qubits) for op in program.ops if isinstance(op, Block)), default=0)
+    return {"gates": program.gates, "passes": program.passes,
+            "phase_vectors": sum(isinstance(op, PhaseVector) for op in program.ops),
+            "max_block_qubits": largest}
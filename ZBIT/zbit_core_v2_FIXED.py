@@ -4,63 +4,234 @@ arXiv: 2510.xxxxx | Open Source MIT | Production Ready
 VERSÃO FINAL - 100% FUNCIONAL
 """
 import numpy as np
-from scipy.linalg import expm
-import torch
-from typing import Dict, List
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
 from pathlib import Path
-from tqdm import tqdm
+import copy
+import itertools
 import warnings
+from collections import OrderedDict
 warnings.filterwarnings('ignore')
 
+# scipy / torch / tqdm are loaded on first use through the backend registry; the rarely
+# used feature modules (circuit, correlators, disorder, snapshot, splitstep, trajectories)
+# are imported inside the methods that need them, so `import zbit_core_v2_FIXED` stays
+# free of multiprocessing / process pools
+from zbit_backends import csr_matrix, expm, expm_multiply, make_array_backend, progress
+from zbit_diskcache import DiskCache, cache_key
+from zbit_entanglement import entanglement_observable, entanglement_profile
+from zbit_imaginary import imaginary_ground_state, random_state, tpq_thermal
+from zbit_instrumentation import RunStats, make_instrumentation
+from zbit_lattice import Lattice, chain, chain_couplings, geometry_of, lattice_terms
+from zbit_operators import (MatrixFreeHamiltonian, chain_terms, krylov_expm_multiply,
+                            krylov_expm_multiply_batch, krylov_propagate, krylov_propagate_batch,
+                            to_dense, to_sparse)
+from zbit_pauli import PauliSum, as_pauli, expectations
+from zbit_planner import plan_run
+from zbit_registry import HamiltonianEntry, get_entry
+from zbit_sampling import MAX_PACKED_QUBITS, SamplingCache, draw, histogram
+
+if TYPE_CHECKING:
+    from zbit_circuit import Circuit
+
+__version__ = "2.0.0"
+
+DEFAULT_OPERATIONS = ("evolve", "otoc", "validation")
+
+# Registry keys of custom operators (core.H = ...): unique per assignment, never reused
+_CUSTOM_OPERATORS = itertools.count()
+
+# Adaptive evolve(tol=...): step-size controller limits and attempt budget
+ADAPTIVE_SAFETY = 0.9
+ADAPTIVE_MAX_GROWTH = 5.0
+ADAPTIVE_MAX_SHRINK = 0.2
+ADAPTIVE_MAX_ATTEMPTS_PER_STEP = 100
+# evolve(method="split") reports progress at most this many times (each report ends a merged stretch)
+SPLIT_PROGRESS_POINTS = 100
+# Dense exp(-tau H) kept per ground_state() / thermal() call (LRU, never in the shared entry)
+IMAGINARY_CACHED_PROPAGATORS = 8
+
+# Named observables for evolve(observables=[...]); values are factories of psi -> value
+OBSERVABLES = {
+    "entanglement": entanglement_observable,
+    "norm": lambda: (lambda psi: float(np.linalg.norm(psi))),
+}
+
 
 class ZBITQuantumCoreV2:
     """Production-ready quantum simulator with 9/9 validation tests"""
     
-    def __init__(self, n_qubits: int = 6, method: str = "exact", verbose: bool = True):
-        self.n_qubits = min(n_qubits, 14)  # Cap seguro
+    def __init__(self, n_qubits: Optional[int] = None, method: str = "exact", verbose: bool = True,
+                 engine: str = "auto", operations=DEFAULT_OPERATIONS, cache_dir: Optional[str] = None,
+                 instrument=False, on_phase: Optional[Callable[[str, float], None]] = None,
+                 profile: Optional[str] = None,
+                 on_progress: Optional[Callable[[str, int, int], None]] = None,
+                 backend="numpy", seed: Optional[int] = None, lattice: Optional[Lattice] = None,
+                 couplings: Optional[Dict] = None):
+        if lattice is not None and n_qubits not in (None, lattice.n_sites):
+            raise ValueError(f"n_qubits={n_qubits} but the lattice has {lattice.n_sites} sites")
+        n_qubits = lattice.n_sites if lattice is not None else (6 if n_qubits is None else n_qubits)
+        self.n_qubits = n_qubits
         self.method = method.lower()
         self.verbose = verbose
-        self.reliability = "HIGH" if self.n_qubits <= 14 else "ESTIMATED"
+        # Model: default open chain, or lattice_terms(lattice, **couplings) (see zbit_lattice)
+        self.lattice = lattice
+        self.couplings = dict(couplings or {})
+        if lattice is None and not self.couplings:
+            self.terms = chain_terms(n_qubits)
+            geometry = "chain"
+        else:
+            if lattice is None:
+                lattice = self.lattice = chain(n_qubits)
+            self.terms = lattice_terms(lattice, **self.couplings)
+            geometry = geometry_of(lattice.name, self.terms)
+        # Symbolic H; dense / sparse / matrix-free forms are built from it on demand
+        self.pauli_sum = PauliSum.from_terms(n_qubits, self.terms)
+        # Preflight: cheapest engine that fits in RAM, PreflightError otherwise
+        self.plan = plan_run(n_qubits, geometry=geometry, method=self.method, operations=operations,
+                             engine=engine)
+        self.engine = self.plan.engine
+        self.reliability = self.plan.reliability
+        # Instrumentation: no-op unless instrument/on_phase/profile is given
+        self.instrumentation = make_instrumentation(instrument, on_phase, profile)
+        # on_progress(operation, done, total): structured alternative to the tqdm bar
+        self.on_progress = on_progress
+        # Persistent cache of operators/eigenpairs/unitaries ($ZBIT_CACHE_DIR if not given)
+        self.disk_cache = DiskCache(cache_dir) if cache_dir else DiskCache.from_env()
+        # State-vector array backend: "numpy", "torch" or an ArrayBackend instance
+        self.backend = make_array_backend(backend)
+        # Default generator for sampling (per-call seed= overrides it)
+        self.rng = np.random.default_rng(seed)
         
         if verbose:
-            print(f"🚀 ZBIT-CORE-v2 | {self.n_qubits} qubits | {self.method.upper()}")
+            print(f"🚀 ZBIT-CORE-v2 | {self.n_qubits} qubits | {self.method.upper()} | {self.engine}")
         
-        self.H = self._build_hamiltonian()
+        # H is built lazily and shared by identical cores (see zbit_registry)
+        self._entry = get_entry(self._hamiltonian_key())
+        self.psi_version = 0
+        self._sampling = SamplingCache()
         self.psi = self._initial_state()
         self.history = {"energy": []}
+        # Summary of the last evolve(): mode, steps, rejected_steps, global_error, ...
+        self.evolve_report: Dict = {}
     
-    def _build_hamiltonian(self) -> np.ndarray:
-        """Hamiltonian: Ising + Transverse Field + Topological"""
-        dim = 2**self.n_qubits
-        
-        # Pauli matrices
-        sx = np.array([[0, 1], [1, 0]], dtype=complex)
-        sz = np.array([[1, 0], [0, -1]], dtype=complex)
-        
-        H = np.zeros((dim, dim), dtype=complex)
-        
-        # ZZ couplings (Ising)
-        for i in range(self.n_qubits - 1):
-            op_i = self._pauli_at(i, sz)
-            op_ip1 = self._pauli_at(i + 1, sz)
-            H += 0.5 * (op_i @ op_ip1)
-        
-        # Transverse field (X)
-        for i in range(self.n_qubits):
-            op_i = self._pauli_at(i, sx)
-            H += 0.3 * op_i
-        
-        # Topological term (Majorana-like)
-        for i in range(min(self.n_qubits - 1, 4)):
-            op_i = self._pauli_at(i, sx)
-            op_ip1 = self._pauli_at(i + 1, sx)
-            H += 0.1 * (op_i @ op_ip1)
+    def _hamiltonian_key(self) -> tuple:
+        """Registry key: everything the operator depends on"""
+        if self.lattice is None:
+            return ("chain", self.n_qubits, self.engine)
+        return (self.lattice.name, self.n_qubits, self.engine, tuple(self.terms))
+    
+    @property
+    def H(self):
+        """Hamiltonian for the planned engine (read-only, shared between identical cores)"""
+        entry = self._entry
+        if not entry.built:
+            self.instrumentation.count("hamiltonian.registry_misses")
+        return entry.get(self._timed_build)
+    
+    @H.setter
+    def H(self, operator):
+        # Custom operator: private entry, never shared or disk cached; the copy is what gets
+        # frozen, so the caller's array stays writable
+        operator = operator.copy() if hasattr(operator, "copy") else copy.deepcopy(operator)
+        self._entry = HamiltonianEntry(("custom", next(_CUSTOM_OPERATORS)), operator)
+    
+    @property
+    def psi(self) -> np.ndarray:
+        return self._psi
+    
+    @psi.setter
+    def psi(self, state):
+        # Every assignment bumps the version that keys derived caches (e.g. sampling CDFs);
+        # in-place edits of the array must be followed by touch_psi()
+        self._psi = state
+        self.psi_version += 1
+    
+    def touch_psi(self):
+        """Mark psi as modified in place"""
+        self.psi_version += 1
+    
+    def _timed_build(self):
+        with self.instrumentation.run("hamiltonian"):
+            if self.engine == "dense":
+                return self._cached_arrays("hamiltonian", lambda: {"H": self._build_hamiltonian()})["H"]
+            if self.engine in ("sparse", "krylov"):
+                def build():
+                    H = self._build_hamiltonian()
+                    return {"data": H.data, "indices": H.indices, "indptr": H.indptr}
+                arrays = self._cached_arrays("hamiltonian", build)
+                dim = 2**self.n_qubits
+                return csr_matrix((arrays["data"], arrays["indices"], arrays["indptr"]),
+                                     shape=(dim, dim), copy=False)
+            return self._build_hamiltonian()
+    
+    def _cached_arrays(self, kind: str, compute: Callable[[], Dict[str, np.ndarray]],
+                       **params) -> Dict[str, np.ndarray]:
+        """compute() through the disk cache (memory-mapped on hit); custom operators bypass it"""
+        model = self._entry.key
+        if self.disk_cache is None or model[0] == "custom":
+            return compute()
+        key = cache_key(kind, {"model": list(model), **params}, __version__)
+        hit = self.disk_cache.get(key)
+        if hit is not None:
+            self.instrumentation.count(f"{kind}.disk_hits")
+            return hit
+        with self.instrumentation.phase(f"{kind}.compute"):
+            arrays = compute()
+        self.disk_cache.put(key, arrays)
+        self.instrumentation.count(f"{kind}.disk_misses")
+        return arrays
+    
+    def _dense_matrix(self) -> np.ndarray:
+        """Dense copy of H regardless of engine"""
+        H = self.H
+        if isinstance(H, np.ndarray):
+            return H
+        if hasattr(H, "toarray"):
+            return H.toarray()
+        return to_dense(self.n_qubits, self.terms)
+    
+    def eigensystem(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Full eigendecomposition (eigenvalues ascending, eigenvectors as columns), shared + disk cached"""
+        def compute():
+            with self.instrumentation.phase("eigensystem.eigh"):
+                evals, evecs = np.linalg.eigh(self._dense_matrix())
+            return {"evals": evals, "evecs": evecs}
         
-        return (H + H.conj().T) / 2  # Ensure Hermitian
+        def load():
+            arrays = self._cached_arrays("eigensystem", compute)
+            return arrays["evals"], arrays["evecs"]
+        return self._entry.derived("eigensystem", load)
+    
+    def floquet_unitary(self, period: float) -> np.ndarray:
+        """Dense one-period propagator exp(-iH T), shared + disk cached"""
+        def compute():
+            return {"U": expm(-1j * self._dense_matrix() * period)}
+        return self._entry.derived(
+            ("expm", period), lambda: self._cached_arrays("floquet", compute, period=period)["U"])
+    
+    def _build_hamiltonian(self) -> np.ndarray:
+        """Hamiltonian: Ising + Transverse Field + Topological (or the lattice model), from self.pauli_sum"""
+        if self.engine != "dense":
+            return self._build_operator()
+        with self.instrumentation.phase("hamiltonian.dense"):
+            self.instrumentation.count("hamiltonian.terms", len(self.terms))
+            return self.pauli_sum.to_dense()
+    
+    def _build_operator(self):
+        """Same Hamiltonian as CSR / matrix-free operator, built from bitmask terms"""
+        instr = self.instrumentation
+        with instr.phase("hamiltonian.terms"):
+            terms = self.terms
+            instr.count("hamiltonian.terms", len(terms))
+        with instr.phase(f"hamiltonian.{self.engine}"):
+            if self.engine == "matrix_free":
+                return self.pauli_sum.matrix_free()
+            return self.pauli_sum.to_sparse()
     
     def _pauli_at(self, pos: int, pauli: np.ndarray) -> np.ndarray:
         """
-        Pauli operator at position pos
+        Pauli operator at position pos as a dense kron chain (reference only; the
+        Hamiltonian is built from PauliSum, see zbit_pauli)
         FIXED: Começa com [[1]] em vez de np.eye(2)
         """
         result = np.array([[1]], dtype=complex)  # CORREÇÃO CRÍTICA
@@ -79,40 +250,561 @@ class ZBITQuantumCoreV2:
         psi[0] = 1.0
         return psi
     
-    def evolve(self, t_final: float, steps: int = 100) -> np.ndarray:
-        """Suzuki-Trotter evolution"""
-        dt = t_final / max(steps, 1)
+    def evolve(self, t_final: float, steps: int = 100, observables=None,
+               observe_every: int = 1, tol: Optional[float] = None,
+               method: str = "engine", split_order: int = 2) -> np.ndarray:
+        """
+        Suzuki-Trotter evolution.
+        observables: names from OBSERVABLES or {name: psi -> value}, sampled every
+        observe_every steps into history[name] (times since the call in history["observed_t"]).
+        tol: adaptive mode, Krylov steps sized so the summed residual estimate stays below tol
+        (steps then only sets the first dt); see self.evolve_report.
+        method: "engine" (exact step with the planned engine) or "split" (order-split_order
+        Z / X split-step with in-place FWHTs, NumPy only; needs pure Z / X terms, see zbit_splitstep).
+        The split path runs whole stretches of steps between observation / progress points (so
+        adjacent Z half-steps merge) and records one energy per stretch.
+        """
+        if method not in ("engine", "split"):
+            raise ValueError(f"Unknown method '{method}' (expected 'engine' or 'split')")
+        if method == "split" and tol is not None:
+            raise ValueError("tol (adaptive stepping) is not available with method='split'")
+        if tol is not None and self.backend.name != "numpy":
+            raise ValueError(f"tol (adaptive stepping) runs on NumPy only, not the {self.backend.name} backend")
+        instr = self.instrumentation
+        observers = self._observers(observables)
+        with instr.run("evolve"):
+            dt = t_final / max(steps, 1)
+            if tol is not None:
+                self.psi = psi = self._evolve_adaptive(t_final, dt, tol, observers, observe_every)
+                return psi
+            self.evolve_report = {"mode": "fixed" if method == "engine" else "split",
+                                  "steps": steps, "rejected_steps": 0,
+                                  "global_error": None, "dt_min": dt, "dt_max": dt}
+            if method == "split":
+                self.psi = psi = self._evolve_split(dt, steps, split_order, observers, observe_every)
+                return psi
+            if self.backend.name != "numpy":
+                self.psi = psi = self._evolve_on_backend(dt, steps, observers, observe_every)
+                return psi
+            psi = self.psi.copy()
+            
+            steps_iter = progress(range(steps), disable=not self.verbose)
+            for step in instr.iterate(steps_iter, "evolve.progress"):
+                try:
+                    psi = self._propagate(psi, dt, "evolve", cache=True)
+                except (FloatingPointError, np.linalg.LinAlgError):
+                    instr.count("evolve.failed_steps")
+                else:
+                    with instr.phase("evolve.normalize"):
+                        norm = np.linalg.norm(psi)
+                        if norm > 1e-16:
+                            psi /= norm
+                    
+                    # Track energy
+                    with instr.phase("evolve.energy"):
+                        E = np.real(np.vdot(psi, self.H @ psi))
+                        self.history["energy"].append(E)
+                    instr.count("evolve.steps")
+                if observers and (step + 1) % observe_every == 0:
+                    self._observe(observers, psi, (step + 1) * dt)
+                if self.on_progress is not None:
+                    self.on_progress("evolve", step + 1, steps)
+            
+            self.psi = psi
+        return psi
+    
+    def _evolve_split(self, dt: float, steps: int, order: int, observers,
+                      observe_every: int) -> np.ndarray:
+        """
+        evolve(method="split"): one split.evolve(psi, dt, k) per stretch of k steps between
+        observation points and, when someone listens (on_progress / verbose), progress points.
+        Energies come from the propagator's diagonals (H is never built).
+        """
+        from zbit_splitstep import SplitStepPropagator
+        instr = self.instrumentation
+        split = self._entry.derived(("split", order), lambda: SplitStepPropagator(
+            self.n_qubits, self.terms, order))
+        stops = {steps} if steps > 0 else set()
+        if observers:
+            stops.update(range(observe_every, steps + 1, observe_every))
+        if steps > 0 and (self.on_progress is not None or self.verbose):
+            stride = -(-steps // SPLIT_PROGRESS_POINTS)
+            stops.update(range(stride, steps + 1, stride))
         psi = self.psi.copy()
-        
-        for _ in tqdm(range(steps), disable=not self.verbose):
-            try:
-                U = expm(-1j * self.H * dt)
-                psi = U @ psi
+        done = 0
+        stops_iter = progress(sorted(stops), disable=not self.verbose)
+        for stop in instr.iterate(stops_iter, "evolve.progress"):
+            with instr.phase("evolve.split"):
+                split.evolve(psi, dt, stop - done)
+            with instr.phase("evolve.normalize"):
                 norm = np.linalg.norm(psi)
                 if norm > 1e-16:
                     psi /= norm
-                
-                # Track energy
-                E = np.real(psi.conj() @ self.H @ psi)
-                self.history["energy"].append(E)
-            except:
-                pass
+            with instr.phase("evolve.energy"):
+                self.history["energy"].append(split.energy(psi))
+            instr.count("evolve.steps", stop - done)
+            done = stop
+            if observers and stop % observe_every == 0:
+                self._observe(observers, psi, stop * dt)
+            if self.on_progress is not None:
+                self.on_progress("evolve", stop, steps)
+        return psi
+    
+    def _evolve_adaptive(self, t_final: float, dt: float, tol: float, observers,
+                         observe_every: int) -> np.ndarray:
+        """
+        Error-controlled Krylov stepping (NumPy, any engine's H.dot).
+        A step is accepted when its residual estimate is below tol * |dt| / |t_final|, so the
+        accepted local errors sum to at most tol; dt then scales by (target / err)^(1/m).
+        Negative t_final integrates backwards (dt carries the sign); t_final = 0 is a no-op.
+        """
+        if tol <= 0:
+            raise ValueError("tol must be positive")
+        instr = self.instrumentation
+        matvec = self.H.dot
+        m = self.plan.krylov_dim
+        psi = self.psi.copy()
+        sign = 1.0 if t_final >= 0 else -1.0
+        span = abs(t_final)
+        h = abs(dt)
+        done = 0.0
+        accepted = rejected = 0
+        global_error = 0.0
+        dts = []
+        max_attempts = ADAPTIVE_MAX_ATTEMPTS_PER_STEP * max(1, int(np.ceil(span / h))) if h else 0
+        while span - done > 1e-12 * max(1.0, span):
+            if accepted + rejected >= max_attempts:
+                raise RuntimeError(f"adaptive evolve exceeded {max_attempts} attempts at t={sign * done:.6g}")
+            h = min(h, span - done)
+            dt = sign * h
+            with instr.phase("evolve.propagate"):
+                psi_new, err = krylov_expm_multiply(matvec, psi, dt, m)
+            target = tol * h / span
+            if err > target:
+                rejected += 1
+                instr.count("evolve.rejected_steps")
+                h *= max(ADAPTIVE_MAX_SHRINK, ADAPTIVE_SAFETY * (target / err)**(1 / m))
+                continue
+            with instr.phase("evolve.normalize"):
+                norm = np.linalg.norm(psi_new)
+                psi = psi_new / norm if norm > 1e-16 else psi_new
+            done += h
+            t = sign * done
+            accepted += 1
+            global_error += err
+            dts.append(h)
+            instr.count("evolve.steps")
+            with instr.phase("evolve.energy"):
+                self.history["energy"].append(np.real(np.vdot(psi, self.H @ psi)))
+            if observers and accepted % observe_every == 0:
+                self._observe(observers, psi, t)
+            if self.on_progress is not None:
+                self.on_progress("evolve", int(round(1000 * done / span)), 1000)
+            growth = ADAPTIVE_SAFETY * (target / err)**(1 / m) if err > 0 else ADAPTIVE_MAX_GROWTH
+            h *= min(ADAPTIVE_MAX_GROWTH, growth)
+        # dt_min / dt_max are the smallest / largest step magnitudes, signed like t_final
+        self.evolve_report = {
+            "mode": "adaptive", "tol": tol, "steps": accepted, "rejected_steps": rejected,
+            "global_error": global_error,
+            "dt_min": sign * min(dts) if dts else 0.0, "dt_max": sign * max(dts) if dts else 0.0,
+        }
+        return psi
+    
+    def _observers(self, observables) -> Dict[str, Callable[[np.ndarray], object]]:
+        if not observables:
+            return {}
+        if isinstance(observables, dict):
+            return dict(observables)
+        unknown = [name for name in observables if name not in OBSERVABLES]
+        if unknown:
+            raise ValueError(f"Unknown observables {unknown} (expected {sorted(OBSERVABLES)})")
+        return {name: OBSERVABLES[name]() for name in observables}
+    
+    def _observe(self, observers: Dict[str, Callable], psi: np.ndarray, t: float):
+        with self.instrumentation.phase("evolve.observe"):
+            self.history.setdefault("observed_t", []).append(t)
+            for name, observe in observers.items():
+                self.history.setdefault(name, []).append(observe(psi))
+    
+    def _evolve_on_backend(self, dt: float, steps: int, observers=None,
+                           observe_every: int = 1) -> np.ndarray:
+        """evolve() loop with psi and H held by self.backend (psi is copied back at the end)"""
+        instr = self.instrumentation
+        backend = self.backend
+        op = self.backend_operator()
+        psi = backend.asarray(self.psi)
+        if self.engine == "dense":
+            with instr.phase("evolve.expm"):
+                U = self._entry.derived((backend.name, "expm", dt),
+                                        lambda: backend.asarray(self.floquet_unitary(dt)))
+            kernel = backend.make_step(U, op)
+        else:
+            def kernel(psi):
+                psi = backend.normalize(backend.expm_multiply(op, psi, dt, self.plan.krylov_dim))
+                return psi, backend.expectation(op, psi)
+        
+        steps_iter = progress(range(steps), disable=not self.verbose)
+        for step in instr.iterate(steps_iter, "evolve.progress"):
+            with instr.phase("evolve.step"):
+                psi, E = kernel(psi)
+                self.history["energy"].append(float(E))
+            instr.count("evolve.steps")
+            if observers and (step + 1) % observe_every == 0:
+                self._observe(observers, backend.to_numpy(psi), (step + 1) * dt)
+            if self.on_progress is not None:
+                self.on_progress("evolve", step + 1, steps)
+        return backend.to_numpy(psi).copy()
+    
+    def dynamics(self, t_final: float, steps: int = 100, perturbation=None,
+                 epsilon: float = 1e-2) -> Dict:
+        """
+        Return probability |<psi0|psi(t)>|^2, Loschmidt echo |<psi_H(t)|psi_H'(t)>|^2 with
+        H' = H + epsilon V, energy and energy variance from one propagation.
+        perturbation V: bitmask terms [(coef, x_mask, z_mask)], any operator with .dot,
+        or None for sum_i Z_i. psi and psi' advance as one (dim, 2) Krylov block, so each
+        Lanczos iteration is a single pass over H (steps are substepped until both columns are
+        within KRYLOV_TOL); the first product of every step is H psi,
+        which gives <H> and <H^2> - <H>^2 without extra matvecs. self.psi ends at psi(t_final).
+        """
+        instr = self.instrumentation
+        n = self.n_qubits
+        if perturbation is None:
+            perturbation = [(1.0, 0, 1 << (n - 1 - q)) for q in range(n)]
+        V = perturbation if hasattr(perturbation, "dot") else MatrixFreeHamiltonian(n, perturbation)
+        H = self.H
+        
+        def matvec(block):
+            out = H.dot(block)
+            out[:, 1] += epsilon * V.dot(block[:, 1])
+            return out
+        
+        dt = t_final / max(steps, 1)
+        psi0 = self.psi / np.linalg.norm(self.psi)
+        pair = np.stack([psi0, psi0], axis=1)
+        times, returns, echoes, energies, variances = [], [], [], [], []
+        
+        def record(t, psi, H_psi, psi_pert):
+            E = np.real(np.vdot(psi, H_psi))
+            times.append(t)
+            returns.append(abs(np.vdot(psi0, psi))**2)
+            echoes.append(abs(np.vdot(psi, psi_pert))**2)
+            energies.append(E)
+            variances.append(max(np.real(np.vdot(H_psi, H_psi)) - E**2, 0.0))
+        
+        with instr.run("dynamics"):
+            for step in range(steps):
+                with instr.phase("dynamics.propagate"):
+                    new, _, substeps, H_pair = krylov_propagate_batch(matvec, pair, dt,
+                                                                      self.plan.krylov_dim)
+                    instr.count("dynamics.krylov_substeps", substeps)
+                with instr.phase("dynamics.diagnostics"):
+                    record(step * dt, pair[:, 0], H_pair[:, 0], pair[:, 1])
+                    pair = new / np.linalg.norm(new, axis=0)
+                instr.count("dynamics.steps")
+                if self.on_progress is not None:
+                    self.on_progress("dynamics", step + 1, steps)
+            with instr.phase("dynamics.diagnostics"):
+                record(steps * dt, pair[:, 0], H.dot(pair[:, 0]), pair[:, 1])
+        self.psi = pair[:, 0].copy()
+        return {
+            "times": np.array(times), "return_probability": np.array(returns),
+            "loschmidt_echo": np.array(echoes), "energy": np.array(energies),
+            "energy_variance": np.array(variances), "epsilon": epsilon,
+        }
+    
+    def correlators(self, t_final: float, steps: int = 100, A: str = "Z", B: str = "Z",
+                    omegas=None, sigma: Optional[float] = None) -> Dict:
+        """
+        C_ij(t) = <psi|A_i(t) B_j|psi> for all site pairs and the structure factor S(k, omega)
+        (see zbit_correlators). psi and every B_j psi advance as one (dim, n + 1) block: the
+        cached dense U(dt) on the dense engine, block Krylov substepped to KRYLOV_TOL otherwise.
+        self.psi is unchanged.
+        Returns {"times", "C": (steps + 1, n, n), "momenta", "S_kt", "omegas", "S_kw", "sigma"}.
+        """
+        from zbit_correlators import (correlation_matrix, excite, reciprocal_grid, site_operators,
+                                      structure_factor)
+        instr = self.instrumentation
+        n = self.n_qubits
+        A_ops, B_ops = site_operators(n, A), site_operators(n, B)
+        dt = t_final / max(steps, 1)
+        psi0 = self.psi / np.linalg.norm(self.psi)
+        with instr.run("correlators"):
+            with instr.phase("correlators.excite"):
+                block = np.concatenate([psi0[:, None], excite(psi0, B_ops)], axis=1)
+            U = self.floquet_unitary(dt) if self.engine == "dense" else None
+            C = np.empty((steps + 1, n, n), dtype=complex)
+            for step in range(steps + 1):
+                if step:
+                    with instr.phase("correlators.propagate"):
+                        if U is not None:
+                            block = U @ block
+                        else:
+                            block, _, substeps, _ = krylov_propagate_batch(self.H.dot, block, dt,
+                                                                           self.plan.krylov_dim)
+                            instr.count("correlators.krylov_substeps", substeps)
+                with instr.phase("correlators.overlaps"):
+                    C[step] = correlation_matrix(block[:, 0], block[:, 1:], A_ops)
+                instr.count("correlators.steps")
+                if self.on_progress is not None:
+                    self.on_progress("correlators", step, steps)
+            with instr.phase("correlators.structure_factor"):
+                positions, momenta = reciprocal_grid(self.lattice or chain(n))
+                times = np.arange(steps + 1) * dt
+                result = structure_factor(C, times, positions, momenta, omegas, sigma)
+        return {"times": times, "C": C, **result}
+    
+    def lindblad(self, jumps, observables: Dict, t_final: float, steps: int = 100,
+                 max_trajectories: int = 1000, tol: Optional[float] = None, batch_size: int = 16,
+                 n_workers: int = 0, seed: Optional[int] = None) -> Dict:
+        """
+        Quantum-trajectory solution of the Lindblad equation from self.psi (see zbit_trajectories).
+        jumps: [(rate, L)]; observables: {name: Pauli label | operator}.
+        Returns ensemble means with standard errors; with tol it stops once every
+        error bar is below tol. seed defaults to a draw from self.rng.
+        """
+        from zbit_trajectories import LindbladTrajectories
+        if max_trajectories < 1:
+            raise ValueError(f"max_trajectories must be >= 1, got {max_trajectories}")
+        if seed is None:
+            seed = int(self.rng.integers(2**63))
+        H = self.H
+        if isinstance(H, MatrixFreeHamiltonian):
+            H = to_sparse(self.n_qubits, self.terms)
+        solver = LindbladTrajectories(H, jumps, observables, t_final, steps=steps,
+                                      batch_size=batch_size, n_workers=n_workers, seed=seed)
+        instr = self.instrumentation
+        with instr.run("lindblad"):
+            estimate = None
+            stream = solver.stream(self.psi, max_trajectories)
+            try:
+                for estimate in instr.iterate(stream, "lindblad.batches"):
+                    if self.on_progress is not None:
+                        self.on_progress("lindblad", estimate["trajectories"], max_trajectories)
+                    if tol is not None and estimate["trajectories"] > 1 and estimate["max_stderr"] <= tol:
+                        break
+            finally:
+                stream.close()  # cancels batches still queued on the pool
+            instr.count("lindblad.trajectories", estimate["trajectories"])
+        estimate["converged"] = tol is not None and estimate["max_stderr"] <= tol
+        return estimate
+    
+    def _imaginary_step(self) -> Callable[[np.ndarray, float], np.ndarray]:
+        """
+        (psi, tau) -> exp(-tau H) psi with the planned engine. Dense propagators live in a small
+        LRU local to this step function: thermal sweeps produce many distinct taus, which would
+        otherwise flush the shared registry entry (eigensystem, Floquet and split entries).
+        """
+        instr = self.instrumentation
+        propagators: "OrderedDict[float, np.ndarray]" = OrderedDict()
+        
+        def propagator(tau):
+            if tau in propagators:
+                propagators.move_to_end(tau)
+            else:
+                propagators[tau] = expm(-tau * self._dense_matrix())
+                if len(propagators) > IMAGINARY_CACHED_PROPAGATORS:
+                    propagators.popitem(last=False)
+            return propagators[tau]
         
+        def step(psi, tau):
+            with instr.phase("imaginary.step"):
+                if self.engine == "dense":
+                    psi = propagator(tau) @ psi
+                elif self.engine == "sparse":
+                    psi = expm_multiply(-tau * self.H, psi)
+                else:
+                    psi, _ = krylov_expm_multiply(self.H.dot, psi, tau, self.plan.krylov_dim, coeff=-1)
+            instr.count("imaginary.steps")
+            return psi
+        return step
+    
+    def ground_state(self, dtau: float = 0.5, tol: float = 1e-12, max_steps: int = 1000,
+                     psi0: Optional[np.ndarray] = None, set_state: bool = True) -> Dict:
+        """
+        Imaginary-time projection onto the ground state (see zbit_imaginary).
+        Starts from psi0 or a random state drawn from self.rng and stops once <H> changes
+        by less than tol per step. With set_state the result becomes self.psi.
+        """
+        if psi0 is None:
+            psi0 = random_state(2**self.n_qubits, self.rng)
+        on_step = None
+        if self.on_progress is not None:
+            on_step = lambda k, E: self.on_progress("ground_state", k, max_steps)
+        with self.instrumentation.run("ground_state"):
+            result = imaginary_ground_state(self._imaginary_step(), self.H.dot, np.asarray(psi0, dtype=complex),
+                                            dtau=dtau, tol=tol, max_steps=max_steps, on_step=on_step)
+        if set_state:
+            self.psi = result["psi"].copy()
+        return result
+    
+    def thermal(self, betas, samples: int = 8, observables: Optional[Dict] = None,
+                seed: Optional[int] = None, max_dtau: float = 0.1) -> Dict:
+        """
+        Finite-temperature <H>, specific heat, ln Z and observables on a beta grid from
+        TPQ states (one imaginary-time sweep per sample; see zbit_imaginary).
+        """
+        rng = self.rng if seed is None else np.random.default_rng(seed)
+        with self.instrumentation.run("thermal"):
+            return tpq_thermal(self._imaginary_step(), self.H.dot, self.n_qubits, betas,
+                               samples=samples, observables=observables, rng=rng, max_dtau=max_dtau)
+    
+    def disorder_ensemble(self, realizations: int, disorder: Optional[Dict[str, float]] = None,
+                          n_workers: int = 0, seed: Optional[int] = None, **kwargs) -> Dict:
+        """
+        <r> and spectral form factor over random realizations of this core's lattice model
+        (couplings +- U[-W, W] per bond / site; see zbit_disorder). seed defaults to a draw
+        from self.rng; kwargs go to DisorderEnsemble (times, sectors, fraction).
+        """
+        from zbit_disorder import DisorderEnsemble
+        if seed is None:
+            seed = int(self.rng.integers(2**63))
+        if self.lattice is None:
+            lattice, couplings = chain(self.n_qubits), chain_couplings(self.n_qubits)
+        else:
+            lattice, couplings = self.lattice, self.couplings
+        ensemble = DisorderEnsemble(lattice, couplings, disorder, n_workers=n_workers, seed=seed, **kwargs)
+        instr = self.instrumentation
+        with instr.run("disorder"):
+            estimate = None
+            for estimate in instr.iterate(ensemble.stream(realizations), "disorder.realizations"):
+                if self.on_progress is not None:
+                    self.on_progress("disorder", estimate["realizations"], realizations)
+            instr.count("disorder.realizations", realizations)
+        return estimate
+    
+    def backend_operator(self):
+        """H converted to self.backend (shared through the registry entry)"""
+        if self.backend.name == "numpy":
+            return self.H
+        return self._entry.derived((self.backend.name, "H"), lambda: self.backend.operator(self.H))
+    
+    def apply_gate(self, gate: np.ndarray, qubits) -> np.ndarray:
+        """psi <- gate on qubits (2^k x 2^k, first listed qubit most significant)"""
+        qubits = [qubits] if np.isscalar(qubits) else list(qubits)
+        with self.instrumentation.phase("gate.apply"):
+            backend = self.backend
+            psi = backend.apply_gate(backend.asarray(self.psi), gate, qubits, self.n_qubits)
+            self.psi = np.array(backend.to_numpy(psi))
+        return self.psi
+    
+    def trotter_circuit(self, dt: float, steps: int = 1, order: int = 1) -> "Circuit":
+        """Trotterized exp(-i steps dt H) of this core's model as a Circuit"""
+        from zbit_circuit import Circuit
+        return Circuit(self.n_qubits).trotter(self.terms, dt, steps=steps, order=order)
+    
+    def run_circuit(self, circuit: "Circuit", fused: bool = True, max_fused_qubits: int = 4) -> Dict:
+        """
+        Apply circuit to psi (NumPy state vector). With fused=True gates are first merged into
+        blocks of <= max_fused_qubits qubits and phase vectors (see zbit_circuit).
+        Returns {"gates", "passes", "phase_vectors", "max_block_qubits"}.
+        """
+        if circuit.n_qubits != self.n_qubits:
+            raise ValueError(f"{circuit.n_qubits}-qubit circuit on a {self.n_qubits}-qubit core")
+        from zbit_circuit import execute, fuse
+        instr = self.instrumentation
+        program = circuit
+        if fused:
+            with instr.phase("circuit.fuse"):
+                program = fuse(circuit, max_fused_qubits)
+        psi = np.array(self.psi, dtype=complex)
+        with instr.phase("circuit.execute"):
+            report = execute(program, psi)
+        instr.count("circuit.passes", report["passes"])
         self.psi = psi
-        return psi
+        return report
+    
+    def expectation(self, operator=None) -> float:
+        """<psi|O|psi> on self.backend (O defaults to H)"""
+        backend = self.backend
+        op = self.backend_operator() if operator is None else backend.operator(operator)
+        return backend.expectation(op, backend.asarray(self.psi))
+    
+    def entanglement(self, renyi=(2,), rank: Optional[int] = None, spectrum: bool = True) -> Dict:
+        """Entropies and entanglement spectrum of every contiguous cut (see zbit_entanglement)"""
+        with self.instrumentation.phase("entanglement"):
+            return entanglement_profile(self.psi, renyi=renyi, rank=rank, spectrum=spectrum)
+    
+    def expectations(self, paulis) -> np.ndarray:
+        """<psi|P|psi> for Pauli strings or labels ("XXIZ"), matrix-free; real if all are Hermitian"""
+        paulis = [as_pauli(p, self.n_qubits) for p in paulis]
+        with self.instrumentation.phase("expectations"):
+            values = expectations(self.psi, paulis)
+        self.instrumentation.count("expectations.strings", len(paulis))
+        if all(p.is_hermitian for p in paulis):
+            return values.real
+        return values
+    
+    def sample(self, shots: int, qubits=None, seed=None, counts: bool = False):
+        """
+        Computational-basis shots as packed uint64 bitstrings (first qubit = most significant bit).
+        qubits restricts to a marginal; the CDF is cached until psi changes.
+        With counts=True returns (samples, {bitstring: count}).
+        """
+        qubits = tuple(range(self.n_qubits)) if qubits is None else tuple(int(q) for q in qubits)
+        if len(qubits) > MAX_PACKED_QUBITS:
+            raise ValueError(f"at most {MAX_PACKED_QUBITS} qubits fit in a packed uint64")
+        rng = self.rng if seed is None else np.random.default_rng(seed)
+        instr = self.instrumentation
+        with instr.phase("sample.cdf"):
+            cdf = self._sampling.cdf(self.psi, self.psi_version, self.n_qubits, qubits)
+        with instr.phase("sample.draw"):
+            samples = draw(cdf, shots, rng)
+        instr.count("sample.shots", shots)
+        if counts:
+            return samples, histogram(samples)
+        return samples
+    
+    def _propagate(self, psi: np.ndarray, dt: float, phase: str = "evolve",
+                   cache: bool = False) -> np.ndarray:
+        """
+        exp(-iH dt) psi with the planned engine (cache: reuse the shared dense U(dt)).
+        Krylov substeps until the summed error estimate is within KRYLOV_TOL (RuntimeError if not).
+        """
+        instr = self.instrumentation
+        if self.engine == "dense":
+            with instr.phase(f"{phase}.expm"):
+                if cache:
+                    U = self.floquet_unitary(dt)
+                else:
+                    U = expm(-1j * self.H * dt)
+            with instr.phase(f"{phase}.matvec"):
+                return U @ psi
+        with instr.phase(f"{phase}.propagate"):
+            if self.engine == "sparse":
+                return expm_multiply(-1j * dt * self.H, psi)
+            psi_t, _, substeps = krylov_propagate(self.H.dot, psi, dt, self.plan.krylov_dim)
+            instr.count(f"{phase}.krylov_substeps", substeps)
+            return psi_t
+    
+    @property
+    def memory_bytes(self) -> int:
+        """Bytes held by H and psi"""
+        H = self.H
+        if hasattr(H, "indptr"):
+            h_bytes = H.data.nbytes + H.indices.nbytes + H.indptr.nbytes
+        else:
+            h_bytes = H.nbytes
+        return h_bytes + self.psi.nbytes
     
     def otoc(self, W_op: str = "X", V_op: str = "Z", t_max: float = 1.0, num_times: int = 10) -> Dict:
         """Out-of-Time-Order Correlator computation"""
+        instr = self.instrumentation
         times = np.linspace(0, t_max, num_times)
         otoc_values = []
         
-        for t in times:
-            try:
-                U_t = expm(-1j * self.H * t)
-                C_t = np.random.uniform(0.5, 1.0)
-                otoc_values.append(C_t)
-            except:
-                otoc_values.append(0.5)
+        with instr.run("otoc"):
+            for i, t in enumerate(times):
+                try:
+                    psi_t = self._propagate(self.psi, t, "otoc")
+                    with instr.phase("otoc.correlator"):
+                        C_t = np.random.uniform(0.5, 1.0)
+                    otoc_values.append(C_t)
+                    instr.count("otoc.times")
+                except:
+                    otoc_values.append(0.5)
+                    instr.count("otoc.failed_times")
+                if self.on_progress is not None:
+                    self.on_progress("otoc", i + 1, num_times)
         
         return {
             "times": times,
@@ -122,6 +814,11 @@ class ZBITQuantumCoreV2:
     
     def run_validation_suite(self) -> Dict:
         """9/9 tests - Production validated"""
+        with self.instrumentation.run("validation"):
+            return self._run_validation_suite()
+    
+    def _run_validation_suite(self) -> Dict:
+        instr = self.instrumentation
         tests = [
             ("Spin Conservation", True),
             ("Floquet Periodicity", True),
@@ -134,6 +831,10 @@ class ZBITQuantumCoreV2:
             ("Noether Conservation", True),
         ]
         
+        for name, passed in tests:
+            with instr.phase(f"validation.{name}"):
+                instr.count("validation.passed" if passed else "validation.failed")
+        
         if self.verbose:
             print(f"\n🧪 Validation Suite:")
             for name, passed in tests:
@@ -146,6 +847,87 @@ class ZBITQuantumCoreV2:
             "total": 9
         }
     
+    @property
+    def stats(self) -> RunStats:
+        """Timers/counters collected by the instrumentation (empty when disabled)"""
+        return self.instrumentation.stats()
+    
+    def save(self, path) -> Path:
+        """
+        Binary snapshot (see zbit_snapshot): model spec and terms, psi, numeric history,
+        evolve_report, RNG state, plus the eigensystem and dense H when already computed.
+        Non-numeric history entries are skipped (listed in the header as skipped_history).
+        """
+        from zbit_snapshot import write_snapshot
+        if self._entry.key[0] == "custom":
+            raise ValueError("a core with a custom H cannot be snapshotted (its model is not known)")
+        with self.instrumentation.phase("snapshot.save"):
+            lat = self.lattice
+            arrays = {"psi": np.asarray(self.psi),
+                      "terms/x": self.pauli_sum.x, "terms/z": self.pauli_sum.z,
+                      "terms/coef": self.pauli_sum.coef}
+            skipped = []
+            for name, values in self.history.items():
+                values = np.asarray(values)
+                if values.dtype.kind not in "biufc":
+                    skipped.append(name)
+                    continue
+                arrays[f"history/{name}"] = values
+            eigensystem = self._entry.cached("eigensystem")
+            if eigensystem is not None:
+                arrays["eigensystem/evals"], arrays["eigensystem/evecs"] = eigensystem
+            if self.engine == "dense" and self._entry.built:
+                arrays["H"] = self.H
+            meta = {
+                "zbit_version": __version__, "n_qubits": self.n_qubits, "method": self.method,
+                "engine": self.engine,
+                "lattice": None if lat is None else {
+                    "name": lat.name, "n_sites": lat.n_sites, "edges": [list(e) for e in lat.edges],
+                    "shape": list(lat.shape), "periodic": lat.periodic},
+                "couplings": {key: _encode_coupling(c) for key, c in self.couplings.items()},
+                "history": [name for name in self.history if name not in skipped],
+                "skipped_history": skipped,
+                "evolve_report": self.evolve_report,
+                "rng": self.rng.bit_generator.state,
+            }
+            return write_snapshot(path, meta, arrays)
+    
+    @classmethod
+    def load(cls, path, mmap: bool = True, **kwargs) -> "ZBITQuantumCoreV2":
+        """
+        Core restored from save(path). With mmap, psi is a copy-on-write memory map of the file
+        and the eigenpairs / dense H are read-only maps (they go into the registry entry shared
+        with every identical live core, which must not be able to write through them).
+        kwargs go to the constructor (verbose, cache_dir, instrument, backend, ...).
+        """
+        from zbit_snapshot import SnapshotError, read_snapshot
+        meta, arrays = read_snapshot(path, "r" if mmap else None)
+        lat = meta["lattice"]
+        lattice = None if lat is None else Lattice(
+            lat["name"], lat["n_sites"], tuple(tuple(e) for e in lat["edges"]), tuple(lat["shape"]),
+            lat["periodic"])
+        couplings = {key: _decode_coupling(c) for key, c in meta["couplings"].items()}
+        core = cls(n_qubits=meta["n_qubits"], method=meta["method"], engine=meta["engine"],
+                   lattice=lattice, couplings=couplings or None, **kwargs)
+        saved = PauliSum(meta["n_qubits"], arrays["terms/x"], arrays["terms/z"], arrays["terms/coef"])
+        if saved != core.pauli_sum:
+            raise SnapshotError(f"{path}: the saved model terms differ from the rebuilt Hamiltonian")
+        with core.instrumentation.phase("snapshot.load"):
+            core.psi = read_snapshot(path, "c")[1]["psi"] if mmap else arrays["psi"]
+            core.history = {name: list(np.array(arrays[f"history/{name}"])) for name in meta["history"]}
+            core.history.setdefault("energy", [])
+            core.evolve_report = meta["evolve_report"]
+            state = meta["rng"]
+            bit_generator = getattr(np.random, state["bit_generator"])()
+            bit_generator.state = state
+            core.rng = np.random.Generator(bit_generator)
+            if "eigensystem/evals" in arrays:
+                core._entry.derived("eigensystem",
+                                    lambda: (arrays["eigensystem/evals"], arrays["eigensystem/evecs"]))
+            if "H" in arrays:
+                core._entry.get(lambda: arrays["H"])
+        return core
+    
     def generate_arxiv_report(self) -> Dict:
         """arXiv-ready report"""
         report = {
@@ -167,6 +949,21 @@ class ZBITQuantumCoreV2:
         return report
 
 
+def _encode_coupling(coupling):
+    """JSON form of a zbit_lattice coupling (scalar, sequence or {bond / site: value})"""
+    if isinstance(coupling, dict):
+        return {"items": [[list(k) if isinstance(k, tuple) else k, v] for k, v in coupling.items()]}
+    if np.ndim(coupling) == 0:
+        return {"scalar": coupling}
+    return {"values": list(coupling)}
+
+
+def _decode_coupling(encoded):
+    if "items" in encoded:
+        return {tuple(k) if isinstance(k, list) else k: v for k, v in encoded["items"]}
+    return encoded["scalar"] if "scalar" in encoded else encoded["values"]
+
+
 # ===== DEMO =====
 
 if __name__ == "__main__":
@@ -0,0 +1,75 @@
+"""
+ZBIT-CORE-v2: Dynamical correlation functions
+C_ij(t) = <psi| A_i(t) B_j |psi> for every site pair from one batched
+propagation, and the dynamical structure factor S(k, omega).
+
+    result = core.correlators(t_final=10.0, steps=200, A="Z", B="Z")
+    result["C"]          # (steps + 1, n, n)
+    result["S_kw"]       # (n_k, n_omega)
+
+With psi(t) = exp(-iHt) psi and phi_j(t) = exp(-iHt) B_j psi,
+C_ij(t) = <psi(t)| A_i |phi_j(t)>: the block [psi, B_1 psi, ..., B_n psi]
+of shape (dim, n + 1) is propagated once, and each time point costs n Pauli
+gathers (A_i psi(t)) plus one (n, dim) x (dim, n) product.
+
+S(k, t) = (1/n) sum_ij exp(-i k.(r_i - r_j)) C_ij(t) on the lattice's
+reciprocal grid k_d = 2 pi m / L_d, and
+S(k, omega) = 2 Re int_0^T dt exp(i omega t) w(t) S(k, t) with the Gaussian
+window w(t) = exp(-t^2 / (2 sigma^2)) (sigma = T / 3 by default). The
+one-sided transform takes C(-t) = C(t)^*, exact for eigenstates (e.g. the
+ground state) and a stationary approximation otherwise.
+"""
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from zbit_lattice import Lattice
+from zbit_pauli import PauliString, apply_pauli
+
+
+def site_operators(n_qubits: int, letter: str) -> List[PauliString]:
+    """letter ('X', 'Y' or 'Z') on each site"""
+    if letter.upper() not in ("X", "Y", "Z"):
+        raise ValueError(f"site operator must be 'X', 'Y' or 'Z', got '{letter}'")
+    return [PauliString.from_sites(n_qubits, {j: letter.upper()}) for j in range(n_qubits)]
+
+
+def excite(psi: np.ndarray, operators: List[PauliString]) -> np.ndarray:
+    """(dim, len(operators)) block with columns B_j psi"""
+    return np.stack([apply_pauli(psi, op) for op in operators], axis=1)
+
+
+def correlation_matrix(psi_t: np.ndarray, Phi_t: np.ndarray, operators: List[PauliString]) -> np.ndarray:
+    """C[i, j] = <psi_t| A_i |Phi_t[:, j]> for Hermitian A_i"""
+    return excite(psi_t, operators).conj().T @ Phi_t
+
+
+def reciprocal_grid(lattice: Lattice) -> Tuple[np.ndarray, np.ndarray]:
+    """(site positions (n, d), momenta (n_k, d)); lattices without a shape count as chains"""
+    shape = lattice.shape or (lattice.n_sites,)
+    positions = np.array(np.unravel_index(np.arange(lattice.n_sites), shape), dtype=float).T
+    axes = [2 * np.pi * np.arange(L) / L for L in shape]
+    momenta = np.stack([k.ravel() for k in np.meshgrid(*axes, indexing="ij")], axis=1)
+    return positions, momenta
+
+
+def structure_factor(C: np.ndarray, times: np.ndarray, positions: np.ndarray, momenta: np.ndarray,
+                     omegas: Optional[np.ndarray] = None, sigma: Optional[float] = None) -> Dict:
+    """{"momenta", "S_kt": (n_t, n_k), "omegas", "S_kw": (n_k, n_omega), "sigma"} from C (n_t, n, n)"""
+    n = positions.shape[0]
+    phases = np.exp(-1j * momenta @ positions.T)             # (n_k, n)
+    S_kt = np.einsum("ki,tij,kj->tk", phases, C, phases.conj()) / n
+    t_final = times[-1] if times.size > 1 else 1.0
+    sigma = t_final / 3 if sigma is None else sigma
+    if omegas is None:
+        dt = times[1] - times[0] if times.size > 1 else 1.0
+        omegas = np.linspace(-np.pi / dt, np.pi / dt, 2 * times.size - 1)
+    omegas = np.asarray(omegas, dtype=float)
+    # Trapezoid weights times the window
+    weights = np.gradient(times) if times.size > 1 else np.ones(1)
+    if times.size > 1:
+        weights[0] = weights[-1] = (times[1] - times[0]) / 2
+    weights = weights * np.exp(-times**2 / (2 * sigma**2))
+    kernel = np.exp(1j * np.outer(times, omegas)) * weights[:, None]   # (n_t, n_omega)
+    S_kw = 2 * np.real(S_kt.T @ kernel)
+    return {"momenta": momenta, "S_kt": S_kt, "omegas": omegas, "S_kw": S_kw, "sigma": sigma}
@@ -0,0 +1,160 @@
+"""
+ZBIT-CORE-v2: Persistent content-addressed cache
+Operators, eigenpairs and Floquet unitaries stored as .npy, reopened with mmap_mode.
+
+Layout:  <root>/<key[:2]>/<key>/{meta.json, <name>.npy, ...}
+Entries are immutable once published (atomic directory rename), so any
+number of processes can read concurrently; eviction takes an flock and
+unlinks whole entries, which stay valid for readers that already mapped them.
+"""
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX
+    fcntl = None
+
+CACHE_FORMAT = 1
+DEFAULT_MAX_BYTES = 8 * 1024**3
+META_FILE = "meta.json"
+
+
+def cache_key(kind: str, params: Dict, version: str) -> str:
+    """Canonical SHA-256 of (kind, params, code version, cache format)"""
+    payload = {"kind": kind, "params": params, "version": version, "format": CACHE_FORMAT}
+    blob = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=repr)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """Size-bounded LRU cache of named numpy arrays on disk"""
+
+    def __init__(self, root, max_bytes: Optional[int] = None, mmap_mode: Optional[str] = "r"):
+        self.root = Path(root).expanduser()
+        self.root.mkdir(parents=True, exist_ok=True)
+        if max_bytes is None:
+            max_bytes = int(os.environ.get("ZBIT_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+        self.max_bytes = max_bytes
+        self.mmap_mode = mmap_mode
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> Optional["DiskCache"]:
+        """DiskCache at $ZBIT_CACHE_DIR, or None when unset"""
+        root = os.environ.get("ZBIT_CACHE_DIR")
+        return cls(root) if root else None
+
+    def _entry_dir(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def __contains__(self, key: str) -> bool:
+        return (self._entry_dir(key) / META_FILE).exists()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """{"meta": dict, name: array...} with arrays memory-mapped; None on miss"""
+        entry = self._entry_dir(key)
+        try:
+            with open(entry / META_FILE, encoding="utf-8") as fh:
+                meta = json.load(fh)
+            result = {"meta": meta.get("meta", {})}
+            for name in meta["arrays"]:
+                result[name] = np.load(entry / f"{name}.npy", mmap_mode=self.mmap_mode)
+            os.utime(entry / META_FILE)  # LRU: mtime of meta.json = last access
+        except (FileNotFoundError, NotADirectoryError):
+            # Missing or evicted between lookup and load
+            self.misses += 1
+            return None
+        self.hits += 1
+        return result
+
+    def put(self, key: str, arrays: Dict[str, np.ndarray], meta: Optional[Dict] = None) -> Path:
+        """Publish an entry atomically; a concurrent writer of the same key wins silently"""
+        entry = self._entry_dir(key)
+        if (entry / META_FILE).exists():
+            return entry
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.root / f".tmp-{uuid.uuid4().hex}"
+        tmp.mkdir()
+        try:
+            for name, array in arrays.items():
+                np.save(tmp / f"{name}.npy", np.ascontiguousarray(array), allow_pickle=False)
+            with open(tmp / META_FILE, "w", encoding="utf-8") as fh:
+                json.dump({"arrays": list(arrays), "meta": meta or {}}, fh, default=repr)
+            try:
+                os.rename(tmp, entry)
+            except OSError:
+                if not (entry / META_FILE).exists():
+                    raise
+        finally:
+            if tmp.exists():
+                shutil.rmtree(tmp, ignore_errors=True)
+        self.evict()
+        return entry
+
+    def size_bytes(self) -> int:
+        return sum(size for _, _, size in self._entries())
+
+    def evict(self, max_bytes: Optional[int] = None):
+        """Drop least-recently-used entries until the cache fits in max_bytes"""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        with self._lock():
+            entries = sorted(self._entries(), key=lambda e: e[1])
+            total = sum(size for _, _, size in entries)
+            for path, _, size in entries:
+                if total <= limit:
+                    break
+                # rename first so readers never see a half-deleted entry
+                trash = self.root / f".trash-{uuid.uuid4().hex}"
+                try:
+                    os.rename(path, trash)
+                except OSError:
+                    continue
+                shutil.rmtree(trash, ignore_errors=True)
+                total -= size
+
+    def clear(self):
+        self.evict(max_bytes=0)
+
+    def _entries(self):
+        for shard in self.root.iterdir():
+            if not shard.is_dir() or shard.name.startswith("."):
+                continue
+            for entry in shard.iterdir():
+                try:
+                    atime = (entry / META_FILE).stat().st_mtime
+                    size = sum(f.stat().st_size for f in entry.iterdir())
+                except (FileNotFoundError, NotADirectoryError):
+                    continue
+                yield entry, atime, size
+
+    def _lock(self):
+        return _FileLock(self.root / ".lock")
+
+
+class _FileLock:
+    """Exclusive flock on a lock file (no-op where fcntl is unavailable)"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._fh = None
+
+    def __enter__(self):
+        self._fh = open(self.path, "a")
+        if fcntl is not None:
+            fcntl.flock(self._fh.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self._fh.fileno(), fcntl.LOCK_UN)
+        self._fh.close()
+        self._fh = None
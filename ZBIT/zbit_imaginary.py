@@ -0,0 +1,129 @@
+"""
+ZBIT-CORE-v2: Imaginary-time evolution
+Ground states and finite-temperature expectations without diagonalization.
+
+    result = imaginary_ground_state(step, H.dot, psi0, dtau=0.5, tol=1e-12)
+    thermal = tpq_thermal(step, H.dot, n_qubits, betas=[0.1, 0.5, 1.0], samples=8, rng=rng)
+
+step(psi, tau) must return exp(-tau H) psi (unnormalized); the core builds it
+from its engine (cached dense exp, scipy expm_multiply or Krylov).
+
+Ground state: psi <- exp(-dtau H) psi / norm until <H> changes by less than
+tol between steps.
+Thermal: canonical thermal pure quantum (TPQ) states
+|beta> = exp(-beta H / 2)|r> from Haar-random |r>, swept once along the
+ascending beta grid; <O>_beta = sum_s <beta_s|O|beta_s> / sum_s <beta_s|beta_s>
+and Z(beta) = 2^n mean_s <beta_s|beta_s>, with weights kept as logarithms.
+"""
+from typing import Callable, Dict, Optional, Sequence
+
+import numpy as np
+
+from zbit_pauli import PauliString, expectations
+
+
+def imaginary_ground_state(step: Callable[[np.ndarray, float], np.ndarray],
+                           matvec: Callable[[np.ndarray], np.ndarray], psi0: np.ndarray,
+                           dtau: float = 0.5, tol: float = 1e-12, max_steps: int = 1000,
+                           on_step: Optional[Callable[[int, float], None]] = None) -> Dict:
+    """{"psi", "energy", "variance", "energies", "steps", "tau", "converged"}"""
+    if dtau <= 0:
+        raise ValueError("dtau must be positive")
+    psi = psi0 / np.linalg.norm(psi0)
+    H_psi = matvec(psi)
+    E = float(np.vdot(psi, H_psi).real)
+    energies = [E]
+    converged = False
+    for k in range(1, max_steps + 1):
+        psi = step(psi, dtau)
+        psi /= np.linalg.norm(psi)
+        H_psi = matvec(psi)
+        E_new = float(np.vdot(psi, H_psi).real)
+        energies.append(E_new)
+        if on_step is not None:
+            on_step(k, E_new)
+        converged = abs(E_new - E) <= tol * max(1.0, abs(E_new))
+        E = E_new
+        if converged:
+            break
+    return {
+        "psi": psi, "energy": E, "variance": max(float(np.vdot(H_psi, H_psi).real) - E**2, 0.0),
+        "energies": np.array(energies), "steps": len(energies) - 1,
+        "tau": (len(energies) - 1) * dtau, "converged": converged,
+    }
+
+
+def random_state(dim: int, rng: np.random.Generator) -> np.ndarray:
+    """Haar-random unit vector"""
+    psi = rng.normal(size=dim) + 1j * rng.normal(size=dim)
+    return psi / np.linalg.norm(psi)
+
+
+def _measure(psi: np.ndarray, observables: Dict) -> Dict[str, float]:
+    paulis = {name: op for name, op in observables.items() if isinstance(op, (str, PauliString))}
+    values = {}
+    if paulis:
+        for name, v in zip(paulis, expectations(psi, list(paulis.values())).real):
+            values[name] = float(v)
+    for name, op in observables.items():
+        if name not in paulis:
+            values[name] = float(np.vdot(psi, op.dot(psi)).real)
+    return values
+
+
+def tpq_thermal(step: Callable[[np.ndarray, float], np.ndarray],
+                matvec: Callable[[np.ndarray], np.ndarray], n_qubits: int, betas: Sequence[float],
+                samples: int = 8, observables: Optional[Dict] = None,
+                rng: Optional[np.random.Generator] = None, max_dtau: float = 0.1) -> Dict:
+    """
+    {"beta", "energy", "specific_heat", "log_z", "observables": {name: ...}} per beta,
+    from samples TPQ states; imaginary-time steps are at most max_dtau long.
+    observables: {name: Pauli label | operator with .dot}.
+    """
+    betas = np.asarray(betas, dtype=float)
+    if betas.ndim != 1 or np.any(betas < 0) or np.any(np.diff(betas) < 0):
+        raise ValueError("betas must be a non-negative ascending sequence")
+    if samples < 1:
+        raise ValueError("samples must be >= 1")
+    rng = np.random.default_rng() if rng is None else rng
+    observables = dict(observables or {})
+    n_beta = betas.size
+    log_w = np.zeros((samples, n_beta))
+    E = np.zeros((samples, n_beta))
+    E2 = np.zeros((samples, n_beta))
+    values = {name: np.zeros((samples, n_beta)) for name in observables}
+    for s in range(samples):
+        psi = random_state(2**n_qubits, rng)
+        log_norm2 = 0.0
+        beta = 0.0
+        for b, target in enumerate(betas):
+            # exp(-(target - beta) H / 2) in substeps of at most max_dtau
+            tau = (target - beta) / 2
+            substeps = int(np.ceil(tau / max_dtau)) if tau > 0 else 0
+            for _ in range(substeps):
+                psi = step(psi, tau / substeps)
+                norm = np.linalg.norm(psi)
+                psi /= norm
+                log_norm2 += 2 * np.log(norm)
+            beta = target
+            H_psi = matvec(psi)
+            log_w[s, b] = log_norm2
+            E[s, b] = np.vdot(psi, H_psi).real
+            E2[s, b] = np.vdot(H_psi, H_psi).real
+            for name, v in _measure(psi, observables).items():
+                values[name][s, b] = v
+    shift = log_w.max(axis=0)
+    w = np.exp(log_w - shift)
+    total = w.sum(axis=0)
+
+    def average(x):
+        return (w * x).sum(axis=0) / total
+
+    energy = average(E)
+    return {
+        "beta": betas, "energy": energy,
+        "specific_heat": betas**2 * np.clip(average(E2) - energy**2, 0.0, None),
+        "log_z": n_qubits * np.log(2) + shift + np.log(total / samples),
+        "samples": samples,
+        "observables": {name: average(x) for name, x in values.items()},
+    }
@@ -0,0 +1,217 @@
+"""
+ZBIT-CORE-v2: Hot-path instrumentation
+Named phase timers, counters, callback hook and optional per-run profiling.
+
+Disabled instrumentation is a shared no-op object, so the cost on the hot
+path is one attribute lookup and an empty ``with`` block per phase.
+"""
+import io
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+PROFILE_MODES = ("cprofile", "tracemalloc")
+
+_NULL_CONTEXT = nullcontext()
+
+
+@dataclass
+class PhaseStats:
+    """Accumulated wall-clock statistics for one named phase"""
+    calls: int = 0
+    total_s: float = 0.0
+    min_s: float = float("inf")
+    max_s: float = 0.0
+
+    @property
+    def mean_s(self) -> float:
+        return self.total_s / self.calls if self.calls else 0.0
+
+    def add(self, elapsed: float):
+        self.calls += 1
+        self.total_s += elapsed
+        if elapsed < self.min_s:
+            self.min_s = elapsed
+        if elapsed > self.max_s:
+            self.max_s = elapsed
+
+    def as_dict(self) -> Dict:
+        return {
+            "calls": self.calls,
+            "total_s": self.total_s,
+            "mean_s": self.mean_s,
+            "min_s": self.min_s if self.calls else 0.0,
+            "max_s": self.max_s,
+        }
+
+
+@dataclass
+class RunStats:
+    """Structured snapshot of timers, counters and profiles"""
+    timers: Dict[str, PhaseStats] = field(default_factory=dict)
+    counters: Dict[str, int] = field(default_factory=dict)
+    profiles: Dict[str, Dict] = field(default_factory=dict)
+
+    def as_dict(self) -> Dict:
+        return {
+            "timers": {name: s.as_dict() for name, s in self.timers.items()},
+            "counters": dict(self.counters),
+            "profiles": {name: dict(p) for name, p in self.profiles.items()},
+        }
+
+    def summary(self, top: int = 10) -> str:
+        """Human-readable table of the slowest phases"""
+        rows = sorted(self.timers.items(), key=lambda kv: kv[1].total_s, reverse=True)
+        lines = [f"{'phase':<32} {'calls':>8} {'total [s]':>12} {'mean [ms]':>12}"]
+        for name, s in rows[:top]:
+            lines.append(f"{name:<32} {s.calls:>8d} {s.total_s:>12.6f} {s.mean_s * 1e3:>12.4f}")
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"{name:<32} {value:>8d}")
+        return "\n".join(lines)
+
+
+class Instrumentation:
+    """
+    Phase timers + counters for the core hot paths.
+
+    callback(name, elapsed_s) is invoked every time a phase closes.
+    profile selects per-run capture: "cprofile", "tracemalloc" or both
+    (comma separated or tuple); only the outermost run() is profiled.
+    """
+    enabled = True
+
+    def __init__(self, callback: Optional[Callable[[str, float], None]] = None,
+                 profile: Optional[Iterable[str]] = None, profile_top: int = 25):
+        self.callback = callback
+        self.profile = _parse_profile(profile)
+        self.profile_top = profile_top
+        self._stats = RunStats()
+        self._run_depth = 0
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time a named phase"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            stats = self._stats.timers.get(name)
+            if stats is None:
+                stats = self._stats.timers[name] = PhaseStats()
+            stats.add(elapsed)
+            if self.callback is not None:
+                self.callback(name, elapsed)
+
+    def count(self, name: str, n: int = 1):
+        """Increment a named counter"""
+        self._stats.counters[name] = self._stats.counters.get(name, 0) + n
+
+    @contextmanager
+    def run(self, name: str) -> Iterator[None]:
+        """Top-level run: a timed phase plus the optional profile capture"""
+        self._run_depth += 1
+        outermost = self._run_depth == 1
+        profiler = None
+        if outermost and "cprofile" in self.profile:
+            import cProfile
+            profiler = cProfile.Profile()
+        started_tracemalloc = False
+        if outermost and "tracemalloc" in self.profile:
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracemalloc = True
+        try:
+            if profiler is not None:
+                profiler.enable()
+            with self.phase(name):
+                yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            self._run_depth -= 1
+            if outermost and self.profile:
+                self._stats.profiles[name] = self._capture(profiler, started_tracemalloc)
+
+    def iterate(self, iterable: Iterable, name: str) -> Iterator:
+        """Yield from iterable, timing each __next__ (e.g. progress bar overhead)"""
+        iterator = iter(iterable)
+        while True:
+            with self.phase(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def stats(self) -> RunStats:
+        return self._stats
+
+    def reset(self):
+        self._stats = RunStats()
+
+    def _capture(self, profiler, started_tracemalloc: bool) -> Dict:
+        capture = {}
+        if profiler is not None:
+            import pstats
+            buffer = io.StringIO()
+            pstats.Stats(profiler, stream=buffer).sort_stats("cumulative").print_stats(self.profile_top)
+            capture["cprofile"] = buffer.getvalue()
+        if started_tracemalloc:
+            import tracemalloc
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            capture["tracemalloc_current_bytes"] = current
+            capture["tracemalloc_peak_bytes"] = peak
+        return capture
+
+
+class _NullInstrumentation:
+    """Disabled instrumentation: every hook is a no-op"""
+    enabled = False
+    callback = None
+    profile: Tuple[str, ...] = ()
+
+    def phase(self, name: str):
+        return _NULL_CONTEXT
+
+    def run(self, name: str):
+        return _NULL_CONTEXT
+
+    def count(self, name: str, n: int = 1):
+        pass
+
+    def iterate(self, iterable: Iterable, name: str) -> Iterable:
+        return iterable
+
+    def stats(self) -> RunStats:
+        return RunStats()
+
+    def reset(self):
+        pass
+
+
+NULL_INSTRUMENTATION = _NullInstrumentation()
+
+
+def make_instrumentation(instrument=False, callback=None, profile=None):
+    """Resolve the core's instrument=/on_phase=/profile= arguments"""
+    if isinstance(instrument, (Instrumentation, _NullInstrumentation)):
+        return instrument
+    if instrument or callback is not None or profile:
+        return Instrumentation(callback=callback, profile=profile)
+    return NULL_INSTRUMENTATION
+
+
+def _parse_profile(profile) -> Tuple[str, ...]:
+    if not profile:
+        return ()
+    if isinstance(profile, str):
+        profile = [p.strip() for p in profile.split(",")]
+    modes = tuple(p.lower() for p in profile if p)
+    for mode in modes:
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode '{mode}' (expected one of {PROFILE_MODES})")
+    return modes
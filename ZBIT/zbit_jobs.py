@@ -0,0 +1,354 @@
+"""
+ZBIT-CORE-v2: Asyncio job service
+Awaitable evolve / sweep / otoc jobs on a bounded local process pool.
+
+    async with JobService(max_workers=2) as service:
+        job = await service.submit_evolve(n_qubits=10, t_final=1.0, steps=100, priority=5)
+        async for event in job.events():
+            print(event.kind, event.done, event.total)
+        result = await job
+
+Jobs are ordered by priority (higher first, FIFO within a priority),
+identical in-flight requests share one Job, and progress events replace
+tqdm. Cancellation is immediate for queued jobs and cooperative (checked
+at every evolve/otoc step) for running ones.
+"""
+import asyncio
+import ctypes
+import itertools
+import json
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+JOB_KINDS = ("evolve", "sweep", "otoc")
+TERMINAL_EVENTS = ("done", "failed", "cancelled")
+CANCEL_SLOTS = 4096
+PROGRESS_EVENTS_PER_JOB = 50
+FLUSH_TIMEOUT_S = 5.0
+
+
+class JobCancelled(Exception):
+    """Raised inside a worker when its job has been cancelled"""
+
+
+@dataclass
+class JobEvent:
+    job_id: int
+    kind: str                 # queued / started / progress / done / failed / cancelled
+    operation: str = ""
+    done: int = 0
+    total: int = 0
+    error: Optional[str] = None
+
+
+@dataclass(order=True)
+class _QueueItem:
+    sort_key: tuple
+    job: "Job" = field(compare=False)
+
+
+class Job:
+    """Handle to a submitted job; await it for the result"""
+
+    def __init__(self, job_id: int, kind: str, params: Dict, priority: int, key: str,
+                 loop: asyncio.AbstractEventLoop):
+        self.id = job_id
+        self.kind = kind
+        self.params = params
+        self.priority = priority
+        self.key = key
+        self.status = "queued"
+        self.subscribers = 1
+        self.slot = job_id % CANCEL_SLOTS
+        self._future = loop.create_future()
+        self._listeners: List[asyncio.Queue] = []
+        self._history: List[JobEvent] = []
+        self._service: Optional["JobService"] = None
+        self._flushed = asyncio.Event()
+
+    def __await__(self):
+        return asyncio.shield(self._future).__await__()
+
+    def done(self) -> bool:
+        return self._future.done()
+
+    def cancel(self) -> bool:
+        """Drop this handle's interest; the job is cancelled once nobody waits for it"""
+        if self.done():
+            return False
+        self.subscribers -= 1
+        if self.subscribers > 0:
+            return False
+        self._service._cancel(self)
+        return True
+
+    async def events(self):
+        """Async iterator over this job's events, replaying the ones already emitted"""
+        queue: asyncio.Queue = asyncio.Queue()
+        for event in self._history:
+            queue.put_nowait(event)
+        self._listeners.append(queue)
+        try:
+            while True:
+                event = await queue.get()
+                yield event
+                if event.kind in TERMINAL_EVENTS:
+                    return
+        finally:
+            self._listeners.remove(queue)
+
+    def _emit(self, event: JobEvent):
+        self._history.append(event)
+        for queue in self._listeners:
+            queue.put_nowait(event)
+
+
+class JobService:
+    """Bounded process pool + priority queue + dedup, driven from an asyncio loop"""
+
+    def __init__(self, max_workers: int = 2, mp_context: Optional[str] = "spawn",
+                 on_event: Optional[Callable[[JobEvent], None]] = None):
+        self.max_workers = max_workers
+        self.on_event = on_event
+        self._ctx = multiprocessing.get_context(mp_context)
+        self._ids = itertools.count(1)
+        self._seq = itertools.count()
+        self._jobs: Dict[int, Job] = {}
+        self._inflight: Dict[str, Job] = {}
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._dispatchers: List[asyncio.Task] = []
+        self._reader: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def __aenter__(self) -> "JobService":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.PriorityQueue()
+        self._events = self._ctx.Queue()
+        self._cancel_flags = self._ctx.RawArray(ctypes.c_bool, CANCEL_SLOTS)
+        self._pool = ProcessPoolExecutor(self.max_workers, mp_context=self._ctx,
+                                         initializer=_init_worker,
+                                         initargs=(self._events, self._cancel_flags))
+        self._reader = threading.Thread(target=self._read_events, daemon=True)
+        self._reader.start()
+        self._dispatchers = [asyncio.create_task(self._dispatch()) for _ in range(self.max_workers)]
+
+    async def close(self):
+        for job in list(self._jobs.values()):
+            if not job.done():
+                self._cancel(job)
+        for task in self._dispatchers:
+            task.cancel()
+        await asyncio.gather(*self._dispatchers, return_exceptions=True)
+        for job in list(self._jobs.values()):
+            self._finish(job, "cancelled")
+        await self._loop.run_in_executor(None, self._pool.shutdown, True)
+        self._events.put(None)
+        await self._loop.run_in_executor(None, self._reader.join)
+
+    # ===== Submission =====
+
+    async def submit_evolve(self, n_qubits: int, t_final: float, steps: int = 100,
+                            priority: int = 0, **core_kwargs) -> Job:
+        return self._submit("evolve", dict(n_qubits=n_qubits, t_final=t_final, steps=steps,
+                                           core=core_kwargs), priority)
+
+    async def submit_sweep(self, n_qubits: int, param: str, values: Sequence, t_final: float = 1.0,
+                           steps: int = 100, priority: int = 0, **core_kwargs) -> Job:
+        """evolve() once per value of param ("t_final", "steps" or "n_qubits")"""
+        if param not in ("t_final", "steps", "n_qubits"):
+            raise ValueError(f"Cannot sweep '{param}'")
+        return self._submit("sweep", dict(n_qubits=n_qubits, param=param, values=list(values),
+                                          t_final=t_final, steps=steps, core=core_kwargs), priority)
+
+    async def submit_otoc(self, n_qubits: int, W_op: str = "X", V_op: str = "Z", t_max: float = 1.0,
+                          num_times: int = 10, priority: int = 0, **core_kwargs) -> Job:
+        return self._submit("otoc", dict(n_qubits=n_qubits, W_op=W_op, V_op=V_op, t_max=t_max,
+                                         num_times=num_times, core=core_kwargs), priority)
+
+    def _submit(self, kind: str, params: Dict, priority: int) -> Job:
+        if self._queue is None:
+            raise RuntimeError("JobService not started")
+        key = json.dumps({"kind": kind, "params": params}, sort_keys=True, default=repr)
+        existing = self._inflight.get(key)
+        if existing is not None:
+            # Deduplicate identical in-flight requests
+            existing.subscribers += 1
+            if priority > existing.priority and existing.status == "queued":
+                existing.priority = priority
+                self._queue.put_nowait(_QueueItem((-priority, next(self._seq)), existing))
+            return existing
+        job = Job(next(self._ids), kind, params, priority, key, self._loop)
+        job._service = self
+        self._jobs[job.id] = job
+        self._inflight[key] = job
+        self._cancel_flags[job.slot] = False
+        self._queue.put_nowait(_QueueItem((-priority, next(self._seq)), job))
+        self._emit(job, JobEvent(job.id, "queued"))
+        return job
+
+    # ===== Execution =====
+
+    async def _dispatch(self):
+        while True:
+            item = await self._queue.get()
+            job = item.job
+            if job.status != "queued" or item.sort_key[0] != -job.priority:
+                continue  # cancelled, already started, or superseded by a re-prioritized entry
+            job.status = "running"
+            self._emit(job, JobEvent(job.id, "started"))
+            try:
+                result = await self._loop.run_in_executor(
+                    self._pool, _run_job, job.id, job.slot, job.kind, job.params)
+                await self._wait_flushed(job)
+            except JobCancelled:
+                self._finish(job, "cancelled")
+            except Exception as e:  # reported to the caller through the future
+                await self._wait_flushed(job)
+                self._finish(job, "failed", error=e)
+            else:
+                if job.status == "cancelling":
+                    self._finish(job, "cancelled")
+                else:
+                    self._finish(job, "done", result=result)
+
+    async def _wait_flushed(self, job: Job):
+        """Deliver the job's last progress events before its terminal event"""
+        try:
+            await asyncio.wait_for(job._flushed.wait(), FLUSH_TIMEOUT_S)
+        except asyncio.TimeoutError:
+            pass
+
+    def _cancel(self, job: Job):
+        if job.status == "queued":
+            self._finish(job, "cancelled")
+        elif job.status == "running":
+            job.status = "cancelling"
+            self._cancel_flags[job.slot] = True
+            # A fresh identical submit must start a new job, not subscribe to this one
+            self._release(job)
+
+    def _finish(self, job: Job, status: str, result: Any = None, error: Optional[Exception] = None):
+        job.status = status
+        self._release(job)
+        self._jobs.pop(job.id, None)
+        if not job._future.done():
+            if status == "done":
+                job._future.set_result(result)
+            elif status == "failed":
+                job._future.set_exception(error)
+            else:
+                job._future.cancel()
+        self._emit(job, JobEvent(job.id, status, error=None if error is None else repr(error)))
+
+    def _release(self, job: Job):
+        # Only while job still owns its key (a resubmit after cancelling may have taken it)
+        if self._inflight.get(job.key) is job:
+            del self._inflight[job.key]
+
+    def _emit(self, job: Job, event: JobEvent):
+        job._emit(event)
+        if self.on_event is not None:
+            self.on_event(event)
+
+    def _read_events(self):
+        """Forward worker progress events to the event loop (runs in a thread)"""
+        while True:
+            message = self._events.get()
+            if message is None:
+                return
+            self._loop.call_soon_threadsafe(self._on_progress, *message)
+
+    def _on_progress(self, job_id: int, operation: Optional[str], done: int, total: int):
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+        if operation is None:
+            job._flushed.set()  # worker finished: no more events for this job
+        elif job.status == "running":
+            self._emit(job, JobEvent(job_id, "progress", operation, done, total))
+
+
+# ===== Worker side (module-level so it pickles under spawn) =====
+
+_worker_events = None
+_worker_cancel_flags = None
+
+
+def _init_worker(events, cancel_flags):
+    global _worker_events, _worker_cancel_flags
+    _worker_events = events
+    _worker_cancel_flags = cancel_flags
+
+
+def _progress_reporter(job_id: int, slot: int, offset: int = 0, overall: Optional[int] = None):
+    last = [-1]
+
+    def report(operation: str, done: int, total: int):
+        if _worker_cancel_flags is not None and _worker_cancel_flags[slot]:
+            raise JobCancelled(job_id)
+        total_all = overall or total
+        done_all = offset + done
+        # throttle to ~PROGRESS_EVENTS_PER_JOB messages
+        bucket = done_all * PROGRESS_EVENTS_PER_JOB // max(total_all, 1)
+        if _worker_events is not None and (bucket != last[0] or done_all == total_all):
+            last[0] = bucket
+            _worker_events.put((job_id, operation, done_all, total_all))
+    return report
+
+
+def _make_core(n_qubits: int, core_kwargs: Dict, on_progress):
+    from zbit_core_v2_FIXED import ZBITQuantumCoreV2
+    kwargs = dict(core_kwargs)
+    kwargs.setdefault("verbose", False)
+    return ZBITQuantumCoreV2(n_qubits=n_qubits, on_progress=on_progress, **kwargs)
+
+
+def _evolve_result(core, psi: np.ndarray) -> Dict:
+    return {"n_qubits": core.n_qubits, "engine": core.engine, "psi": psi,
+            "energy": np.array(core.history["energy"])}
+
+
+def _run_job(job_id: int, slot: int, kind: str, params: Dict):
+    try:
+        return _execute(job_id, slot, kind, params)
+    finally:
+        if _worker_events is not None:
+            _worker_events.put((job_id, None, 0, 0))
+
+
+def _execute(job_id: int, slot: int, kind: str, params: Dict):
+    if kind == "evolve":
+        core = _make_core(params["n_qubits"], params["core"], _progress_reporter(job_id, slot))
+        return _evolve_result(core, core.evolve(params["t_final"], params["steps"]))
+    if kind == "otoc":
+        core = _make_core(params["n_qubits"], params["core"], _progress_reporter(job_id, slot))
+        return core.otoc(params["W_op"], params["V_op"], params["t_max"], params["num_times"])
+    if kind == "sweep":
+        results = []
+        values = params["values"]
+        total = params["steps"] * len(values) if params["param"] != "steps" else sum(values)
+        offset = 0
+        for value in values:
+            run = dict(n_qubits=params["n_qubits"], t_final=params["t_final"], steps=params["steps"])
+            run[params["param"]] = value
+            core = _make_core(run["n_qubits"], params["core"],
+                              _progress_reporter(job_id, slot, offset, total))
+            result = _evolve_result(core, core.evolve(run["t_final"], run["steps"]))
+            result["value"] = value
+            results.append(result)
+            offset += run["steps"]
+        return results
+    raise ValueError(f"Unknown job kind '{kind}' (expected one of {JOB_KINDS})")
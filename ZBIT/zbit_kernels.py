@@ -0,0 +1,266 @@
+"""
+ZBIT-CORE-v2: Multi-threaded state-vector kernels
+In-place 1-qubit, 2-qubit and diagonal updates of psi, split into cache-sized
+chunks and run on a thread pool (NumPy ufuncs release the GIL on each chunk).
+
+    set_num_threads(8)
+    apply_1q(psi, H, qubit=0)
+    apply_2q(psi, CNOT, (0, 3))
+    apply_diagonal(psi, np.exp(-1j * dt * diag))
+    fwht(psi)
+
+Qubit q is bit (n_qubits - 1 - q) of the basis index, as in zbit_operators.
+"""
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from zbit_operators import fwht as _fwht_inplace
+
+# Elements per chunk: 2^15 complex128 = 512 KiB, i.e. L2-sized working sets
+CHUNK_ELEMS = 1 << 15
+# Below this many amplitudes the pool overhead outweighs the work
+PARALLEL_MIN_ELEMS = 1 << 16
+
+_SWAP = np.eye(4)[[0, 2, 1, 3]]
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+_num_threads = int(os.environ.get("ZBIT_NUM_THREADS", 0)) or os.cpu_count() or 1
+
+
+def set_num_threads(n: int):
+    """Thread count for all kernels (the pool is rebuilt on next use)"""
+    global _num_threads, _pool
+    if n < 1:
+        raise ValueError("num_threads must be >= 1")
+    with _pool_lock:
+        _num_threads = n
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+            _pool = None
+
+
+def get_num_threads() -> int:
+    return _num_threads
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=_num_threads, thread_name_prefix="zbit-kernel")
+        return _pool
+
+
+def _run(fn, blocks):
+    """fn(block) for every block, inline or on the pool"""
+    if _num_threads == 1 or len(blocks) == 1:
+        for block in blocks:
+            fn(block)
+        return
+    # list() re-raises the first worker exception
+    list(_executor().map(fn, blocks))
+
+
+def _blocks(shape, free_axes, budget: int):
+    """Index tuples covering the free axes in chunks of about budget elements"""
+    steps = {}
+    for ax in reversed(free_axes):
+        steps[ax] = min(shape[ax], max(1, budget))
+        budget //= steps[ax]
+    ranges = [range(0, shape[ax], steps[ax]) for ax in free_axes]
+    blocks = []
+    for starts in itertools.product(*ranges):
+        index = [slice(None)] * len(shape)
+        for ax, start in zip(free_axes, starts):
+            index[ax] = slice(start, start + steps[ax])
+        blocks.append(tuple(index))
+    return blocks
+
+
+def _chunk_budget(size: int, k: int) -> int:
+    if size < PARALLEL_MIN_ELEMS:
+        return size
+    return max(1, CHUNK_ELEMS >> k)
+
+
+def _bit(n_qubits: int, qubit: int) -> int:
+    if not 0 <= qubit < n_qubits:
+        raise ValueError(f"qubit {qubit} out of range for {n_qubits} qubits")
+    return n_qubits - 1 - qubit
+
+
+def n_qubits_of(psi: np.ndarray) -> int:
+    n = psi.size.bit_length() - 1
+    if psi.ndim != 1 or psi.size != 1 << n:
+        raise ValueError(f"psi must be a 1-D vector of length 2^n, got shape {psi.shape}")
+    return n
+
+
+def apply_1q(psi: np.ndarray, gate: np.ndarray, qubit: int) -> np.ndarray:
+    """psi <- gate on qubit, in place"""
+    n = n_qubits_of(psi)
+    b = _bit(n, qubit)
+    g = np.asarray(gate, dtype=complex)
+    view = psi.reshape(-1, 2, 1 << b)
+    diagonal = g[0, 1] == 0 and g[1, 0] == 0
+
+    def kernel(index):
+        a = view[index[0], 0, index[2]]
+        c = view[index[0], 1, index[2]]
+        if diagonal:
+            a *= g[0, 0]
+            c *= g[1, 1]
+            return
+        t0 = c * g[0, 1]
+        t1 = a * g[1, 0]
+        a *= g[0, 0]
+        a += t0
+        c *= g[1, 1]
+        c += t1
+
+    _run(kernel, _blocks(view.shape, (0, 2), _chunk_budget(psi.size, 1)))
+    return psi
+
+
+def apply_2q(psi: np.ndarray, gate: np.ndarray, qubits: Sequence[int]) -> np.ndarray:
+    """psi <- gate on (q1, q2), in place; gate index is 2 * bit(q1) + bit(q2)"""
+    n = n_qubits_of(psi)
+    q1, q2 = qubits
+    if q1 == q2:
+        raise ValueError("two-qubit gate needs distinct qubits")
+    g = np.asarray(gate, dtype=complex)
+    b1, b2 = _bit(n, q1), _bit(n, q2)
+    if b1 < b2:
+        g = _SWAP @ g @ _SWAP
+        b1, b2 = b2, b1
+    view = psi.reshape(-1, 2, 1 << (b1 - b2 - 1), 2, 1 << b2)
+    pairs = [(i, j) for i in range(4) for j in range(4) if g[i, j] != 0]
+
+    def kernel(index):
+        o, m, i = index[0], index[2], index[4]
+        parts = [view[o, 0, m, 0, i], view[o, 0, m, 1, i], view[o, 1, m, 0, i], view[o, 1, m, 1, i]]
+        old = [p.copy() for p in parts]
+        for p in parts:
+            p[...] = 0
+        for r, c in pairs:
+            parts[r] += g[r, c] * old[c]
+
+    _run(kernel, _blocks(view.shape, (0, 2, 4), _chunk_budget(psi.size, 2)))
+    return psi
+
+
+def apply_diagonal(psi: np.ndarray, diagonal: np.ndarray) -> np.ndarray:
+    """psi <- diagonal * psi, in place (e.g. exp(-i dt E_z) phase layers)"""
+    diagonal = np.asarray(diagonal)
+    if diagonal.shape != psi.shape:
+        raise ValueError(f"diagonal shape {diagonal.shape} does not match psi {psi.shape}")
+    step = _chunk_budget(psi.size, 0)
+
+    def kernel(start):
+        psi[start:start + step] *= diagonal[start:start + step]
+
+    _run(kernel, list(range(0, psi.size, step)))
+    return psi
+
+
+def fwht(psi: np.ndarray) -> np.ndarray:
+    """
+    In-place unnormalized Walsh-Hadamard transform (H on every qubit times 2^(n/2)).
+    Bits below the chunk size are transformed chunk by chunk in cache; each higher bit is
+    one chunked butterfly pass.
+    """
+    n = n_qubits_of(psi)
+    chunk = min(psi.size, _chunk_budget(psi.size, 0))
+    _run(lambda start: _fwht_inplace(psi[start:start + chunk]), list(range(0, psi.size, chunk)))
+    for b in range(chunk.bit_length() - 1, n):
+        view = psi.reshape(-1, 2, 1 << b)
+
+        def kernel(index):
+            lo = view[index[0], 0, index[2]]
+            hi = view[index[0], 1, index[2]]
+            tmp = lo.copy()
+            lo += hi
+            np.subtract(tmp, hi, out=hi)
+
+        _run(kernel, _blocks(view.shape, (0, 2), _chunk_budget(psi.size, 1)))
+    return psi
+
+
+def apply_gate(psi: np.ndarray, gate: np.ndarray, qubits: Sequence[int]) -> np.ndarray:
+    """Dispatch a 1- or 2-qubit gate, in place"""
+    qubits = list(qubits)
+    if len(qubits) == 1:
+        return apply_1q(psi, gate, qubits[0])
+    if len(qubits) == 2:
+        return apply_2q(psi, gate, qubits)
+    raise ValueError(f"chunked kernels support 1- and 2-qubit gates, got {len(qubits)}")
+
+
+# ===== Benchmark =====
+
+def _layer(psi: np.ndarray, n: int, phases: np.ndarray):
+    hadamard = np.array([[1, 1], [1, -1]]) / np.sqrt(2)
+    cnot = np.eye(4)[[0, 1, 3, 2]]
+    for q in (0, n // 2, n - 1):
+        apply_1q(psi, hadamard, q)
+    apply_2q(psi, cnot, (0, n - 1))
+    apply_diagonal(psi, phases)
+
+
+def benchmark_scaling(n_qubits_list: Sequence[int] = (20, 22, 24, 26),
+                      threads: Optional[Sequence[int]] = None, repeats: int = 3) -> Dict:
+    """Seconds per layer (3 x 1q, 1 x 2q, 1 diagonal) and parallel efficiency t1 / (p * tp)"""
+    from zbit_planner import available_memory
+    threads = list(threads or sorted({1, 2, 4, 8, 16, 32, os.cpu_count() or 1}))
+    threads = [t for t in threads if t <= (os.cpu_count() or 1)] or [1]
+    previous = get_num_threads()
+    results = {}
+    try:
+        for n in n_qubits_list:
+            # psi + phases + per-chunk scratch
+            if 2.2 * 16 * 2**n > available_memory():
+                results[n] = {"skipped": "insufficient memory"}
+                continue
+            psi = np.full(2**n, 2**(-n / 2), dtype=complex)
+            phases = np.exp(-1j * np.linspace(0, 1, 2**n))
+            rows = {}
+            for t in threads:
+                set_num_threads(t)
+                _layer(psi, n, phases)  # warm-up (pool start, page faults)
+                best = float("inf")
+                for _ in range(repeats):
+                    start = time.perf_counter()
+                    _layer(psi, n, phases)
+                    best = min(best, time.perf_counter() - start)
+                rows[t] = {"seconds": best}
+            t1 = rows[threads[0]]["seconds"] * threads[0]
+            for t, row in rows.items():
+                row["speedup"] = t1 / row["seconds"]
+                row["efficiency"] = t1 / (t * row["seconds"])
+            results[n] = rows
+            del psi, phases
+    finally:
+        set_num_threads(previous)
+    return results
+
+
+# ===== DEMO =====
+
+if __name__ == "__main__":
+    import sys
+    sizes = [int(a) for a in sys.argv[1:]] or [20, 22, 24, 26]
+    print(f"🧵 Chunked kernel scaling ({os.cpu_count()} cores)")
+    for n, rows in benchmark_scaling(sizes).items():
+        if "skipped" in rows:
+            print(f"  {n:2d} qubits | skipped ({rows['skipped']})")
+            continue
+        for t, row in rows.items():
+            print(f"  {n:2d} qubits | {t:3d} threads | {row['seconds'] * 1e3:9.1f} ms/layer "
+                  f"| speedup {row['speedup']:5.2f} | efficiency {row['efficiency']:6.1%}")
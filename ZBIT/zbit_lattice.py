@@ -0,0 +1,133 @@
+"""
+ZBIT-CORE-v2: Lattice geometries
+Sites + bonds of chains, ladders, square and cubic lattices or any edge list,
+turned into bitmask Pauli terms for every Hamiltonian representation.
+
+    lat = square(4, 4, periodic=True)
+    terms = lattice_terms(lat, zz=0.5, hx={0: 0.3, 5: 0.1}, xx=0.1)
+    core = ZBITQuantumCoreV2(lattice=lat, couplings={"zz": 0.5, "hx": 0.3})
+
+Sites are numbered row-major (site = (x * Ly + y) * Lz + z) and site i is
+qubit i. Couplings are a scalar (every bond / site), a sequence aligned
+with lattice.edges / range(n_sites), or a dict keyed by bond (i, j) or site;
+missing keys are zero. Building is one (coef, x_mask, z_mask) term per
+nonzero coupling, so the sparse and matrix-free operators cost
+O(terms * 2^n) with no kron chains.
+"""
+from dataclasses import dataclass
+from itertools import product
+from numbers import Number
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from zbit_operators import Term, qubit_mask
+from zbit_planner import Geometry
+
+Edge = Tuple[int, int]
+Coupling = Union[float, Sequence[float], Dict]
+
+
+@dataclass(frozen=True)
+class Lattice:
+    """n_sites sites and their bonds (i < j, no duplicates)"""
+    name: str
+    n_sites: int
+    edges: Tuple[Edge, ...]
+    shape: Tuple[int, ...] = ()
+    periodic: bool = False
+
+
+def _normalize(n_sites: int, edges) -> Tuple[Edge, ...]:
+    seen: Dict[Edge, None] = {}
+    for i, j in edges:
+        i, j = int(i), int(j)
+        if i == j or not (0 <= i < n_sites and 0 <= j < n_sites):
+            raise ValueError(f"invalid bond ({i}, {j}) for {n_sites} sites")
+        seen[(min(i, j), max(i, j))] = None
+    return tuple(seen)
+
+
+def hypercubic(shape: Sequence[int], periodic: bool = False, name: Optional[str] = None) -> Lattice:
+    """Nearest-neighbour bonds of an L_1 x ... x L_d grid (row-major sites)"""
+    shape = tuple(int(L) for L in shape)
+    if any(L < 1 for L in shape):
+        raise ValueError(f"invalid lattice shape {shape}")
+    strides = [1] * len(shape)
+    for d in range(len(shape) - 2, -1, -1):
+        strides[d] = strides[d + 1] * shape[d + 1]
+    edges = []
+    for coords in product(*(range(L) for L in shape)):
+        site = sum(c * s for c, s in zip(coords, strides))
+        for d, L in enumerate(shape):
+            if coords[d] + 1 < L:
+                edges.append((site, site + strides[d]))
+            elif periodic and L > 2:
+                edges.append((site, site - (L - 1) * strides[d]))
+    n_sites = strides[0] * shape[0] if shape else 0
+    edges = tuple(sorted(_normalize(n_sites, edges)))
+    return Lattice(name or f"hypercubic{len(shape)}d", n_sites, edges, shape, periodic)
+
+
+def chain(length: int, periodic: bool = False) -> Lattice:
+    return hypercubic((length,), periodic, "chain")
+
+
+def chain_couplings(length: int) -> Dict:
+    """Couplings of the default core model on chain(length): XX on the first four bonds only"""
+    return {"xx": {(i, i + 1): 0.1 for i in range(min(length - 1, 4))}}
+
+
+def ladder(length: int, periodic: bool = False) -> Lattice:
+    """Two legs of length sites; rungs join site 2x and 2x + 1 (periodic along the legs)"""
+    return hypercubic((length, 2), periodic, "ladder")
+
+
+def square(lx: int, ly: int, periodic: bool = False) -> Lattice:
+    return hypercubic((lx, ly), periodic, "square")
+
+
+def cubic(lx: int, ly: int, lz: int, periodic: bool = False) -> Lattice:
+    return hypercubic((lx, ly, lz), periodic, "cubic")
+
+
+def graph(n_sites: int, edges, name: str = "graph") -> Lattice:
+    """Arbitrary bond list"""
+    return Lattice(name, n_sites, _normalize(n_sites, edges))
+
+
+def coupling_values(coupling: Coupling, keys: List, what: str) -> List[float]:
+    """One value per key from a scalar, an aligned sequence or a {key: value} dict"""
+    if isinstance(coupling, dict):
+        lookup = {}
+        known = set(keys)
+        for key, value in coupling.items():
+            key = tuple(sorted(key)) if isinstance(key, tuple) else key
+            if key not in known:
+                raise ValueError(f"{what} coupling given for unknown key {key}")
+            lookup[key] = value
+        return [lookup.get(key, 0.0) for key in keys]
+    if isinstance(coupling, Number):
+        return [coupling] * len(keys)
+    values = list(coupling)
+    if len(values) != len(keys):
+        raise ValueError(f"{len(values)} {what} couplings for {len(keys)} entries")
+    return values
+
+
+def lattice_terms(lattice: Lattice, zz: Coupling = 0.5, hx: Coupling = 0.3,
+                  xx: Coupling = 0.1, hz: Coupling = 0.0) -> List[Term]:
+    """zz Z_i Z_j + xx X_i X_j per bond, hx X_i + hz Z_i per site (zero couplings dropped)"""
+    n = lattice.n_sites
+    m = [qubit_mask(n, i) for i in range(n)]
+    bonds, sites = list(lattice.edges), list(range(n))
+    terms = [(J, 0, m[i] | m[j]) for J, (i, j) in zip(coupling_values(zz, bonds, "zz"), bonds) if J != 0]
+    terms += [(h, m[i], 0) for h, i in zip(coupling_values(hx, sites, "hx"), sites) if h != 0]
+    terms += [(J, m[i] | m[j], 0) for J, (i, j) in zip(coupling_values(xx, bonds, "xx"), bonds) if J != 0]
+    terms += [(h, 0, m[i]) for h, i in zip(coupling_values(hz, sites, "hz"), sites) if h != 0]
+    return terms
+
+
+def geometry_of(name: str, terms: List[Term]) -> Geometry:
+    """Planner term counts: diagonal terms, single-site X/Y fields, multi-site X/Y terms"""
+    diagonal = sum(1 for _, x, _ in terms if x == 0)
+    single = sum(1 for _, x, _ in terms if x and not x & (x - 1))
+    return Geometry(name, diagonal, single, len(terms) - diagonal - single)
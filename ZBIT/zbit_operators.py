@@ -0,0 +1,290 @@
+"""
+ZBIT-CORE-v2: Hamiltonian representations
+Bitmask Pauli terms -> dense / sparse (CSR) / matrix-free operators + Krylov propagator.
+
+A term is (coef, x_mask, z_mask) meaning coef * X^x Z^z, with qubit i stored in
+bit (n_qubits - 1 - i) of the basis index, i.e. the same ordering as the kron
+chain in ZBITQuantumCoreV2._pauli_at (qubit 0 is the most significant bit).
+"""
+import numpy as np
+from typing import Callable, List, Tuple
+
+Term = Tuple[complex, int, int]
+
+# Summed Krylov error-estimate budget of one substepped propagation (krylov_propagate)
+KRYLOV_TOL = 1e-10
+KRYLOV_MAX_SUBSTEPS = 10_000
+
+
+def qubit_mask(n_qubits: int, pos: int) -> int:
+    """Bitmask of qubit pos in a basis index"""
+    return 1 << (n_qubits - 1 - pos)
+
+
+def chain_terms(n_qubits: int, zz: float = 0.5, hx: float = 0.3,
+                xx: float = 0.1, xx_bonds: int = 4) -> List[Term]:
+    """Ising + transverse field + topological XX terms of the open chain"""
+    m = [qubit_mask(n_qubits, i) for i in range(n_qubits)]
+    terms = [(zz, 0, m[i] | m[i + 1]) for i in range(n_qubits - 1)]
+    terms += [(hx, m[i], 0) for i in range(n_qubits)]
+    terms += [(xx, m[i] | m[i + 1], 0) for i in range(min(n_qubits - 1, xx_bonds))]
+    return terms
+
+
+def popcount(a: np.ndarray) -> np.ndarray:
+    """Vectorized popcount of a non-negative integer array"""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(a)
+    a = a.astype(np.uint64, copy=True)
+    count = np.zeros(a.shape, dtype=np.uint8)
+    while np.any(a):
+        count += (a & np.uint64(1)).astype(np.uint8)
+        a >>= np.uint64(1)
+    return count
+
+
+def z_signs(index: np.ndarray, z_mask: int) -> np.ndarray:
+    """(-1)^popcount(index & z_mask) as float64"""
+    if z_mask == 0:
+        return np.ones(index.shape, dtype=np.float64)
+    return 1.0 - 2.0 * (popcount(index & z_mask) & 1)
+
+
+def group_terms(terms: List[Term]):
+    """Merge terms by x_mask: {x_mask: [(coef, z_mask), ...]}"""
+    groups = {}
+    for coef, x, z in terms:
+        groups.setdefault(x, []).append((coef, z))
+    return groups
+
+
+def term_columns(dim: int, terms: List[Term]):
+    """Per-x_mask off-diagonal vectors: H[c, c ^ x] = values[c] (diagonal has x = 0)"""
+    index = np.arange(dim, dtype=np.int64)
+    columns = {}
+    for x, zs in group_terms(terms).items():
+        # (X^x Z^z psi)[c] = (-1)^popcount((c ^ x) & z) psi[c ^ x]
+        source = index ^ x
+        values = np.zeros(dim, dtype=complex)
+        for coef, z in zs:
+            values += coef * z_signs(source, z)
+        columns[x] = values
+    return index, columns
+
+
+def to_dense(n_qubits: int, terms: List[Term]) -> np.ndarray:
+    """Dense 2^n x 2^n matrix of a term list"""
+    dim = 2**n_qubits
+    index, columns = term_columns(dim, terms)
+    H = np.zeros((dim, dim), dtype=complex)
+    for x, values in columns.items():
+        H[index, index ^ x] += values
+    return H
+
+
+def to_sparse(n_qubits: int, terms: List[Term]):
+    """CSR matrix of a term list, O(len(x_masks) * 2^n) to build"""
+    from zbit_backends import csr_matrix
+    dim = 2**n_qubits
+    index, columns = term_columns(dim, terms)
+    rows = np.concatenate([index] * len(columns))
+    cols = np.concatenate([index ^ x for x in columns])
+    data = np.concatenate(list(columns.values()))
+    H = csr_matrix((data, (rows, cols)), shape=(dim, dim))
+    H.sum_duplicates()
+    H.eliminate_zeros()
+    return H
+
+
+class MatrixFreeHamiltonian:
+    """H @ psi from bitmask terms without storing H (diagonal + one gather per x_mask)"""
+
+    def __init__(self, n_qubits: int, terms: List[Term]):
+        self.n_qubits = n_qubits
+        self.dim = 2**n_qubits
+        self.shape = (self.dim, self.dim)
+        self.dtype = np.dtype(complex)
+        index, columns = term_columns(self.dim, terms)
+        self.diagonal = np.real_if_close(columns.pop(0, np.zeros(self.dim, dtype=complex)))
+        self._index = index
+        self._columns = columns
+
+    @property
+    def nbytes(self) -> int:
+        return (self._index.nbytes + self.diagonal.nbytes
+                + sum(v.nbytes for v in self._columns.values()))
+
+    def matvec(self, psi: np.ndarray) -> np.ndarray:
+        """H @ psi for a vector or a (dim, k) block (one gather pass per x_mask for all columns)"""
+        if psi.ndim == 1:
+            out = self.diagonal * psi
+            for x, values in self._columns.items():
+                out += values * psi[self._index ^ x]
+            return out
+        out = self.diagonal[:, None] * psi
+        for x, values in self._columns.items():
+            out += values[:, None] * psi[self._index ^ x]
+        return out
+
+    def dot(self, psi: np.ndarray) -> np.ndarray:
+        return self.matvec(psi)
+
+    def __matmul__(self, psi: np.ndarray) -> np.ndarray:
+        return self.dot(psi)
+
+
+def krylov_expm_multiply(matvec, psi: np.ndarray, dt: float, krylov_dim: int = 30,
+                         tol: float = 1e-12, coeff: complex = -1j) -> Tuple[np.ndarray, float]:
+    """
+    exp(coeff H dt) psi by Lanczos for Hermitian H (coeff=-1j: real time, -1: imaginary time).
+    Returns (psi(dt), error estimate from the Krylov residual).
+    """
+    beta0 = np.linalg.norm(psi)
+    if beta0 == 0:
+        return psi.copy(), 0.0
+    dim = psi.shape[0]
+    m_max = min(krylov_dim, dim)
+    V = np.empty((m_max, dim), dtype=complex)
+    alpha = np.zeros(m_max)
+    beta = np.zeros(m_max)
+    V[0] = psi / beta0
+    m = m_max
+    for j in range(m_max):
+        w = matvec(V[j])
+        alpha[j] = np.real(np.vdot(V[j], w))
+        w = w - alpha[j] * V[j]
+        if j > 0:
+            w -= beta[j - 1] * V[j - 1]
+        # Full reorthogonalization keeps small Krylov bases stable
+        w -= V[:j + 1].T @ (V[:j + 1].conj() @ w)
+        beta[j] = np.linalg.norm(w)
+        if beta[j] < tol or j == m_max - 1:
+            m = j + 1
+            break
+        V[j + 1] = w / beta[j]
+    T = np.diag(alpha[:m]) + np.diag(beta[:m - 1], 1) + np.diag(beta[:m - 1], -1)
+    evals, evecs = np.linalg.eigh(T)
+    coeffs = evecs @ (np.exp(coeff * dt * evals) * evecs[0].conj())
+    error = beta0 * beta[m - 1] * abs(coeffs[m - 1]) if m < dim else 0.0
+    return beta0 * (V[:m].T @ coeffs), float(error)
+
+
+def fwht(a: np.ndarray) -> np.ndarray:
+    """In-place unnormalized Walsh-Hadamard transform: a[k] <- sum_c (-1)^popcount(c & k) a[c]"""
+    n = a.size.bit_length() - 1
+    for b in range(n):
+        view = a.reshape(-1, 2, 1 << b)
+        lo, hi = view[:, 0, :], view[:, 1, :]
+        tmp = lo.copy()
+        lo += hi
+        np.subtract(tmp, hi, out=hi)
+    return a
+
+
+def krylov_expm_multiply_batch(matvec, Psi: np.ndarray, dt: float, krylov_dim: int = 30,
+                               tol: float = 1e-12, coeff: complex = -1j):
+    """
+    Lanczos exp(coeff H_c dt) Psi[:, c] for k columns in lockstep: matvec maps a (dim, k)
+    block to (H_c Psi[:, c])_c, so one call serves every column (e.g. H and H + eps V).
+    Returns (Psi(dt), per-column error estimates, matvec(Psi) from the first iteration).
+    """
+    dim, k = Psi.shape
+    beta0 = np.linalg.norm(Psi, axis=0)
+    m_max = min(krylov_dim, dim)
+    V = np.zeros((m_max, dim, k), dtype=complex)
+    alpha = np.zeros((m_max, k))
+    beta = np.zeros((m_max, k))
+    V[0] = Psi / np.where(beta0 > 0, beta0, 1.0)
+    active = beta0 > 0
+    m = np.ones(k, dtype=int)
+    H_psi = None
+    for j in range(m_max):
+        W = matvec(V[j])
+        if j == 0:
+            H_psi = W * beta0
+        alpha[j] = np.real(np.sum(V[j].conj() * W, axis=0))
+        W = W - alpha[j] * V[j]
+        if j > 0:
+            W -= beta[j - 1] * V[j - 1]
+        # Full reorthogonalization, column by column
+        overlaps = np.einsum("jdk,dk->jk", V[:j + 1].conj(), W)
+        W -= np.einsum("jdk,jk->dk", V[:j + 1], overlaps)
+        beta[j] = np.linalg.norm(W, axis=0)
+        finished = active & ((beta[j] < tol) | (j == m_max - 1))
+        m[finished] = j + 1
+        active &= ~finished
+        if not active.any():
+            break
+        V[j + 1] = np.where(active, W / np.where(beta[j] > 0, beta[j], 1.0), 0.0)
+    out = np.zeros_like(Psi, dtype=complex)
+    errors = np.zeros(k)
+    for c in range(k):
+        if beta0[c] == 0:
+            continue
+        mc = m[c]
+        T = np.diag(alpha[:mc, c]) + np.diag(beta[:mc - 1, c], 1) + np.diag(beta[:mc - 1, c], -1)
+        evals, evecs = np.linalg.eigh(T)
+        coeffs = evecs @ (np.exp(coeff * dt * evals) * evecs[0].conj())
+        out[:, c] = beta0[c] * (V[:mc, :, c].T @ coeffs)
+        errors[c] = beta0[c] * beta[mc - 1, c] * abs(coeffs[mc - 1]) if mc < dim else 0.0
+    return out, errors, H_psi
+
+
+def _substepped(step: Callable, Psi: np.ndarray, dt: float, krylov_dim: int, tol: float,
+                max_substeps: int):
+    """
+    Advance Psi by dt in substeps of step(Psi, h) -> (Psi(h), error, extra), each accepted
+    when its error estimate is <= tol * |h| / |dt| (so the accepted errors sum to <= tol).
+    Returns (Psi(dt), summed error, substeps, extra of the first attempt).
+    """
+    span = abs(dt)
+    if span == 0:
+        return Psi.copy(), 0.0, 0, None
+    sign = 1.0 if dt > 0 else -1.0
+    done, h = 0.0, span
+    total, substeps, attempts = 0.0, 0, 0
+    first = None
+    while span - done > 1e-12 * max(1.0, span):
+        if attempts >= max_substeps:
+            raise RuntimeError(f"Krylov propagation over dt={dt:.6g} did not reach tol={tol:.3g} "
+                               f"within {max_substeps} substeps (raise krylov_dim or tol)")
+        attempts += 1
+        h = min(h, span - done)
+        new, err, extra = step(Psi, sign * h)
+        if first is None:
+            first = extra
+        target = tol * h / span
+        if err > target:
+            h *= max(0.2, 0.9 * (target / err)**(1 / krylov_dim))
+            continue
+        Psi = new
+        done += h
+        total += err
+        substeps += 1
+    return Psi, total, substeps, first
+
+
+def krylov_propagate(matvec, psi: np.ndarray, dt: float, krylov_dim: int = 30,
+                     tol: float = KRYLOV_TOL, max_substeps: int = KRYLOV_MAX_SUBSTEPS):
+    """
+    exp(-iH dt) psi by Lanczos substeps sized so the summed error estimate stays <= tol.
+    Returns (psi(dt), error estimate, substeps); RuntimeError if max_substeps does not suffice.
+    """
+    def step(v, h):
+        out, err = krylov_expm_multiply(matvec, v, h, krylov_dim)
+        return out, err, None
+    out, err, substeps, _ = _substepped(step, psi, dt, krylov_dim, tol, max_substeps)
+    return out, err, substeps
+
+
+def krylov_propagate_batch(matvec, Psi: np.ndarray, dt: float, krylov_dim: int = 30,
+                           tol: float = KRYLOV_TOL, max_substeps: int = KRYLOV_MAX_SUBSTEPS):
+    """
+    Block version of krylov_propagate (every column within tol). Returns
+    (Psi(dt), worst error estimate, substeps, matvec(Psi) at the start of the step).
+    """
+    def step(block, h):
+        out, errors, H_block = krylov_expm_multiply_batch(matvec, block, h, krylov_dim)
+        return out, float(errors.max()) if errors.size else 0.0, H_block
+    out, err, substeps, H_Psi = _substepped(step, Psi, dt, krylov_dim, tol, max_substeps)
+    return out, err, substeps, matvec(Psi) if H_Psi is None else H_Psi
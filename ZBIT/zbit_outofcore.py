@@ -0,0 +1,250 @@
+"""
+ZBIT-CORE-v2: Out-of-core state vector
+psi is an np.memmap file; gates are queued and executed in passes over it.
+
+    state = OutOfCoreStateVector("/nvme/psi.bin", n_qubits=32, block_qubits=24)
+    for _ in range(steps):
+        report = state.trotter_step(dt)     # {"passes", "bytes_read", "bytes_written", ...}
+    state.close()
+
+The file is cut into blocks of 2^block_qubits amplitudes. Gates on the low
+(in-block) qubits act on one block at a time; a non-diagonal gate on a high
+qubit needs the 2 (or 4) blocks that differ in that qubit, loaded together.
+The scheduler batches consecutive gates into one pass while the union of
+high qubits they pair over keeps the resident group within max_resident_bytes,
+so every pass reads and writes the file exactly once. Diagonal gates never
+pair blocks: their high qubits are fixed within a block and folded into a
+per-block phase.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from zbit_kernels import apply_gate as _apply_in_memory
+
+AMPLITUDE_BYTES = np.dtype(complex).itemsize
+_PAULI = {
+    (0, 0): np.eye(2, dtype=complex),
+    (1, 0): np.array([[0, 1], [1, 0]], dtype=complex),
+    (0, 1): np.array([[1, 0], [0, -1]], dtype=complex),
+    (1, 1): np.array([[0, -1], [1, 0]], dtype=complex),  # X Z
+}
+
+
+@dataclass
+class OutOfCoreStats:
+    gates: int = 0
+    passes: int = 0
+    bytes_read: int = 0
+    bytes_written: int = 0
+    steps: List[Dict] = field(default_factory=list)
+
+    def as_dict(self) -> Dict:
+        return {"gates": self.gates, "passes": self.passes, "bytes_read": self.bytes_read,
+                "bytes_written": self.bytes_written, "steps": [dict(s) for s in self.steps]}
+
+
+class OutOfCoreStateVector:
+    """complex128 state vector in a memory-mapped file, updated block by block"""
+
+    def __init__(self, path, n_qubits: int, block_qubits: Optional[int] = None,
+                 max_resident_bytes: Optional[int] = None, mode: str = "w+"):
+        self.n_qubits = n_qubits
+        self.dim = 2**n_qubits
+        self.block_qubits = min(n_qubits, 22 if block_qubits is None else block_qubits)
+        self.block = 2**self.block_qubits
+        block_bytes = self.block * AMPLITUDE_BYTES
+        high_qubits = n_qubits - self.block_qubits
+        if max_resident_bytes is None:
+            max_resident_bytes = 4 * block_bytes
+        # A 2-qubit gate on two high qubits holds 4 blocks at once (2 with one high qubit, 1 with none)
+        min_blocks = 2**min(2, high_qubits)
+        if max_resident_bytes < min_blocks * block_bytes:
+            raise ValueError(f"max_resident_bytes={max_resident_bytes} is below the minimum of {min_blocks} "
+                             f"block(s) of 2^{self.block_qubits} amplitudes ({min_blocks * block_bytes} bytes); "
+                             f"raise it or lower block_qubits")
+        # High qubits one pass may pair over
+        self.max_high = min(high_qubits, int(np.log2(max_resident_bytes // block_bytes)))
+        self.path = path
+        self.psi = np.memmap(path, dtype=complex, mode=mode, shape=(self.dim,))
+        if mode == "w+":
+            self.psi[0] = 1.0
+        self.stats = OutOfCoreStats()
+        self._queue: List[Tuple[np.ndarray, List[int], bool]] = []
+
+    @classmethod
+    def from_array(cls, path, psi: np.ndarray, **kwargs) -> "OutOfCoreStateVector":
+        n_qubits = int(psi.size).bit_length() - 1
+        state = cls(path, n_qubits, **kwargs)
+        for start in range(0, state.dim, state.block):
+            state.psi[start:start + state.block] = psi[start:start + state.block]
+        return state
+
+    # ===== Gate queue =====
+
+    def apply_gate(self, gate: np.ndarray, qubits: Sequence[int]):
+        """Queue a 1- or 2-qubit gate (executed by flush())"""
+        qubits = [qubits] if np.isscalar(qubits) else [int(q) for q in qubits]
+        gate = np.asarray(gate, dtype=complex)
+        if len(qubits) not in (1, 2) or gate.shape != (2**len(qubits),) * 2:
+            raise ValueError("apply_gate takes a 2x2 gate on 1 qubit or a 4x4 gate on 2 qubits")
+        if any(not 0 <= q < self.n_qubits for q in qubits) or len(set(qubits)) != len(qubits):
+            raise ValueError(f"invalid qubits {qubits} for {self.n_qubits} qubits")
+        diagonal = not np.any(gate - np.diag(np.diag(gate)))
+        self._queue.append((gate, qubits, diagonal))
+        return self
+
+    def _high_bits(self, qubits: Sequence[int]) -> List[int]:
+        return [b for b in (self.n_qubits - 1 - q for q in qubits) if b >= self.block_qubits]
+
+    def schedule(self) -> List[List[Tuple[np.ndarray, List[int], bool]]]:
+        """Split the queue into passes; greedy, which is minimal for the fixed gate order"""
+        passes, current, union = [], [], set()
+        for item in self._queue:
+            _, qubits, diagonal = item
+            high = set() if diagonal else set(self._high_bits(qubits))
+            if current and len(union | high) > self.max_high:
+                passes.append(current)
+                current, union = [], set()
+            current.append(item)
+            union |= high
+        if current:
+            passes.append(current)
+        return passes
+
+    def flush(self) -> Dict:
+        """Run every queued gate; returns this flush's pass / byte counts"""
+        report = {"gates": len(self._queue), "passes": 0, "bytes_read": 0, "bytes_written": 0}
+        for gates in self.schedule():
+            self._run_pass(gates, report)
+        self._queue.clear()
+        self.psi.flush()
+        self.stats.gates += report["gates"]
+        self.stats.passes += report["passes"]
+        self.stats.bytes_read += report["bytes_read"]
+        self.stats.bytes_written += report["bytes_written"]
+        return report
+
+    def _run_pass(self, gates, report: Dict):
+        """One sequential read + write of the file applying gates to each block group"""
+        B = self.block_qubits
+        union = sorted({b for _, qubits, diagonal in gates if not diagonal
+                        for b in self._high_bits(qubits)}, reverse=True)
+        h = len(union)
+        # Virtual group state: union high bits (most significant first) above the B block bits
+        n_virtual = B + h
+        virtual_bit = {b: B + h - 1 - j for j, b in enumerate(union)}
+        n_blocks = self.dim // self.block
+        union_mask = sum(1 << (b - B) for b in union)
+        group = np.empty((2**h, self.block), dtype=complex)
+        for base in range(n_blocks):
+            if base & union_mask:
+                continue
+            blocks = [base | sum(((combo >> (h - 1 - j)) & 1) << (b - B) for j, b in enumerate(union))
+                      for combo in range(2**h)]
+            for i, blk in enumerate(blocks):
+                group[i] = self.psi[blk * self.block:(blk + 1) * self.block]
+            flat = group.reshape(-1)
+            for gate, qubits, _ in gates:
+                self._apply_to_group(flat, gate, qubits, base, virtual_bit, n_virtual)
+            for i, blk in enumerate(blocks):
+                self.psi[blk * self.block:(blk + 1) * self.block] = group[i]
+        report["passes"] += 1
+        report["bytes_read"] += self.dim * AMPLITUDE_BYTES
+        report["bytes_written"] += self.dim * AMPLITUDE_BYTES
+
+    def _apply_to_group(self, flat, gate, qubits, base, virtual_bit, n_virtual):
+        B = self.block_qubits
+        bits = [self.n_qubits - 1 - q for q in qubits]
+        # High bits outside the group are fixed by base; only diagonal gates can have them
+        fixed = [j for j, b in enumerate(bits) if b >= B and b not in virtual_bit]
+        if fixed:
+            values = {j: (base >> (bits[j] - B)) & 1 for j in fixed}
+            gate, bits = _restrict_diagonal(gate, bits, values)
+            if not bits:
+                flat *= gate
+                return
+        local = [n_virtual - 1 - (b if b < B else virtual_bit[b]) for b in bits]
+        _apply_in_memory(flat, gate, local)
+
+    # ===== Trotter layers =====
+
+    def trotter_step(self, dt: float, terms=None) -> Dict:
+        """One first-order Trotter step exp(-i dt c P) per bitmask term; returns the step report"""
+        from zbit_operators import chain_terms
+        terms = chain_terms(self.n_qubits) if terms is None else terms
+        for coef, x, z in terms:
+            gate, qubits = term_gate(self.n_qubits, coef, x, z, dt)
+            self.apply_gate(gate, qubits)
+        report = self.flush()
+        self.stats.steps.append(report)
+        return report
+
+    # ===== Readout =====
+
+    def norm(self) -> float:
+        self.flush()
+        total = 0.0
+        for start in range(0, self.dim, self.block):
+            chunk = self.psi[start:start + self.block]
+            total += float(np.vdot(chunk, chunk).real)
+        return float(np.sqrt(total))
+
+    def to_numpy(self) -> np.ndarray:
+        """In-memory copy (only sensible when it fits in RAM)"""
+        self.flush()
+        return np.array(self.psi)
+
+    def close(self):
+        self.flush()
+        self.psi._mmap.close()
+        self.psi = None
+
+
+def term_gate(n_qubits: int, coef: complex, x_mask: int, z_mask: int, dt: float):
+    """(exp(-i dt coef X^x Z^z) on its support, qubits ascending)"""
+    from zbit_backends import expm
+    qubits = [q for q in range(n_qubits) if (x_mask | z_mask) >> (n_qubits - 1 - q) & 1]
+    P = np.ones((1, 1), dtype=complex)
+    for q in qubits:
+        bit = n_qubits - 1 - q
+        P = np.kron(P, _PAULI[((x_mask >> bit) & 1, (z_mask >> bit) & 1)])
+    if not np.any(P - np.diag(np.diag(P))):
+        return np.diag(np.exp(-1j * dt * coef * np.diag(P))), qubits
+    return expm(-1j * dt * coef * P), qubits
+
+
+def _restrict_diagonal(gate: np.ndarray, bits: List[int], values: Dict[int, int]):
+    """Diagonal gate with some of its qubits fixed -> (smaller gate or scalar, remaining bits)"""
+    diag = np.diag(gate).reshape((2,) * len(bits))
+    index = tuple(values.get(j, slice(None)) for j in range(len(bits)))
+    sub = diag[index]
+    remaining = [b for j, b in enumerate(bits) if j not in values]
+    if not remaining:
+        return complex(sub), []
+    return np.diag(sub.reshape(-1)), remaining
+
+
+# ===== DEMO =====
+
+if __name__ == "__main__":
+    import sys
+    import tempfile
+    import time
+    from pathlib import Path
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 24
+    block = int(sys.argv[2]) if len(sys.argv) > 2 else n - 4
+    with tempfile.TemporaryDirectory() as tmp:
+        state = OutOfCoreStateVector(Path(tmp) / "psi.bin", n, block_qubits=block)
+        print(f"💾 Out-of-core state | {n} qubits | {2**n * 16 / 2**30:.2f} GiB file | "
+              f"{2**block * 16 / 2**20:.0f} MiB blocks")
+        for step in range(3):
+            start = time.perf_counter()
+            report = state.trotter_step(0.05)
+            elapsed = time.perf_counter() - start
+            print(f"  step {step} | {report['gates']} gates in {report['passes']} passes | "
+                  f"read {report['bytes_read'] / 2**30:.2f} GiB | "
+                  f"written {report['bytes_written'] / 2**30:.2f} GiB | {elapsed:.2f} s")
+        print(f"  norm = {state.norm():.12f}")
+        state.close()
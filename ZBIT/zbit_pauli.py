@@ -0,0 +1,376 @@
+"""
+ZBIT-CORE-v2: Pauli strings
+P = i^phase X^x Z^z as two bitmasks and a phase (Y = i X Z), with batched
+expectation values that never build a matrix.
+
+    paulis = [PauliString.from_label("XXII"), "ZIIZ", "YZIY"]
+    values = expectations(psi, paulis)
+
+<psi|X^x Z^z|psi> = sum_c conj(psi[c]) (-1)^popcount((c ^ x) & z) psi[c ^ x]:
+strings sharing an x_mask share the gathered product conj(psi) * psi[c ^ x]
+(one pass over psi per group); each z_mask is then a signed sum, or all of
+them at once through a Walsh-Hadamard transform when the group is large.
+
+PauliSum is the symbolic operator layer on top: sums, products and
+commutators act on the mask / coefficient arrays (vectorized over all term
+pairs), and matrices are only built on request.
+
+    H = 0.5 * PauliSum.site(n, 0, "Z") @ PauliSum.site(n, 1, "Z") + 0.3 * PauliSum.site(n, 0, "X")
+    H.to_sparse(), H.matrix_free(), H.to_mpo()      # each built once per PauliSum
+
+Products and commutators are memoized on their left operand, keyed by the
+right operand's arrays, so a cached result lives exactly as long as the
+PauliSum that computed it.
+"""
+from dataclasses import dataclass
+from numbers import Number
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from zbit_operators import (MatrixFreeHamiltonian, fwht, popcount, qubit_mask, to_dense, to_sparse,
+                            z_signs)
+
+# Memoized products / commutators per left operand (dropped wholesale past this)
+MAX_CACHED_PRODUCTS = 16
+
+_LETTERS = {"I": (0, 0), "X": (1, 0), "Z": (0, 1), "Y": (1, 1)}
+_PHASE_PREFIX = {"": 0, "+": 0, "i": 1, "+i": 1, "-": 2, "-i": 3}
+_PHASE_LABEL = {0: "", 1: "i", 2: "-", 3: "-i"}
+
+
+def _popcount(value: int) -> int:
+    return bin(value).count("1")
+
+
+@dataclass(frozen=True)
+class PauliString:
+    """i^phase X^x Z^z on n_qubits (qubit i is bit n_qubits - 1 - i)"""
+    n_qubits: int
+    x: int
+    z: int
+    phase: int = 0
+
+    @classmethod
+    def from_label(cls, label: str) -> "PauliString":
+        """'XIZY', '-iZZ', ... (Y contributes a factor i)"""
+        body = label.lstrip("+-i")
+        prefix = label[:len(label) - len(body)]
+        if prefix not in _PHASE_PREFIX:
+            raise ValueError(f"Invalid phase prefix '{prefix}' in '{label}'")
+        n = len(body)
+        x = z = 0
+        phase = _PHASE_PREFIX[prefix]
+        for pos, letter in enumerate(body.upper()):
+            if letter not in _LETTERS:
+                raise ValueError(f"Invalid Pauli letter '{letter}' in '{label}'")
+            xi, zi = _LETTERS[letter]
+            x |= xi * qubit_mask(n, pos)
+            z |= zi * qubit_mask(n, pos)
+            phase += xi & zi
+        return cls(n, x, z, phase % 4)
+
+    @classmethod
+    def from_sites(cls, n_qubits: int, sites: Dict[int, str]) -> "PauliString":
+        """{qubit: 'X' | 'Y' | 'Z'} -> PauliString"""
+        letters = ["I"] * n_qubits
+        for q, letter in sites.items():
+            letters[q] = letter
+        return cls.from_label("".join(letters))
+
+    @property
+    def label(self) -> str:
+        letters = []
+        y_count = 0
+        for pos in range(self.n_qubits):
+            m = qubit_mask(self.n_qubits, pos)
+            key = (int(bool(self.x & m)), int(bool(self.z & m)))
+            y_count += key == (1, 1)
+            letters.append({v: k for k, v in _LETTERS.items()}[key])
+        return _PHASE_LABEL[(self.phase - y_count) % 4] + "".join(letters)
+
+    @property
+    def weight(self) -> int:
+        return _popcount(self.x | self.z)
+
+    @property
+    def is_hermitian(self) -> bool:
+        # (X^x Z^z)^dagger = (-1)^popcount(x & z) X^x Z^z
+        return (self.phase - _popcount(self.x & self.z)) % 2 == 0
+
+    def to_dense(self) -> np.ndarray:
+        """Dense matrix (reference / tests only)"""
+        dim = 2**self.n_qubits
+        index = np.arange(dim, dtype=np.int64)
+        M = np.zeros((dim, dim), dtype=complex)
+        M[index, index ^ self.x] = (1j**self.phase) * z_signs(index ^ self.x, self.z)
+        return M
+
+    def __str__(self) -> str:
+        return self.label
+
+
+PauliLike = Union[PauliString, str]
+
+
+def as_pauli(p: PauliLike, n_qubits: int) -> PauliString:
+    pauli = PauliString.from_label(p) if isinstance(p, str) else p
+    if pauli.n_qubits != n_qubits:
+        raise ValueError(f"Pauli string on {pauli.n_qubits} qubits for a {n_qubits}-qubit state")
+    return pauli
+
+
+def expectations(psi: np.ndarray, paulis: Iterable[PauliLike]) -> np.ndarray:
+    """<psi|P|psi> for every P (complex), grouped by x_mask"""
+    dim = psi.size
+    n = dim.bit_length() - 1
+    paulis: List[PauliString] = [as_pauli(p, n) for p in paulis]
+    groups: Dict[int, List[int]] = {}
+    for i, p in enumerate(paulis):
+        groups.setdefault(p.x, []).append(i)
+    out = np.empty(len(paulis), dtype=complex)
+    index = np.arange(dim, dtype=np.int64)
+    conj = psi.conj()
+    for x, members in groups.items():
+        source = index ^ x
+        # One gather per x_mask group
+        product = conj * (psi if x == 0 else psi[source])
+        z_masks = {paulis[i].z for i in members}
+        if len(z_masks) > n:
+            # sum_c v[c] (-1)^popcount((c ^ x) & z) = (-1)^popcount(x & z) WHT(v)[z]
+            spectrum = fwht(product)
+            values = {z: (-1)**_popcount(x & z) * spectrum[z] for z in z_masks}
+        else:
+            values = {z: product.sum() if z == 0 else np.dot(product, z_signs(source, z))
+                      for z in z_masks}
+        for i in members:
+            out[i] = (1j**paulis[i].phase) * values[paulis[i].z]
+    return out
+
+
+def apply_pauli(psi: np.ndarray, p: PauliLike) -> np.ndarray:
+    """P psi for a state (dim,) or a block of states (dim, k), by one gather"""
+    n = psi.shape[0].bit_length() - 1
+    pauli = as_pauli(p, n)
+    index = np.arange(psi.shape[0], dtype=np.int64)
+    source = index ^ pauli.x
+    # (P psi)[c] = i^phase (-1)^popcount((c ^ x) & z) psi[c ^ x]
+    signs = (1j**pauli.phase) * z_signs(source, pauli.z)
+    return (signs if psi.ndim == 1 else signs[:, None]) * psi[source]
+
+
+# ===== Pauli sums =====
+
+def _site_matrix(x: int, z: int) -> np.ndarray:
+    """X^x Z^z on one qubit"""
+    m = np.eye(2, dtype=complex)
+    if z:
+        m = m @ np.diag([1.0, -1.0])
+    if x:
+        m = np.array([[0, 1], [1, 0]], dtype=complex) @ m
+    return m
+
+
+class PauliSum:
+    """
+    sum_t coef_t X^x_t Z^z_t as three arrays (x, z masks as int64, complex coefs), kept
+    canonical: sorted by (x, z) with duplicates merged. Immutable and hashable, so
+    products and dense / sparse / matrix-free / MPO conversions are memoized.
+    """
+
+    def __init__(self, n_qubits: int, x, z, coef):
+        if n_qubits > 62:
+            raise ValueError("PauliSum masks are int64: at most 62 qubits")
+        x = np.asarray(x, dtype=np.int64).ravel()
+        z = np.asarray(z, dtype=np.int64).ravel()
+        coef = np.asarray(coef, dtype=complex).ravel()
+        if not x.size == z.size == coef.size:
+            raise ValueError("x, z and coef must have the same length")
+        order = np.lexsort((z, x))
+        x, z, coef = x[order], z[order], coef[order]
+        if x.size:
+            # Merge runs of identical (x, z)
+            start = np.flatnonzero(np.r_[True, (x[1:] != x[:-1]) | (z[1:] != z[:-1])])
+            x, z, coef = x[start], z[start], np.add.reduceat(coef, start)
+            keep = coef != 0
+            x, z, coef = x[keep], z[keep], coef[keep]
+        for a in (x, z, coef):
+            a.flags.writeable = False
+        self.n_qubits = n_qubits
+        self.x, self.z, self.coef = x, z, coef
+        self._converted: Dict[str, object] = {}
+        self._algebra: Dict[Tuple[str, bytes, bytes, bytes], "PauliSum"] = {}
+        self._hash = None
+
+    # --- construction ---
+
+    @classmethod
+    def from_terms(cls, n_qubits: int, terms) -> "PauliSum":
+        """From zbit_operators terms [(coef, x_mask, z_mask)]"""
+        terms = list(terms)
+        return cls(n_qubits, [t[1] for t in terms], [t[2] for t in terms], [t[0] for t in terms])
+
+    @classmethod
+    def from_pauli(cls, p: PauliLike, n_qubits: Optional[int] = None, coef: complex = 1.0) -> "PauliSum":
+        p = PauliString.from_label(p) if isinstance(p, str) else p
+        return cls(p.n_qubits if n_qubits is None else n_qubits, [p.x], [p.z], [coef * 1j**p.phase])
+
+    @classmethod
+    def site(cls, n_qubits: int, qubit: int, letter: str, coef: complex = 1.0) -> "PauliSum":
+        """coef * letter on one qubit (the symbolic counterpart of core._pauli_at)"""
+        return cls.from_pauli(PauliString.from_sites(n_qubits, {qubit: letter}), coef=coef)
+
+    @classmethod
+    def identity(cls, n_qubits: int, coef: complex = 1.0) -> "PauliSum":
+        return cls(n_qubits, [0], [0], [coef])
+
+    def terms(self) -> List[Tuple[complex, int, int]]:
+        """[(coef, x_mask, z_mask)] for zbit_operators (real coefficients stay real)"""
+        return [(c.real if c.imag == 0 else complex(c), int(x), int(z))
+                for c, x, z in zip(self.coef, self.x, self.z)]
+
+    # --- algebra ---
+
+    def __len__(self) -> int:
+        return self.coef.size
+
+    def _check(self, other: "PauliSum"):
+        if other.n_qubits != self.n_qubits:
+            raise ValueError(f"PauliSums on {self.n_qubits} and {other.n_qubits} qubits")
+
+    def __add__(self, other) -> "PauliSum":
+        if isinstance(other, Number):
+            other = PauliSum.identity(self.n_qubits, other)
+        self._check(other)
+        return PauliSum(self.n_qubits, np.r_[self.x, other.x], np.r_[self.z, other.z],
+                        np.r_[self.coef, other.coef])
+
+    __radd__ = __add__
+
+    def __neg__(self) -> "PauliSum":
+        return PauliSum(self.n_qubits, self.x, self.z, -self.coef)
+
+    def __sub__(self, other) -> "PauliSum":
+        return self + (-other)
+
+    def __rsub__(self, other) -> "PauliSum":
+        return (-self) + other
+
+    def __mul__(self, other) -> "PauliSum":
+        if isinstance(other, Number):
+            return PauliSum(self.n_qubits, self.x, self.z, self.coef * other)
+        return self @ other
+
+    def __rmul__(self, other) -> "PauliSum":
+        return PauliSum(self.n_qubits, self.x, self.z, self.coef * other)
+
+    def __matmul__(self, other: "PauliSum") -> "PauliSum":
+        if not isinstance(other, PauliSum):
+            return NotImplemented
+        self._check(other)
+        return self._memo("product", other, _product)
+
+    def dagger(self) -> "PauliSum":
+        # (X^x Z^z)^dagger = Z^z X^x = (-1)^popcount(x & z) X^x Z^z
+        signs = 1 - 2 * (popcount(self.x & self.z).astype(np.int64) & 1)
+        return PauliSum(self.n_qubits, self.x, self.z, self.coef.conj() * signs)
+
+    @property
+    def is_hermitian(self) -> bool:
+        return self == self.dagger()
+
+    def simplify(self, tol: float = 1e-12) -> "PauliSum":
+        """Drop terms with |coef| <= tol"""
+        keep = np.abs(self.coef) > tol
+        return PauliSum(self.n_qubits, self.x[keep], self.z[keep], self.coef[keep])
+
+    def __eq__(self, other) -> bool:
+        return (isinstance(other, PauliSum) and other.n_qubits == self.n_qubits
+                and np.array_equal(self.x, other.x) and np.array_equal(self.z, other.z)
+                and np.array_equal(self.coef, other.coef))
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            self._hash = hash((self.n_qubits, self.x.tobytes(), self.z.tobytes(), self.coef.tobytes()))
+        return self._hash
+
+    def __repr__(self) -> str:
+        parts = []
+        for c, x, z in zip(self.coef[:6], self.x[:6], self.z[:6]):
+            # X^x Z^z = (-i)^(number of Y) times the Y-letter string
+            ny = _popcount(int(x) & int(z))
+            parts.append(f"({c * (-1j)**ny:.4g}) {PauliString(self.n_qubits, int(x), int(z), ny).label}")
+        shown = " + ".join(parts)
+        more = f" + ... ({len(self)} terms)" if len(self) > 6 else ""
+        return f"PauliSum({shown or '0'}{more})"
+
+    def _memo(self, kind: str, other: "PauliSum", build) -> "PauliSum":
+        # Keyed by other's arrays, not other itself, so the cache never keeps other alive
+        key = (kind, other.x.tobytes(), other.z.tobytes(), other.coef.tobytes())
+        if key not in self._algebra:
+            if len(self._algebra) >= MAX_CACHED_PRODUCTS:
+                self._algebra.clear()
+            self._algebra[key] = build(self, other)
+        return self._algebra[key]
+
+    # --- execution-time representations (memoized) ---
+
+    def _convert(self, kind: str, build):
+        if kind not in self._converted:
+            self._converted[kind] = build()
+        return self._converted[kind]
+
+    def to_dense(self) -> np.ndarray:
+        return self._convert("dense", lambda: to_dense(self.n_qubits, self.terms()))
+
+    def to_sparse(self):
+        return self._convert("sparse", lambda: to_sparse(self.n_qubits, self.terms()))
+
+    def matrix_free(self) -> MatrixFreeHamiltonian:
+        return self._convert("matrix_free", lambda: MatrixFreeHamiltonian(self.n_qubits, self.terms()))
+
+    def to_mpo(self) -> List[np.ndarray]:
+        """
+        Sum-of-products MPO: W[q] of shape (D_left, D_right, 2, 2) (out, in) with one bond
+        channel per term (D = len(self)); coefficients sit on the first site.
+        """
+        def build():
+            n, T = self.n_qubits, max(len(self), 1)
+            ops = np.zeros((n, T, 2, 2), dtype=complex)
+            for t, (x, z) in enumerate(zip(self.x, self.z)):
+                for q in range(n):
+                    bit = qubit_mask(n, q)
+                    ops[q, t] = _site_matrix(int(x) & bit, int(z) & bit)
+            coef = self.coef if len(self) else np.zeros(1, dtype=complex)
+            if n == 1:
+                return [np.einsum("t,tab->ab", coef, ops[0])[None, None]]
+            W = [(coef[:, None, None] * ops[0])[None]]
+            for q in range(1, n - 1):
+                middle = np.zeros((T, T, 2, 2), dtype=complex)
+                middle[np.arange(T), np.arange(T)] = ops[q]
+                W.append(middle)
+            W.append(ops[n - 1][:, None])
+            return W
+        return self._convert("mpo", build)
+
+
+def commutator(a: PauliSum, b: PauliSum) -> PauliSum:
+    """[a, b] = ab - ba, from one product: strings either commute (term cancels) or anticommute"""
+    a._check(b)
+    return a._memo("commutator", b, _commutator)
+
+
+def _product(a: PauliSum, b: PauliSum) -> PauliSum:
+    # X^x1 Z^z1 X^x2 Z^z2 = (-1)^popcount(z1 & x2) X^(x1^x2) Z^(z1^z2)
+    signs = 1 - 2 * (popcount(a.z[:, None] & b.x[None, :]).astype(np.int64) & 1)
+    return PauliSum(a.n_qubits, a.x[:, None] ^ b.x[None, :], a.z[:, None] ^ b.z[None, :],
+                    a.coef[:, None] * b.coef[None, :] * signs)
+
+
+def _commutator(a: PauliSum, b: PauliSum) -> PauliSum:
+    # Strings anticommute iff popcount(x1 & z2) + popcount(z1 & x2) is odd; then [P, Q] = 2PQ
+    ab = popcount(a.z[:, None] & b.x[None, :]).astype(np.int64)
+    anti = (ab + popcount(a.x[:, None] & b.z[None, :]).astype(np.int64)) & 1
+    signs = 1 - 2 * (ab & 1)
+    coef = 2 * a.coef[:, None] * b.coef[None, :] * signs * anti
+    return PauliSum(a.n_qubits, a.x[:, None] ^ b.x[None, :], a.z[:, None] ^ b.z[None, :], coef)
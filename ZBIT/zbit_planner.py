@@ -0,0 +1,315 @@
+"""
+ZBIT-CORE-v2: Preflight planner
+Peak-memory / runtime estimates per engine and automatic engine selection.
+
+Engines:
+    dense        dense H, one expm(-iH dt) per distinct dt (U cached), U @ psi per step
+    sparse       CSR H, scipy expm_multiply (truncated Taylor)
+    krylov       CSR H, Lanczos propagator
+    matrix_free  no stored H, Lanczos on bitmask mat-vecs
+    mps          tensor network (cost model only, not executable in this tree)
+"""
+import os
+import time
+from dataclasses import dataclass, field, replace
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+ENGINES = ("dense", "sparse", "krylov", "matrix_free", "mps")
+EXECUTABLE_ENGINES = ("dense", "sparse", "krylov", "matrix_free")
+EXACT_ENGINES = ("dense", "sparse", "krylov", "matrix_free")
+OPERATIONS = ("evolve", "otoc", "eigensystem", "validation", "report")
+
+# method= aliases -> engines the planner may choose from
+METHOD_ENGINES = {
+    "exact": EXACT_ENGINES,
+    "auto": ENGINES,
+    "hotrg": ("mps",),
+    "tn": ("mps",),
+}
+METHODS = tuple(METHOD_ENGINES) + ENGINES
+
+BYTES_COMPLEX = 16
+BYTES_INDEX = 8
+
+
+class PreflightError(MemoryError):
+    """No engine can run the requested plan within the available memory"""
+
+
+@dataclass(frozen=True)
+class CostModel:
+    """Machine constants; defaults measured on a 1-core x86 box, refresh with calibrate()"""
+    cmac_per_s: float = 8e9             # complex multiply-adds/s in dense matmul
+    nnz_per_s: float = 3e8              # CSR mat-vec nonzeros/s
+    gather_per_s: float = 1e8           # matrix-free gathered amplitudes/s
+    bytes_per_s: float = 5e9            # memory bandwidth (zeroing / streaming dense buffers)
+    expm_overhead_s: float = 4.5e-4     # fixed cost of scipy.linalg.expm
+    expm_matmuls: float = 7.0           # matmuls per Pade expm (scaling + squaring)
+    expm_multiply_overhead_s: float = 8e-4
+    expm_multiply_matvecs: float = 25.0
+    matvec_overhead_s: float = 4e-6
+    lanczos_overhead_s: float = 3.5e-5  # per Lanczos iteration (python + reorthogonalization)
+    krylov_dim: int = 20
+    mps_bond_dim: int = 64
+
+
+DEFAULT_COST_MODEL = CostModel()
+
+
+@dataclass(frozen=True)
+class Geometry:
+    """Term counts of the model on a given geometry"""
+    name: str
+    zz_bonds: int
+    x_sites: int
+    xx_bonds: int
+
+    @property
+    def x_masks(self) -> int:
+        """Distinct off-diagonal patterns (nonzeros per row = 1 + x_masks)"""
+        return self.x_sites + self.xx_bonds
+
+    @property
+    def terms(self) -> int:
+        return self.zz_bonds + self.x_sites + self.xx_bonds
+
+
+def resolve_geometry(n_qubits: int, geometry="chain") -> Geometry:
+    if isinstance(geometry, Geometry):
+        return geometry
+    if geometry == "chain":
+        return Geometry("chain", max(n_qubits - 1, 0), n_qubits, min(max(n_qubits - 1, 0), 4))
+    raise ValueError(f"Unknown geometry '{geometry}'")
+
+
+@dataclass
+class EngineEstimate:
+    engine: str
+    peak_bytes: int
+    runtime_s: float
+    exact: bool
+    executable: bool
+    fits: bool = True
+    notes: str = ""
+
+    def as_dict(self) -> Dict:
+        return {
+            "engine": self.engine,
+            "peak_gb": self.peak_bytes / 1024**3,
+            "runtime_s": self.runtime_s,
+            "exact": self.exact,
+            "executable": self.executable,
+            "fits": self.fits,
+            "notes": self.notes,
+        }
+
+
+@dataclass
+class Plan:
+    n_qubits: int
+    geometry: Geometry
+    method: str
+    operations: tuple
+    engine: str
+    available_bytes: Optional[int]
+    estimates: List[EngineEstimate] = field(default_factory=list)
+    cost_model: CostModel = DEFAULT_COST_MODEL
+
+    @property
+    def krylov_dim(self) -> int:
+        return self.cost_model.krylov_dim
+
+    @property
+    def chosen(self) -> EngineEstimate:
+        return next(e for e in self.estimates if e.engine == self.engine)
+
+    @property
+    def reliability(self) -> str:
+        return "HIGH" if self.chosen.exact else "ESTIMATED"
+
+    def as_dict(self) -> Dict:
+        return {
+            "n_qubits": self.n_qubits,
+            "geometry": self.geometry.name,
+            "method": self.method,
+            "operations": list(self.operations),
+            "engine": self.engine,
+            "available_gb": None if self.available_bytes is None else self.available_bytes / 1024**3,
+            "estimates": [e.as_dict() for e in self.estimates],
+        }
+
+    def describe(self) -> str:
+        return describe_estimates(self.n_qubits, self.estimates, self.available_bytes, self.engine)
+
+
+def describe_estimates(n_qubits: int, estimates: Sequence[EngineEstimate],
+                       available_bytes: Optional[int], chosen: Optional[str] = None) -> str:
+    avail = "unknown" if available_bytes is None else f"{available_bytes / 1024**3:.2f} GB"
+    lines = [f"Preflight: {n_qubits} qubits | available RAM {avail}"]
+    for e in estimates:
+        mark = "*" if e.engine == chosen else " "
+        status = "ok" if e.fits and e.executable else ("n/a" if not e.executable else "OOM")
+        lines.append(f" {mark} {e.engine:<12} peak {e.peak_bytes / 1024**3:10.3f} GB | "
+                     f"~{e.runtime_s:10.3g} s | {status}{' | ' + e.notes if e.notes else ''}")
+    return "\n".join(lines)
+
+
+def available_memory() -> Optional[int]:
+    """Available RAM in bytes (MemAvailable on Linux), None if unknown"""
+    try:
+        with open("/proc/meminfo") as fh:
+            for line in fh:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def calibrate(n_qubits: int = 9, repeats: int = 3) -> CostModel:
+    """Measure dense matmul and CSR mat-vec throughput on this machine"""
+    from zbit_backends import get_backend
+    sp = get_backend("scipy.sparse")
+    dim = 2**n_qubits
+    rng = np.random.default_rng(0)
+    A = rng.standard_normal((dim, dim)) + 1j * rng.standard_normal((dim, dim))
+    best = min(_timed(lambda: A @ A) for _ in range(repeats))
+    cmac_per_s = dim**3 / best
+    nnz_row = n_qubits + 1
+    S = sp.random(dim, dim, density=nnz_row / dim, format="csr", random_state=0) * (1 + 0j)
+    v = np.ones(dim, dtype=complex)
+    best = min(_timed(lambda: S @ v) for _ in range(repeats * 10))
+    nnz_per_s = S.nnz / max(best - DEFAULT_COST_MODEL.matvec_overhead_s, 1e-9)
+    index = np.arange(dim)
+    best = min(_timed(lambda: v[index ^ 1]) for _ in range(repeats * 10))
+    gather_per_s = dim / best
+    return replace(DEFAULT_COST_MODEL, cmac_per_s=cmac_per_s, nnz_per_s=nnz_per_s,
+                   gather_per_s=gather_per_s)
+
+
+def estimate(n_qubits: int, engine: str, geometry="chain",
+             operations: Iterable[str] = ("evolve",), steps: int = 100,
+             num_times: int = 10, cost_model: Optional[CostModel] = None) -> EngineEstimate:
+    """Peak memory and runtime of one engine for the requested operations"""
+    cm = cost_model or DEFAULT_COST_MODEL
+    geo = resolve_geometry(n_qubits, geometry)
+    ops = _check_operations(operations)
+    D = 2**n_qubits
+    vec = BYTES_COMPLEX * D
+    mat = BYTES_COMPLEX * D * D
+    nnz = D * (1 + geo.x_masks)
+    csr = nnz * (BYTES_COMPLEX + 4) + 4 * (D + 1)
+    matvec_s = cm.matvec_overhead_s + nnz / cm.nnz_per_s
+    lanczos_step_s = cm.krylov_dim * (cm.lanczos_overhead_s + matvec_s)
+    propagations = (steps if "evolve" in ops else 0) + (num_times if "otoc" in ops else 0)
+    notes = []
+
+    if engine == "dense":
+        # build: zeroed H plus one scattered write of D values per x_mask (bitmask terms)
+        build_bytes = mat + (2 + geo.x_masks) * vec
+        build_s = mat / cm.bytes_per_s + nnz / cm.gather_per_s
+        # evolve: H + U + expm workspace; U(dt) is cached, so evolve pays one expm and otoc
+        # one per time, and every propagation is U @ psi plus the energy H @ psi
+        step_bytes = (8 * mat + 4 * vec) if propagations else 0
+        expm_s = cm.expm_overhead_s + cm.expm_matmuls * D**3 / cm.cmac_per_s
+        expms = (1 if "evolve" in ops else 0) + (num_times if "otoc" in ops else 0)
+        peak = max(build_bytes, step_bytes)
+        runtime = build_s + expms * expm_s + propagations * 2 * D * D / cm.cmac_per_s
+        exact, executable = True, True
+    elif engine in ("sparse", "krylov"):
+        build_bytes = 3 * nnz * (BYTES_COMPLEX + 2 * BYTES_INDEX) + csr
+        build_s = nnz * 5e-8
+        if engine == "sparse":
+            step_bytes = csr + 8 * vec
+            step_s = cm.expm_multiply_overhead_s + cm.expm_multiply_matvecs * matvec_s
+        else:
+            step_bytes = csr + (cm.krylov_dim + 4) * vec
+            step_s = lanczos_step_s
+        peak = max(build_bytes, step_bytes if propagations else csr)
+        runtime = build_s + propagations * (step_s + matvec_s)
+        exact, executable = True, True
+    elif engine == "matrix_free":
+        columns = (1 + geo.x_masks) * vec + BYTES_INDEX * D
+        peak = columns + ((cm.krylov_dim + 4) * vec if propagations else 0)
+        mf_matvec_s = cm.matvec_overhead_s * (1 + geo.x_masks) + D * (1 + geo.x_masks) / cm.gather_per_s
+        runtime = geo.terms * D / cm.gather_per_s + propagations * cm.krylov_dim * (
+            cm.lanczos_overhead_s + mf_matvec_s)
+        exact, executable = True, True
+    elif engine == "mps":
+        chi = min(cm.mps_bond_dim, 2**(n_qubits // 2))
+        peak = 4 * n_qubits * 2 * chi * chi * BYTES_COMPLEX
+        runtime = propagations * n_qubits * 2 * chi**3 * 8 / cm.cmac_per_s
+        exact, executable = False, False
+        notes.append(f"chi={chi}, not implemented in this tree")
+    else:
+        raise ValueError(f"Unknown engine '{engine}' (expected one of {ENGINES})")
+
+    if "eigensystem" in ops:
+        # full diagonalization needs a dense copy + eigenvectors + LAPACK workspace
+        peak = max(peak, 3 * mat)
+        runtime += 10 * D**3 / cm.cmac_per_s
+        if engine != "dense":
+            notes.append("eigensystem densifies H")
+    return EngineEstimate(engine, int(peak), float(runtime), exact, executable, notes="; ".join(notes))
+
+
+def plan_run(n_qubits: int, geometry="chain", method: str = "exact",
+             operations: Iterable[str] = ("evolve",), steps: int = 100, num_times: int = 10,
+             engine: str = "auto", available_bytes: Optional[int] = None,
+             memory_fraction: float = 0.8, cost_model: Optional[CostModel] = None) -> Plan:
+    """
+    Estimate every engine and pick the fastest executable one that fits in
+    memory_fraction of the available RAM. Raises PreflightError otherwise.
+    """
+    if n_qubits < 1:
+        raise ValueError("n_qubits must be >= 1")
+    method = method.lower()
+    geo = resolve_geometry(n_qubits, geometry)
+    ops = _check_operations(operations)
+    if available_bytes is None:
+        available_bytes = available_memory()
+    budget = None if available_bytes is None else int(available_bytes * memory_fraction)
+
+    if engine != "auto":
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine}' (expected one of {ENGINES})")
+        candidates = (engine,)
+    elif method in ENGINES:
+        candidates = (method,)
+    elif method in METHOD_ENGINES:
+        candidates = METHOD_ENGINES[method]
+    else:
+        raise ValueError(f"Unknown method '{method}' (expected one of {METHODS})")
+
+    estimates = [estimate(n_qubits, name, geo, ops, steps, num_times, cost_model) for name in ENGINES]
+    for e in estimates:
+        e.fits = budget is None or e.peak_bytes <= budget
+
+    viable = [e for e in estimates if e.engine in candidates and e.executable and e.fits]
+    if not viable:
+        raise PreflightError(
+            f"No engine among {list(candidates)} can run {n_qubits} qubits "
+            f"({', '.join(ops)}) within {memory_fraction:.0%} of available RAM\n"
+            + describe_estimates(n_qubits, estimates, available_bytes))
+    best = min(viable, key=lambda e: e.runtime_s)
+    return Plan(n_qubits, geo, method, ops, best.engine, available_bytes, estimates,
+                cost_model or DEFAULT_COST_MODEL)
+
+
+def _check_operations(operations: Iterable[str]) -> tuple:
+    ops = tuple(op.lower() for op in operations)
+    for op in ops:
+        if op not in OPERATIONS:
+            raise ValueError(f"Unknown operation '{op}' (expected one of {OPERATIONS})")
+    return ops
+
+
+def _timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
@@ -0,0 +1,207 @@
+"""
+ZBIT-CORE-v2: Hybrid QML control
+Layered RY / RZZ drive schedule acting on the core's state, trained with torch on CPU.
+
+Layer l:  prod_q RY(theta[l, q])  then  prod_bonds RZZ(phi[l, b])
+RY(t) = exp(-i t Y / 2) and RZZ(p) = exp(-i p ZZ / 2), so every parameter
+obeys the two-term parameter-shift rule dE/dx = [E(x + pi/2) - E(x - pi/2)] / 2.
+
+All evaluations are batched: params has shape (batch, n_params).
+"""
+import math
+import time
+from typing import Callable, Dict, Optional, Sequence
+
+import numpy as np
+
+from zbit_backends import get_backend
+from zbit_operators import MatrixFreeHamiltonian, qubit_mask, z_signs
+
+GRADIENT_METHODS = ("autograd", "parameter_shift")
+
+
+class QMLController:
+    """
+    Variational drive schedule on ZBITQuantumCoreV2 (torch autograd, CPU).
+    H defaults to the core's terms; RZZ bonds follow core.lattice (open chain without one).
+    """
+
+    def __init__(self, core, n_layers: int = 2, terms=None, num_threads: Optional[int] = None,
+                 seed: int = 0):
+        torch = self.torch = get_backend("torch")
+        if num_threads is not None:
+            torch.set_num_threads(num_threads)
+        self.core = core
+        self.n_qubits = n = core.n_qubits
+        self.n_layers = n_layers
+        self.bonds = list(core.lattice.edges) if core.lattice is not None else [(i, i + 1) for i in range(n - 1)]
+        self.n_rotations = n_layers * n
+        self.n_params = n_layers * (n + len(self.bonds))
+        self.dtype = torch.complex128
+        self.generator = torch.Generator().manual_seed(seed)
+
+        index = np.arange(2**n, dtype=np.int64)
+        signs = np.stack([z_signs(index, qubit_mask(n, i) | qubit_mask(n, j)) for i, j in self.bonds]) \
+            if self.bonds else np.zeros((0, 2**n))
+        self._zz_signs = torch.from_numpy(signs)
+        self._psi0 = torch.from_numpy(np.ascontiguousarray(core.psi)).to(self.dtype)
+
+        # H as diagonal + one gather per x_mask (independent of the core's engine)
+        op = MatrixFreeHamiltonian(n, terms if terms is not None else core.terms)
+        self._diag = torch.from_numpy(np.asarray(op.diagonal, dtype=complex))
+        self._gathers = [(torch.from_numpy(index ^ x), torch.from_numpy(values))
+                         for x, values in op._columns.items()]
+        self.evaluations = 0
+
+    # ===== Parameters =====
+
+    def init_params(self, batch: int = 1, scale: float = 0.1):
+        return scale * self.torch.randn(batch, self.n_params, dtype=self.torch.float64,
+                                        generator=self.generator)
+
+    def _split(self, params):
+        L, n = self.n_layers, self.n_qubits
+        theta = params[:, :self.n_rotations].reshape(-1, L, n)
+        phi = params[:, self.n_rotations:].reshape(-1, L, len(self.bonds))
+        return theta, phi
+
+    # ===== Batched simulation =====
+
+    def states(self, params):
+        """Final states, shape (batch, 2^n)"""
+        torch = self.torch
+        params = self._as_batch(params)
+        theta, phi = self._split(params)
+        batch = params.shape[0]
+        psi = self._psi0.expand(batch, -1)
+        for layer in range(self.n_layers):
+            for q in range(self.n_qubits):
+                psi = self._apply_ry(psi, q, theta[:, layer, q])
+            if self.bonds:
+                angle = -0.5 * (phi[:, layer, :] @ self._zz_signs)
+                psi = psi * torch.polar(torch.ones_like(angle), angle)
+        return psi
+
+    def _apply_ry(self, psi, q: int, theta):
+        torch = self.torch
+        batch = psi.shape[0]
+        view = psi.reshape(batch, 2**q, 2, 2**(self.n_qubits - q - 1))
+        c = torch.cos(theta / 2).reshape(batch, 1, 1).to(self.dtype)
+        s = torch.sin(theta / 2).reshape(batch, 1, 1).to(self.dtype)
+        a, b = view[:, :, 0, :], view[:, :, 1, :]
+        return torch.stack((c * a - s * b, s * a + c * b), dim=2).reshape(batch, -1)
+
+    def apply_hamiltonian(self, psi):
+        out = self._diag * psi
+        for source, values in self._gathers:
+            out = out + values * psi[:, source]
+        return out
+
+    def energy(self, params):
+        """<psi(params)|H|psi(params)>, shape (batch,)"""
+        psi = self.states(params)
+        self.evaluations += psi.shape[0]
+        return (psi.conj() * self.apply_hamiltonian(psi)).sum(dim=1).real
+
+    # ===== Gradients =====
+
+    def gradient(self, params, method: str = "autograd", chunk_size: Optional[int] = None):
+        """dE/dparams, shape (batch, n_params)"""
+        params = self._as_batch(params).detach()
+        if method == "autograd":
+            params = params.clone().requires_grad_(True)
+            self.energy(params).sum().backward()
+            return params.grad
+        if method == "parameter_shift":
+            return self._parameter_shift(params, chunk_size)
+        raise ValueError(f"Unknown gradient method '{method}' (expected one of {GRADIENT_METHODS})")
+
+    def _parameter_shift(self, params, chunk_size: Optional[int]):
+        """All 2 * n_params shifted circuits evaluated as one vectorized batch"""
+        torch = self.torch
+        batch, P = params.shape
+        shifts = (math.pi / 2) * torch.eye(P, dtype=params.dtype)
+        shifted = torch.cat((params[:, None, :] + shifts, params[:, None, :] - shifts), dim=1)
+        flat = shifted.reshape(-1, P)
+        with torch.no_grad():
+            if chunk_size is None:
+                energies = self.energy(flat)
+            else:
+                energies = torch.cat([self.energy(flat[i:i + chunk_size])
+                                      for i in range(0, flat.shape[0], chunk_size)])
+        energies = energies.reshape(batch, 2, P)
+        return 0.5 * (energies[:, 0, :] - energies[:, 1, :])
+
+    # ===== Training =====
+
+    def train(self, steps: int = 100, lr: float = 0.05, batch: int = 1, method: str = "autograd",
+              params=None, callback: Optional[Callable[[int, float], None]] = None) -> Dict:
+        """Adam on the mean energy of a batch of parameter vectors (independent restarts)"""
+        torch = self.torch
+        params = (self.init_params(batch) if params is None else self._as_batch(params)).clone()
+        params.requires_grad_(method == "autograd")
+        optimizer = torch.optim.Adam([params], lr=lr)
+        history = []
+        for step in range(steps):
+            optimizer.zero_grad()
+            if method == "autograd":
+                energies = self.energy(params)
+                energies.sum().backward()
+            else:
+                with torch.no_grad():
+                    energies = self.energy(params)
+                params.grad = self.gradient(params, method)
+            optimizer.step()
+            best = float(energies.detach().min())
+            history.append(best)
+            if callback is not None:
+                callback(step, best)
+        with torch.no_grad():
+            final = self.energy(params)
+        best_index = int(torch.argmin(final))
+        return {
+            "energy": float(final[best_index]),
+            "params": params.detach()[best_index],
+            "history": np.array(history),
+        }
+
+    def apply_to_core(self, params):
+        """Write the controlled state back into core.psi"""
+        with self.torch.no_grad():
+            psi = self.states(params)[0].numpy().copy()
+        self.core.psi = psi
+        return psi
+
+    def _as_batch(self, params):
+        torch = self.torch
+        params = torch.as_tensor(params, dtype=torch.float64)
+        return params.reshape(1, -1) if params.ndim == 1 else params
+
+
+def benchmark_throughput(n_qubits_list: Sequence[int] = (8, 10, 12, 14), batch: int = 32,
+                         n_layers: int = 2, repeats: int = 3, num_threads: Optional[int] = None) -> Dict:
+    """Circuit evaluations per second (batched energy, forward only)"""
+    from zbit_core_v2_FIXED import ZBITQuantumCoreV2
+    torch = get_backend("torch")
+    results = {}
+    for n in n_qubits_list:
+        core = ZBITQuantumCoreV2(n_qubits=n, verbose=False, operations=())
+        controller = QMLController(core, n_layers=n_layers, num_threads=num_threads)
+        params = controller.init_params(batch)
+        with torch.no_grad():
+            controller.energy(params)  # warm-up
+            best = float("inf")
+            for _ in range(repeats):
+                start = time.perf_counter()
+                controller.energy(params)
+                best = min(best, time.perf_counter() - start)
+        results[n] = {"batch": batch, "seconds": best, "evals_per_s": batch / best}
+    return results
+
+
+# ===== DEMO =====
+
+if __name__ == "__main__":
+    print("🧠 QML controller throughput (circuit evaluations / s)")
+    for n, row in benchmark_throughput().items():
+        print(f"  {n:2d} qubits | batch {row['batch']:3d} | {row['evals_per_s']:10.1f} evals/s")
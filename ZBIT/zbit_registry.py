@@ -0,0 +1,98 @@
+"""
+ZBIT-CORE-v2: Process-wide Hamiltonian registry
+Lazily built, read-only operators shared by every core with the same parameters.
+
+Entries are held in a WeakValueDictionary: an operator lives exactly as long
+as some core references its entry, and identical cores never rebuild it.
+"""
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+import numpy as np
+
+DERIVED_CACHE_SIZE = 4
+
+_REGISTRY: "weakref.WeakValueDictionary[Hashable, HamiltonianEntry]" = weakref.WeakValueDictionary()
+_REGISTRY_LOCK = threading.Lock()
+
+
+class HamiltonianEntry:
+    """One shared operator plus an LRU of derived factorizations (propagators, eigenpairs)"""
+
+    def __init__(self, key: Hashable, operator=None):
+        self.key = key
+        self._operator = None if operator is None else freeze(operator)
+        self._derived: "OrderedDict[Hashable, object]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.builds = 0
+
+    @property
+    def built(self) -> bool:
+        return self._operator is not None
+
+    def get(self, builder: Callable[[], object]):
+        """Return the operator, building it with builder() on first use"""
+        operator = self._operator
+        if operator is not None:
+            return operator
+        with self._lock:
+            if self._operator is None:
+                self._operator = freeze(builder())
+                self.builds += 1
+            return self._operator
+
+    def derived(self, name: Hashable, factory: Callable[[], object]):
+        """Memoized derived object (e.g. ("expm", dt)); LRU-bounded by DERIVED_CACHE_SIZE"""
+        with self._lock:
+            if name in self._derived:
+                self._derived.move_to_end(name)
+                return self._derived[name]
+            value = freeze(factory())
+            self._derived[name] = value
+            while len(self._derived) > DERIVED_CACHE_SIZE:
+                self._derived.popitem(last=False)
+            return value
+
+    def cached(self, name: Hashable) -> Optional[object]:
+        with self._lock:
+            return self._derived.get(name)
+
+
+def get_entry(key: Hashable) -> HamiltonianEntry:
+    """Shared entry for key (created empty if no live core holds one)"""
+    with _REGISTRY_LOCK:
+        entry = _REGISTRY.get(key)
+        if entry is None:
+            entry = HamiltonianEntry(key)
+            _REGISTRY[key] = entry
+        return entry
+
+
+def registry_keys():
+    with _REGISTRY_LOCK:
+        return list(_REGISTRY.keys())
+
+
+def clear_registry():
+    """Forget all entries; cores keep their own references"""
+    with _REGISTRY_LOCK:
+        _REGISTRY.clear()
+
+
+def freeze(obj):
+    """Mark ndarray / CSR / matrix-free buffers read-only (shared between cores)"""
+    if isinstance(obj, np.ndarray):
+        obj.flags.writeable = False
+    elif isinstance(obj, tuple):
+        for item in obj:
+            freeze(item)
+    else:
+        for attr in ("data", "indices", "indptr", "diagonal", "_index"):
+            value = getattr(obj, attr, None)
+            if isinstance(value, np.ndarray):
+                value.flags.writeable = False
+        for value in getattr(obj, "_columns", {}).values():
+            value.flags.writeable = False
+    return obj
@@ -0,0 +1,97 @@
+"""
+ZBIT-CORE-v2: Computational-basis sampling
+|psi|^2 -> (marginal) CDF -> vectorized inverse-transform draws.
+
+Bitstrings are packed into uint64: for qubits (q_0, ..., q_{k-1}) the
+outcome of q_0 is the most significant of the k bits, matching the basis
+index ordering of the full state (qubit 0 = most significant bit).
+"""
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+MAX_PACKED_QUBITS = 64
+# Uniform draws per batch (bounds the float64 buffer for millions of shots)
+DRAW_CHUNK = 1 << 20
+
+
+def probabilities(psi: np.ndarray) -> np.ndarray:
+    """Normalized |psi|^2"""
+    probs = psi.real**2 + psi.imag**2
+    total = probs.sum()
+    if total <= 0:
+        raise ValueError("cannot sample from a zero state")
+    probs /= total
+    return probs
+
+
+def marginal(probs: np.ndarray, n_qubits: int, qubits: Sequence[int]) -> np.ndarray:
+    """Marginal distribution over qubits (in the given order), summed from the full one"""
+    qubits = list(qubits)
+    if len(set(qubits)) != len(qubits) or any(not 0 <= q < n_qubits for q in qubits):
+        raise ValueError(f"invalid qubits {qubits} for {n_qubits} qubits")
+    if qubits == list(range(n_qubits)):
+        return probs
+    tensor = probs.reshape((2,) * n_qubits)
+    others = tuple(q for q in range(n_qubits) if q not in qubits)
+    reduced = tensor.sum(axis=others) if others else tensor
+    # reduced keeps the kept qubits in ascending order; reorder to the requested order
+    kept = sorted(qubits)
+    return np.ascontiguousarray(reduced.transpose([kept.index(q) for q in qubits])).reshape(-1)
+
+
+def build_cdf(probs: np.ndarray) -> np.ndarray:
+    cdf = np.cumsum(probs)
+    cdf /= cdf[-1]
+    return cdf
+
+
+def draw(cdf: np.ndarray, shots: int, rng: np.random.Generator) -> np.ndarray:
+    """shots outcomes as packed uint64 indices into cdf"""
+    out = np.empty(shots, dtype=np.uint64)
+    last = cdf.size - 1
+    for start in range(0, shots, DRAW_CHUNK):
+        # Sorted queries walk the CDF cache-friendly (~4x faster); the shuffle restores
+        # an i.i.d. sequence since the multiset of outcomes is unchanged
+        u = np.sort(rng.random(min(DRAW_CHUNK, shots - start)))
+        idx = np.searchsorted(cdf, u, side="right")
+        np.minimum(idx, last, out=idx)
+        rng.shuffle(idx)
+        out[start:start + u.size] = idx
+    return out
+
+
+def histogram(samples: np.ndarray) -> Dict[int, int]:
+    """{bitstring: count}"""
+    values, counts = np.unique(samples, return_counts=True)
+    return dict(zip(values.tolist(), counts.tolist()))
+
+
+def format_bitstrings(samples: np.ndarray, width: int):
+    """Packed uint64 -> '0101...' strings (first character = first sampled qubit)"""
+    return [format(int(s), f"0{width}b") for s in samples]
+
+
+class SamplingCache:
+    """Full distribution and per-subset CDFs, valid for one psi version"""
+
+    def __init__(self, max_cdfs: int = 8):
+        self.version: Optional[int] = None
+        self.probs: Optional[np.ndarray] = None
+        self.cdfs: Dict[Tuple[int, ...], np.ndarray] = {}
+        self.max_cdfs = max_cdfs
+        self.builds = 0
+
+    def cdf(self, psi: np.ndarray, version: int, n_qubits: int, qubits: Tuple[int, ...]) -> np.ndarray:
+        if version != self.version:
+            self.version, self.probs, self.cdfs = version, None, {}
+        cdf = self.cdfs.get(qubits)
+        if cdf is None:
+            if self.probs is None:
+                self.probs = probabilities(psi)
+            cdf = build_cdf(marginal(self.probs, n_qubits, qubits))
+            if len(self.cdfs) >= self.max_cdfs:
+                self.cdfs.pop(next(iter(self.cdfs)))
+            self.cdfs[qubits] = cdf
+            self.builds += 1
+        return cdf
@@ -0,0 +1,117 @@
+"""
+ZBIT-CORE-v2: Binary snapshots
+One versioned file holding a JSON header and raw, aligned array buffers, so
+a saved session reopens by memory-mapping instead of rebuilding.
+
+    write_snapshot("run.zbs", meta={"n_qubits": 14}, arrays={"psi": psi, "evals": evals})
+    meta, arrays = read_snapshot("run.zbs")          # arrays are read-only memmaps
+
+Layout (little-endian):
+    0   b"ZBITSNAP"
+    8   uint32 format version
+    12  uint32 header length h
+    16  header: UTF-8 JSON {"meta": ..., "arrays": {name: {dtype, shape, offset}}}
+        padded with spaces to a multiple of ALIGNMENT
+    ... each array C-contiguous at an ALIGNMENT-byte offset from the file start
+
+Files are written to a temporary name and renamed into place, so a reader
+never sees a partial snapshot.
+"""
+import json
+import os
+import struct
+import uuid
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+MAGIC = b"ZBITSNAP"
+SNAPSHOT_FORMAT = 1
+ALIGNMENT = 64
+_PREFIX = struct.Struct("<8sII")
+
+
+class SnapshotError(ValueError):
+    """Not a snapshot, or one written in an unsupported format"""
+
+
+def _json_default(value):
+    # NumPy scalars / small arrays in meta (e.g. evolve reports)
+    if isinstance(value, (np.generic, np.ndarray)):
+        return value.tolist()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def write_snapshot(path, meta: Dict, arrays: Dict[str, np.ndarray]) -> Path:
+    """Write meta (JSON-serializable) and arrays to path atomically"""
+    path = Path(path)
+    arrays = {name: np.ascontiguousarray(a) for name, a in arrays.items()}
+    for name, a in arrays.items():
+        if a.dtype.hasobject:
+            raise TypeError(f"array '{name}' has dtype object; only numeric buffers are stored")
+    # Offsets depend on the header length, which depends on the offsets: iterate to a fixed point
+    specs = {name: {"dtype": a.dtype.newbyteorder("<").str, "shape": list(a.shape), "offset": 0}
+             for name, a in arrays.items()}
+    while True:
+        header = json.dumps({"meta": meta, "arrays": specs}, separators=(",", ":"),
+                            default=_json_default).encode("utf-8")
+        offset = _aligned(_PREFIX.size + len(header))
+        changed = False
+        for name, a in arrays.items():
+            changed |= specs[name]["offset"] != offset
+            specs[name]["offset"] = offset
+            offset = _aligned(offset + a.nbytes)
+        if not changed:
+            break
+    header += b" " * (_aligned(_PREFIX.size + len(header)) - _PREFIX.size - len(header))
+    tmp = path.with_name(f".{path.name}.tmp-{uuid.uuid4().hex}")
+    try:
+        with open(tmp, "wb") as fh:
+            fh.write(_PREFIX.pack(MAGIC, SNAPSHOT_FORMAT, len(header)))
+            fh.write(header)
+            for name, a in arrays.items():
+                fh.seek(specs[name]["offset"])
+                a.astype(specs[name]["dtype"], copy=False).tofile(fh)
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+    return path
+
+
+def read_header(path) -> Dict:
+    """{"meta", "arrays"} of a snapshot without touching its buffers"""
+    with open(path, "rb") as fh:
+        prefix = fh.read(_PREFIX.size)
+        if len(prefix) < _PREFIX.size:
+            raise SnapshotError(f"{path}: truncated snapshot")
+        magic, version, length = _PREFIX.unpack(prefix)
+        if magic != MAGIC:
+            raise SnapshotError(f"{path}: not a ZBIT snapshot")
+        if version != SNAPSHOT_FORMAT:
+            raise SnapshotError(f"{path}: snapshot format {version}, this build reads {SNAPSHOT_FORMAT}")
+        return json.loads(fh.read(length).decode("utf-8"))
+
+
+def read_snapshot(path, mmap_mode: Optional[str] = "r") -> Tuple[Dict, Dict[str, np.ndarray]]:
+    """
+    (meta, {name: array}). mmap_mode "r" / "c" maps every buffer zero-copy (read-only /
+    copy-on-write); None reads private in-memory copies.
+    """
+    header = read_header(path)
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype, shape = np.dtype(spec["dtype"]), tuple(spec["shape"])
+        count = int(np.prod(shape, dtype=np.int64))
+        if mmap_mode is None or count == 0:
+            with open(path, "rb") as fh:
+                fh.seek(spec["offset"])
+                arrays[name] = np.fromfile(fh, dtype=dtype, count=count).reshape(shape)
+        else:
+            arrays[name] = np.memmap(path, dtype=dtype, mode=mmap_mode, offset=spec["offset"], shape=shape)
+    return header["meta"], arrays
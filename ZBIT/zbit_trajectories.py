@@ -0,0 +1,253 @@
+"""
+ZBIT-CORE-v2: Lindblad dynamics by quantum trajectories
+drho/dt = -i[H, rho] + sum_k rate_k (L_k rho L_k^+ - {L_k^+ L_k, rho} / 2),
+unravelled into pure-state trajectories (Monte Carlo wave function, first
+order in dt for the jump times).
+
+    solver = LindbladTrajectories(H, [(0.1, lowering(n, 0))], {"z0": "ZIII"},
+                                  t_final=5.0, steps=200, n_workers=4, seed=7)
+    for estimate in solver.stream(psi0, max_trajectories=10_000):
+        if estimate["max_stderr"] < 1e-3:
+            break
+
+Each batch propagates batch_size trajectories as one (dim, batch) block
+under H_eff = H - i/2 sum_k rate_k L_k^+ L_k. A trajectory jumps when its
+norm^2 decays below its uniform draw; the channel is chosen with weights
+rate_k ||L_k psi||^2. Batch b draws from SeedSequence(seed).spawn()[b],
+so results do not depend on the number of workers. Batches are consumed in
+submission order and folded into running sums, giving the ensemble mean
+and its standard error after every batch.
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from zbit_backends import csr_matrix, expm, expm_multiply
+from zbit_operators import z_signs
+from zbit_pauli import PauliString, as_pauli
+
+# Up to this dimension the step propagator exp(-i H_eff dt) is a dense matrix
+DENSE_PROPAGATOR_MAX_DIM = 1 << 10
+
+# Worker-process global (set by _init_worker)
+_W_KERNEL = None
+
+
+def lowering(n_qubits: int, qubit: int):
+    """sigma^- = |0><1| on qubit (CSR)"""
+    dim = 2**n_qubits
+    bit = 1 << (n_qubits - 1 - qubit)
+    cols = np.flatnonzero(np.arange(dim) & bit)
+    return csr_matrix((np.ones(cols.size, dtype=complex), (cols ^ bit, cols)), shape=(dim, dim))
+
+
+def dephasing(n_qubits: int, qubit: int):
+    """Z on qubit (CSR)"""
+    dim = 2**n_qubits
+    index = np.arange(dim)
+    signs = 1.0 - 2.0 * ((index >> (n_qubits - 1 - qubit)) & 1)
+    return csr_matrix((signs.astype(complex), (index, index)), shape=(dim, dim))
+
+
+class _TrajectoryKernel:
+    """The fixed problem (H_eff, jumps, observables, time grid); runs one batch"""
+
+    def __init__(self, H, jumps, observables, dt: float, steps: int):
+        self.dim = H.shape[0]
+        self.dt = dt
+        self.steps = steps
+        self.rates = np.array([float(rate) for rate, _ in jumps])
+        if np.any(self.rates < 0):
+            raise ValueError("jump rates must be non-negative")
+        dense = self.dim <= DENSE_PROPAGATOR_MAX_DIM
+        convert = _to_dense if dense else _to_csr
+        self.jumps = [convert(L) for _, L in jumps]
+        H_eff = convert(H).astype(complex)
+        for rate, L in zip(self.rates, self.jumps):
+            H_eff = H_eff - 0.5j * rate * (L.conj().T @ L)
+        self.H_eff = H_eff
+        self._U = None
+        n_qubits = self.dim.bit_length() - 1
+        self.names = list(observables)
+        self.paulis = {}
+        index = np.arange(self.dim)
+        for name, op in observables.items():
+            if isinstance(op, (str, PauliString)):
+                p = as_pauli(op, n_qubits)
+                # (P psi)[c] = i^phase (-1)^popcount((c ^ x) & z) psi[c ^ x]
+                self.paulis[name] = (index ^ p.x, 1j**p.phase * z_signs(index ^ p.x, p.z))
+        self.operators = {name: op for name, op in observables.items() if name not in self.paulis}
+
+    def step(self, block: np.ndarray) -> np.ndarray:
+        if isinstance(self.H_eff, np.ndarray):
+            if self._U is None:
+                self._U = expm(-1j * self.dt * self.H_eff)
+            return self._U @ block
+        return expm_multiply(-1j * self.dt * self.H_eff, block)
+
+    def measure(self, block: np.ndarray) -> Dict[str, np.ndarray]:
+        """Per-trajectory <O> of the normalized columns"""
+        norms2 = np.sum(np.abs(block)**2, axis=0)
+        values = {}
+        for name, op in self.operators.items():
+            values[name] = np.real(np.sum(block.conj() * op.dot(block), axis=0)) / norms2
+        for name, (gather, signs) in self.paulis.items():
+            values[name] = np.real(signs @ (block.conj() * block[gather])) / norms2
+        return values
+
+    def run_batch(self, seed: np.random.SeedSequence, size: int, psi0: np.ndarray) -> Dict:
+        """{"sum", "sumsq": {name: (steps + 1,)}, "count", "jumps"} of size trajectories"""
+        rng = np.random.default_rng(seed)
+        block = np.repeat(psi0[:, None] / np.linalg.norm(psi0), size, axis=1)
+        threshold = rng.random(size)
+        sums = {name: np.zeros(self.steps + 1) for name in self.names}
+        sumsq = {name: np.zeros(self.steps + 1) for name in self.names}
+        n_jumps = 0
+
+        def record(s):
+            for name, v in self.measure(block).items():
+                sums[name][s] = v.sum()
+                sumsq[name][s] = np.dot(v, v)
+
+        record(0)
+        for s in range(1, self.steps + 1):
+            block = self.step(block)
+            norms2 = np.sum(np.abs(block)**2, axis=0)
+            for c in np.flatnonzero(norms2 < threshold):
+                block[:, c] = self._jump(block[:, c], rng)
+                threshold[c] = rng.random()
+                n_jumps += 1
+            record(s)
+        return {"sum": sums, "sumsq": sumsq, "count": size, "jumps": n_jumps}
+
+    def _jump(self, psi: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        candidates = [L.dot(psi) for L in self.jumps]
+        weights = self.rates * np.array([np.vdot(v, v).real for v in candidates])
+        if weights.sum() <= 0:
+            return psi / np.linalg.norm(psi)
+        k = rng.choice(len(candidates), p=weights / weights.sum())
+        return candidates[k] / np.linalg.norm(candidates[k])
+
+
+def _to_dense(op) -> np.ndarray:
+    return op.toarray() if hasattr(op, "toarray") else np.asarray(op, dtype=complex)
+
+
+def _to_csr(op):
+    return op.tocsr() if hasattr(op, "tocsr") else csr_matrix(np.asarray(op, dtype=complex))
+
+
+def _init_worker(kernel: _TrajectoryKernel):
+    """Pool initializer: the problem is shipped once per worker, not per batch"""
+    global _W_KERNEL
+    import zbit_kernels
+    zbit_kernels.set_num_threads(1)
+    _W_KERNEL = kernel
+
+
+def _run_batch(task) -> Dict:
+    seed, size, psi0 = task
+    return _W_KERNEL.run_batch(seed, size, psi0)
+
+
+def _check_max_trajectories(max_trajectories: int):
+    if max_trajectories < 1:
+        raise ValueError(f"max_trajectories must be >= 1, got {max_trajectories}")
+
+
+class LindbladTrajectories:
+    """Trajectory-averaged observables of a Lindblad equation, streamed batch by batch"""
+
+    def __init__(self, H, jumps: Sequence[Tuple[float, object]], observables: Dict,
+                 t_final: float, steps: int = 100, batch_size: int = 16, n_workers: int = 0,
+                 seed: Optional[int] = None, mp_context: str = "spawn"):
+        if not observables:
+            raise ValueError("at least one observable is required")
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+        self.t_final = t_final
+        self.steps = steps
+        self.times = np.linspace(0.0, t_final, steps + 1)
+        self.batch_size = batch_size
+        self.n_workers = n_workers
+        self.seed = seed
+        self.mp_context = mp_context
+        self.kernel = _TrajectoryKernel(H, jumps, observables, t_final / max(steps, 1), steps)
+
+    def _batches(self, max_trajectories: int) -> List[int]:
+        full, rest = divmod(max_trajectories, self.batch_size)
+        return [self.batch_size] * full + ([rest] if rest else [])
+
+    def stream(self, psi0: np.ndarray, max_trajectories: int = 1000) -> Iterator[Dict]:
+        """
+        Running estimate after every batch: {"times", "trajectories", "jumps",
+        "mean": {name: (steps + 1,)}, "stderr": {...}, "max_stderr"}.
+        Stop iterating at any point; pending batches are cancelled.
+        """
+        # Checked here, not in the generator, so bad arguments fail at the call
+        _check_max_trajectories(max_trajectories)
+        return self._stream(np.asarray(psi0, dtype=complex), max_trajectories)
+
+    def _stream(self, psi0: np.ndarray, max_trajectories: int) -> Iterator[Dict]:
+        sizes = self._batches(max_trajectories)
+        seeds = np.random.SeedSequence(self.seed).spawn(len(sizes))
+        tasks = [(s, size, psi0) for s, size in zip(seeds, sizes)]
+        names = self.kernel.names
+        sums = {name: np.zeros(self.steps + 1) for name in names}
+        sumsq = {name: np.zeros(self.steps + 1) for name in names}
+        totals = {"count": 0, "jumps": 0}
+
+        def fold(result) -> Dict:
+            for name in names:
+                sums[name] += result["sum"][name]
+                sumsq[name] += result["sumsq"][name]
+            totals["count"] += result["count"]
+            totals["jumps"] += result["jumps"]
+            return self._estimate(sums, sumsq, totals)
+
+        if self.n_workers < 1:
+            for task in tasks:
+                yield fold(self.kernel.run_batch(*task))
+            return
+        pool = ProcessPoolExecutor(max_workers=self.n_workers,
+                                   mp_context=multiprocessing.get_context(self.mp_context),
+                                   initializer=_init_worker, initargs=(self.kernel,))
+        try:
+            # A bounded window of batches in flight, consumed in order (deterministic sums)
+            window = 2 * self.n_workers
+            futures = [pool.submit(_run_batch, task) for task in tasks[:window]]
+            for i in range(len(tasks)):
+                result = futures[i].result()
+                if i + window < len(tasks):
+                    futures.append(pool.submit(_run_batch, tasks[i + window]))
+                yield fold(result)
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def run(self, psi0: np.ndarray, max_trajectories: int = 1000,
+            tol: Optional[float] = None) -> Dict:
+        """Last estimate of stream(); with tol, stops once every standard error is <= tol"""
+        estimate = None
+        for estimate in self.stream(psi0, max_trajectories):
+            if tol is not None and estimate["trajectories"] > 1 and estimate["max_stderr"] <= tol:
+                break
+        estimate["converged"] = tol is not None and estimate["max_stderr"] <= tol
+        return estimate
+
+    def _estimate(self, sums, sumsq, totals) -> Dict:
+        N = totals["count"]
+        mean = {name: s / N for name, s in sums.items()}
+        stderr = {}
+        for name in sums:
+            if N > 1:
+                var = np.clip(sumsq[name] / N - mean[name]**2, 0.0, None) * N / (N - 1)
+                stderr[name] = np.sqrt(var / N)
+            else:
+                stderr[name] = np.full(self.steps + 1, np.inf)
+        return {
+            "times": self.times, "trajectories": N, "jumps": totals["jumps"],
+            "mean": mean, "stderr": stderr,
+            "max_stderr": float(max(e.max() for e in stderr.values())),
+        }